@@ -0,0 +1,100 @@
+"""
+/ai/analyze-image and the event loop.
+
+CONCURRENT photo analyses run against the in-process fakes (Cloudinary
+upload then Groq vision, latencies from services.fakes) while a probe
+asks /health every PROBE_MS. The old handler called both blocking SDKs
+inline in its async route, so every other coroutine on the worker waited
+for them; services.image_analysis runs them on its thread pool. Reports
+the gaps between answered probes during the load (a blocked event loop
+shows up as a long gap, which timing each probe alone would miss) and
+how long the batch of analyses took.
+
+Run from backend/:
+    python -m benchmarks.analyze_image_loop
+"""
+
+import asyncio
+import os
+import statistics
+import tempfile
+import time
+
+os.environ["DATABASE_URL"] = f"sqlite:///{tempfile.mkdtemp()}/bench.db"
+os.environ["FAKE_SERVICES"] = "all"
+os.environ.setdefault("FAKE_CLOUDINARY_LATENCY_MS", "200,400")
+os.environ.setdefault("FAKE_GROQ_LATENCY_MS", "400,800")
+
+import httpx
+from fastapi import FastAPI, File, UploadFile
+
+import main
+from services.cloudinary_service import upload_temp_image
+from services.groq_vision import analyze_service_image
+
+CONCURRENT = 20
+PROBE_MS = 20
+
+inline_app = FastAPI()
+
+
+@inline_app.get("/health")
+def inline_health():
+    return {"status": "ok"}
+
+
+@inline_app.post("/ai/analyze-image")
+async def inline_analyze(image: UploadFile = File(...)):
+    # The previous handler: blocking SDK calls straight on the event loop
+    result = analyze_service_image(upload_temp_image(await image.read()))
+    return {"suggested_service": result.get("service")}
+
+
+async def measure(app):
+    gaps, done = [], asyncio.Event()
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench", timeout=120) as c:
+
+        async def probe():
+            last = time.perf_counter()
+            while not done.is_set():
+                await asyncio.sleep(PROBE_MS / 1000)
+                await c.get("/health")
+                now = time.perf_counter()
+                gaps.append((now - last) * 1000)
+                last = now
+
+        async def analyze(i):
+            res = await c.post("/ai/analyze-image", files={"image": (f"{i}.jpg", os.urandom(30_000), "image/jpeg")})
+            assert res.status_code == 200, res.text
+
+        prober = asyncio.create_task(probe())
+        await asyncio.sleep(0.1)
+        started = time.perf_counter()
+        await asyncio.gather(*(analyze(i) for i in range(CONCURRENT)))
+        elapsed = time.perf_counter() - started
+        done.set()
+        await prober
+    return gaps, elapsed
+
+
+def report(label, gaps, elapsed):
+    q = statistics.quantiles(gaps, n=100, method="inclusive") if len(gaps) > 1 else gaps * 99
+    print(
+        f"  {label:<9} {CONCURRENT} analyses in {elapsed:5.1f} s   "
+        f"gap between /health answers: n {len(gaps):>4}  p50 {q[49]:7.1f} ms  p99 {q[98]:7.1f} ms  "
+        f"max {max(gaps):7.1f} ms"
+    )
+
+
+async def run():
+    print(
+        f"{CONCURRENT} concurrent analyses, upload {os.environ['FAKE_CLOUDINARY_LATENCY_MS']} ms, "
+        f"vision {os.environ['FAKE_GROQ_LATENCY_MS']} ms (median,p99)"
+    )
+    report("inline", *await measure(inline_app))
+    async with main.app.router.lifespan_context(main.app):
+        report("pipeline", *await measure(main.app))
+
+
+if __name__ == "__main__":
+    asyncio.run(run())
@@ -0,0 +1,85 @@
+"""
+Offline city resolution: lookup latency and how often OpenCage is still
+needed.
+
+1. Resolves random points around the bundled cities and reports the
+   per-lookup latency and the share of ambiguous answers.
+2. Replays a fleet of providers pinging every PING_INTERVAL seconds
+   (70% parked, the rest driving ~8 m/s) through the presence store and
+   counts city checks (cell changes) and the ambiguous ones that would
+   go to OpenCage, against one OpenCage call per ping before.
+
+Run from backend/:
+    python -m benchmarks.city_resolver_bench
+"""
+
+import os
+import random
+import statistics
+import time
+
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+
+from services.city_resolver import city_resolver
+from services.presence import PresenceStore
+
+N_POINTS = 20000
+N_PROVIDERS = 1000
+PING_INTERVAL = 3
+SIM_SECONDS = 1800
+
+
+def lookup_latency(rng):
+    city_resolver.resolve(19.0, 72.8)  # load outside the timing
+    cities = city_resolver._cities
+    timings, ambiguous = [], 0
+    for _ in range(N_POINTS):
+        c = rng.choice(cities)
+        lat = c.latitude + rng.uniform(-0.1, 0.1)
+        lng = c.longitude + rng.uniform(-0.1, 0.1)
+        started = time.perf_counter()
+        res = city_resolver.resolve(lat, lng)
+        timings.append((time.perf_counter() - started) * 1e6)
+        ambiguous += res.ambiguous
+    print(
+        f"{len(cities)} cities, {N_POINTS} lookups: p50 {statistics.median(timings):.1f} us, "
+        f"mean {statistics.fmean(timings):.1f} us, ambiguous {ambiguous / N_POINTS:.1%}"
+    )
+
+
+def fleet(rng):
+    store = PresenceStore()
+    cities = city_resolver._cities
+    providers = []
+    for _ in range(N_PROVIDERS):
+        c = rng.choice(cities)
+        providers.append([
+            c.latitude + rng.uniform(-0.05, 0.05),
+            c.longitude + rng.uniform(-0.05, 0.05),
+            rng.random() < 0.7,
+            rng.uniform(-7e-5, 7e-5),
+            rng.uniform(-7e-5, 7e-5),
+        ])
+
+    pings = checks = ambiguous = 0
+    for t in range(0, SIM_SECONDS, PING_INTERVAL):
+        for pid, p in enumerate(providers, start=1):
+            if not p[2]:
+                p[0] += p[3] * PING_INTERVAL
+                p[1] += p[4] * PING_INTERVAL
+            store.record(pid, p[0] + rng.uniform(-2e-5, 2e-5), p[1] + rng.uniform(-2e-5, 2e-5))
+            pings += 1
+        pending, store._city_pending = store._city_pending, {}
+        checks += len(pending)
+        ambiguous += sum(city_resolver.resolve(lat, lng).ambiguous for lat, lng in pending.values())
+
+    print(
+        f"{N_PROVIDERS} providers, {SIM_SECONDS // 60} min: {pings} pings -> "
+        f"{checks} city checks, {ambiguous} OpenCage calls (before: {pings})"
+    )
+
+
+if __name__ == "__main__":
+    rng = random.Random(5)
+    lookup_latency(rng)
+    fleet(rng)
@@ -0,0 +1,171 @@
+"""
+Dispatch matching throughput and quality.
+
+1. In memory: REQUESTS open requests and PROVIDERS online providers
+   spread over a ~30 km city across the seeded service types. It times
+   candidate lookup (provider index) and the min-cost matching. It then
+   compares the result with greedy dispatch, where each request in
+   arrival order takes its cheapest free candidate.
+2. End to end: one Dispatcher.dispatch_once window on a temporary SQLite
+   database. It checks that no provider is the first choice (rank 0
+   offer) of two requests, nor a backup beside being someone's first
+   choice.
+
+Run from backend/:
+    python -m benchmarks.dispatch_bench
+"""
+
+import os
+import random
+import tempfile
+import time
+
+TMP = tempfile.mkdtemp()
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{TMP}/bench.db")
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+import models
+from services import dispatch
+from services.dispatch import Dispatcher, OpenRequest, ProviderStats, assign, candidates, pair_cost
+from services.provider_index import provider_index
+
+CENTER = (19.0760, 72.8777)
+SPAN_DEG = 0.27  # ~30 km
+RADIUS_KM = 5.0
+SERVICE_TYPES = ["AC Repair", "Electrician", "Plumber", "Cleaner", "Carpenter", "Painter"]
+SIZES = ((1000, 1500), (3000, 3000), (5000, 4000))
+E2E_SIZE = (2000, 3000)
+
+
+def point(rng):
+    return CENTER[0] + rng.uniform(-SPAN_DEG / 2, SPAN_DEG / 2), CENTER[1] + rng.uniform(-SPAN_DEG / 2, SPAN_DEG / 2)
+
+
+def fleet(rng, n_requests, n_providers):
+    provider_index._cells, provider_index._where = {}, {}
+    stats = {}
+    for pid in range(1, n_providers + 1):
+        provider_index.upsert(pid, rng.choice(SERVICE_TYPES), *point(rng))
+        stats[pid] = ProviderStats(
+            rng.choice([None, round(rng.uniform(3, 5), 1)]),
+            rng.choice([0, rng.randrange(200)]),
+            rng.randrange(300, 1500, 50),
+        )
+    requests = [
+        OpenRequest(i, "Job", rng.choice(SERVICE_TYPES), *point(rng), rng.choice([None, rng.randrange(400, 1500, 100)]))
+        for i in range(1, n_requests + 1)
+    ]
+    return requests, stats
+
+
+def greedy(requests, cands, stats):
+    taken, pairs = set(), []
+    for i, r in enumerate(requests):
+        options = [
+            (pair_cost(d, RADIUS_KM, stats[pid], r.budget), pid)
+            for pid, d in cands.get(i, ()) if pid not in taken
+        ]
+        if options:
+            pid = min(options)[1]
+            taken.add(pid)
+            pairs.append((r, pid))
+    return pairs
+
+
+def summary(label, pairs, cands, stats, ms):
+    dist = {(i, pid): d for i, near in cands.items() for pid, d in near}
+    index = {r.id: i for i, r in enumerate(REQUESTS_BY_ID)}
+    costs = [pair_cost(dist[index[r.id], pid], RADIUS_KM, stats[pid], r.budget) for r, pid in pairs]
+    km = [dist[index[r.id], pid] for r, pid in pairs]
+    print(
+        f"    {label:<8} matched {len(pairs):>5}  mean cost {sum(costs) / len(costs):.3f}  "
+        f"mean distance {sum(km) / len(km):.2f} km  total cost {sum(costs):8.1f}  {ms:7.1f} ms"
+    )
+
+
+def in_memory(rng):
+    global REQUESTS_BY_ID
+    for n_requests, n_providers in SIZES:
+        requests, stats = fleet(rng, n_requests, n_providers)
+        REQUESTS_BY_ID = requests
+
+        started = time.perf_counter()
+        cands = candidates(requests, RADIUS_KM, set())
+        cand_ms = (time.perf_counter() - started) * 1000
+        started = time.perf_counter()
+        optimal = assign(requests, cands, stats, RADIUS_KM)
+        match_ms = (time.perf_counter() - started) * 1000
+        started = time.perf_counter()
+        baseline = greedy(requests, cands, stats)
+        greedy_ms = (time.perf_counter() - started) * 1000
+
+        total_s = (cand_ms + match_ms) / 1000
+        print(
+            f"  {n_requests} requests x {n_providers} providers: candidates {cand_ms:.0f} ms, "
+            f"matching {match_ms:.0f} ms -> {n_requests / total_s:,.0f} requests/s"
+        )
+        summary("greedy", baseline, cands, stats, greedy_ms)
+        summary("min-cost", optimal, cands, stats, match_ms)
+
+
+def end_to_end(rng):
+    n_requests, n_providers = E2E_SIZE
+    engine = create_engine(os.environ["DATABASE_URL"], connect_args={"check_same_thread": False})
+    models.Base.metadata.create_all(bind=engine)
+    Session = sessionmaker(bind=engine)
+    db = Session()
+    user = models.User(full_name="Customer", email="c@example.com", hashed_password="x", role="customer")
+    db.add(user)
+    db.flush()
+    customer = models.Customer(user_id=user.id)
+    db.add(customer)
+    db.flush()
+    for i in range(n_providers):
+        u = models.User(full_name=f"P{i}", email=f"p{i}@example.com", hashed_password="x", role="provider")
+        db.add(u)
+        db.flush()
+        p = models.Provider(
+            user_id=u.id, service_type=rng.choice(SERVICE_TYPES), base_price=rng.randrange(300, 1500, 50),
+            rating=round(rng.uniform(3, 5), 1), jobs_completed=rng.randrange(200),
+            is_online=True, kyc_status="approved",
+        )
+        db.add(p)
+        db.flush()
+        lat, lng = point(rng)
+        db.add(models.ProviderLocation(provider_id=p.id, latitude=lat, longitude=lng))
+    for i in range(n_requests):
+        lat, lng = point(rng)
+        db.add(models.Request(
+            customer_id=customer.id, title=f"Job {i}", service_type=rng.choice(SERVICE_TYPES),
+            customer_lat=lat, customer_lng=lng, budget=rng.randrange(400, 1500, 100), status="pending",
+        ))
+    db.commit()
+    db.close()
+
+    provider_index._loaded = False
+    dispatch.search_radius_km = lambda: RADIUS_KM
+    worker = Dispatcher()
+    offered = worker.dispatch_once(engine)
+    with engine.connect() as conn:
+        dupes = conn.exec_driver_sql(
+            "SELECT COUNT(*) FROM (SELECT provider_id FROM request_offers WHERE rank = 0 "
+            "GROUP BY provider_id HAVING COUNT(*) > 1)"
+        ).scalar()
+        mixed = conn.exec_driver_sql(
+            "SELECT COUNT(DISTINCT provider_id) FROM request_offers WHERE rank > 0 "
+            "AND provider_id IN (SELECT provider_id FROM request_offers WHERE rank = 0)"
+        ).scalar()
+    print(
+        f"  dispatch_once: {n_requests} requests x {n_providers} providers -> {offered} offered "
+        f"({worker.offers} offers) in {worker.last_batch_ms:.0f} ms, "
+        f"first choice twice: {dupes}, first choice and backup: {mixed}"
+    )
+    assert dupes == 0 and mixed == 0
+
+if __name__ == "__main__":
+    rng = random.Random(19)
+    print(f"radius {RADIUS_KM} km, {len(SERVICE_TYPES)} service types, ~30 km city")
+    in_memory(rng)
+    end_to_end(rng)
@@ -0,0 +1,73 @@
+"""
+Distance ranking benchmark: scalar haversine loop vs the vectorized API.
+
+Run from backend/:
+    python -m benchmarks.distance_bench
+"""
+
+import math
+import random
+import time
+
+import numpy as np
+
+from utils.distance import rank_within_radius
+
+ORIGIN = (19.0760, 72.8777)  # Mumbai
+RADIUS_KM = 5.0
+TOP_K = 20
+
+
+def scalar_haversine_km(lat1, lon1, lat2, lon2):
+    # The pre-vectorization formula, one candidate at a time
+    R = 6371
+    dlat = math.radians(lat2 - lat1)
+    dlon = math.radians(lon2 - lon1)
+    a = (
+        math.sin(dlat / 2) ** 2
+        + math.cos(math.radians(lat1)) * math.cos(math.radians(lat2)) * math.sin(dlon / 2) ** 2
+    )
+    return R * 2 * math.atan2(math.sqrt(a), math.sqrt(1 - a))
+
+
+def scalar_rank(lats, lngs):
+    hits = []
+    for i in range(len(lats)):
+        d = scalar_haversine_km(ORIGIN[0], ORIGIN[1], lats[i], lngs[i])
+        if d <= RADIUS_KM:
+            hits.append((d, i))
+    hits.sort()
+    return [i for _, i in hits[:TOP_K]]
+
+
+def vector_rank(lats, lngs):
+    return rank_within_radius(ORIGIN[0], ORIGIN[1], lats, lngs, RADIUS_KM, TOP_K).top
+
+
+def best_of(fn, *args, repeat=5):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(*args)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    rng = random.Random(42)
+    print(f"{'candidates':>10} {'scalar ms':>10} {'vector ms':>10} {'speedup':>8}")
+
+    for n in (1_000, 10_000, 100_000):
+        lats = [ORIGIN[0] + rng.uniform(-0.2, 0.2) for _ in range(n)]
+        lngs = [ORIGIN[1] + rng.uniform(-0.2, 0.2) for _ in range(n)]
+        lat_arr, lng_arr = np.array(lats), np.array(lngs)
+
+        assert list(vector_rank(lat_arr, lng_arr)) == scalar_rank(lats, lngs)
+
+        scalar = best_of(scalar_rank, lats, lngs)
+        vector = best_of(vector_rank, lat_arr, lng_arr)
+        print(f"{n:>10} {scalar * 1e3:>10.2f} {vector * 1e3:>10.2f} {scalar / vector:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
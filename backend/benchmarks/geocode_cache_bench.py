@@ -0,0 +1,91 @@
+"""
+Reverse-geocode cache latency and hit ratio.
+
+Replays LOOKUPS reverse lookups around SPOTS street locations (each
+lookup a few metres from its spot, as repeated pings and request
+creations are) against a GeocodeCache on a temporary SQLite file. The
+upstream call is simulated with a fixed UPSTREAM_MS delay in place of
+the OpenCage round trip.
+
+Reports per-lookup latency for memory hits, disk hits (a fresh cache
+instance on the same file, as after a restart) and misses.
+
+Run from backend/:
+    python -m benchmarks.geocode_cache_bench
+"""
+
+import os
+import random
+import statistics
+import tempfile
+import time
+
+from services.geocode_cache import GeocodeCache
+
+SPOTS = 300
+LOOKUPS = 5000
+UPSTREAM_MS = 150
+JITTER_DEG = 2e-5  # ~2 m
+CENTER = (19.0760, 72.8777)
+
+
+def upstream(lat, lng):
+    time.sleep(UPSTREAM_MS / 1000)
+    return {"formatted": f"{lat:.5f},{lng:.5f}", "city": "Mumbai"}
+
+
+def replay(cache: GeocodeCache, lookups):
+    timings = []
+    for lat, lng in lookups:
+        started = time.perf_counter()
+        cache.get_or_fetch(lat, lng, upstream)
+        timings.append((time.perf_counter() - started) * 1e6)
+    return timings
+
+
+def summary(label, timings):
+    if not timings:
+        return
+    print(
+        f"  {label:<12} n={len(timings):>5}  p50 {statistics.median(timings):>10.1f} us  "
+        f"mean {statistics.fmean(timings):>10.1f} us"
+    )
+
+
+def main():
+    rng = random.Random(11)
+    # Spots on a ~100 m grid so no two share a quantized cell
+    spots = [
+        (CENTER[0] + rng.randrange(500) * 1e-3, CENTER[1] + rng.randrange(500) * 1e-3)
+        for _ in range(SPOTS)
+    ]
+    lookups = [
+        (lat + rng.uniform(-JITTER_DEG, JITTER_DEG), lng + rng.uniform(-JITTER_DEG, JITTER_DEG))
+        for lat, lng in (rng.choice(spots) for _ in range(LOOKUPS))
+    ]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "geocode.sqlite3")
+        warm = GeocodeCache(path=path)
+        first = replay(warm, lookups)
+        stats = warm.stats()
+        misses = sorted(first, reverse=True)[: stats["misses"]]
+        hits = sorted(first)[: len(first) - stats["misses"]]
+
+        # one lookup per cached key, so every one is a disk hit
+        restarted = GeocodeCache(path=path)
+        distinct = list({restarted.key(lat, lng): (lat, lng) for lat, lng in lookups}.values())
+        disk = replay(restarted, distinct)
+
+    print(
+        f"{LOOKUPS} lookups around {SPOTS} spots, precision {warm.precision} "
+        f"(~{111_000 / 10 ** warm.precision:.0f} m), upstream {UPSTREAM_MS} ms"
+    )
+    print(f"  hit ratio {stats['hit_ratio']:.1%}, upstream calls {stats['misses']}")
+    summary("miss", misses)
+    summary("memory hit", hits)
+    summary("disk hit", disk)
+
+
+if __name__ == "__main__":
+    main()
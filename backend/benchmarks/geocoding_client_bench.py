@@ -0,0 +1,183 @@
+"""
+Geocoding client latency and throughput against a local OpenCage stub.
+
+The stub answers every lookup after LATENCY_MS and charges HANDSHAKE_MS
+once per new connection (standing in for the TCP + TLS setup to the real
+API). CALLS reverse lookups are made by N concurrent callers, each
+calling in a loop:
+
+- before: a one-off urlopen per call from a thread pool, as the old
+  `requests.get` modules did (a new connection every time, no retries);
+- after:  the shared GeocodingClient with the same concurrency
+  (pooled keep-alive connections, jittered retries);
+- batch:  one reverse_many call with every point.
+
+A last round makes 10% of stub responses 503 to show the retries.
+
+Run from backend/:
+    python -m benchmarks.geocoding_client_bench
+"""
+
+import asyncio
+import json
+import random
+import statistics
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+from services.geocoding import GeocodingClient
+
+CALLS = 400
+LATENCY_MS = 40
+HANDSHAKE_MS = 30
+CONCURRENCY = (10, 20)
+FAIL_RATE = 0.1
+
+BODY = json.dumps({
+    "results": [{
+        "formatted": "Stub Road, Mumbai, India",
+        "components": {"city": "Mumbai", "state": "Maharashtra", "country": "India"},
+        "geometry": {"lat": 19.07, "lng": 72.87},
+    }]
+}).encode()
+
+
+class StubServer:
+    def __init__(self, latency_ms: float = LATENCY_MS, handshake_ms: float = HANDSHAKE_MS):
+        self.latency_ms = latency_ms
+        self.handshake_ms = handshake_ms
+        self.fail_rate = 0.0
+        self.connections = 0
+        self.rng = random.Random(3)
+        self.loop = asyncio.new_event_loop()
+        ready = threading.Event()
+        threading.Thread(target=self._serve, args=(ready,), daemon=True).start()
+        ready.wait()
+
+    def _serve(self, ready):
+        asyncio.set_event_loop(self.loop)
+        server = self.loop.run_until_complete(asyncio.start_server(self._handle, "127.0.0.1", 0))
+        self.url = "http://127.0.0.1:%d/geocode/v1/json" % server.sockets[0].getsockname()[1]
+        ready.set()
+        self.loop.run_forever()
+
+    async def _handle(self, reader, writer):
+        self.connections += 1
+        await asyncio.sleep(self.handshake_ms / 1000)
+        try:
+            while True:
+                await reader.readuntil(b"\r\n\r\n")
+                await asyncio.sleep(self.latency_ms / 1000)
+                if self.rng.random() < self.fail_rate:
+                    status, body = b"503 Service Unavailable", b"{}"
+                else:
+                    status, body = b"200 OK", BODY
+                writer.write(
+                    b"HTTP/1.1 " + status + b"\r\nContent-Type: application/json\r\n"
+                    b"Content-Length: " + str(len(body)).encode() + b"\r\n\r\n" + body
+                )
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+
+def points(n):
+    rng = random.Random(n)
+    return [(19.0 + rng.random() / 10, 72.8 + rng.random() / 10) for _ in range(n)]
+
+
+def report(label, timings, errors, wall, stub, before_conns):
+    ok = len(timings)
+    line = f"  {label:<24} {ok / wall:>7.0f} req/s"
+    if timings:
+        q = statistics.quantiles(timings, n=100)
+        line += f"  p50 {q[49]:>6.1f} ms  p95 {q[94]:>6.1f} ms"
+    line += f"  errors {errors:>3}  connections {stub.connections - before_conns:>4}"
+    print(line)
+
+
+def run_before(stub, concurrency):
+    pts = points(CALLS)
+    timings, errors = [], 0
+    lock = threading.Lock()
+
+    def caller(chunk):
+        nonlocal errors
+        for lat, lng in chunk:
+            started = time.perf_counter()
+            try:
+                query = urllib.parse.urlencode({"q": f"{lat},{lng}", "key": "x"})
+                with urllib.request.urlopen(f"{stub.url}?{query}", timeout=10) as res:
+                    json.loads(res.read())
+            except urllib.error.URLError:
+                with lock:
+                    errors += 1
+                continue
+            with lock:
+                timings.append((time.perf_counter() - started) * 1000)
+
+    conns = stub.connections
+    started = time.perf_counter()
+    with ThreadPoolExecutor(concurrency) as pool:
+        list(pool.map(caller, [pts[i::concurrency] for i in range(concurrency)]))
+    report(f"before  c={concurrency}", timings, errors, time.perf_counter() - started, stub, conns)
+
+
+def run_after(stub, concurrency):
+    client = GeocodingClient(base_url=stub.url, api_key="x", concurrency=concurrency)
+    pts = points(CALLS)
+    timings, errors = [], 0
+
+    async def caller(chunk):
+        nonlocal errors
+        for lat, lng in chunk:
+            started = time.perf_counter()
+            try:
+                await client.reverse(lat, lng)
+            except Exception:
+                errors += 1
+                continue
+            timings.append((time.perf_counter() - started) * 1000)
+
+    async def main():
+        await asyncio.gather(*(caller(pts[i::concurrency]) for i in range(concurrency)))
+
+    conns = stub.connections
+    started = time.perf_counter()
+    asyncio.run(main())
+    report(f"after   c={concurrency}", timings, errors, time.perf_counter() - started, stub, conns)
+
+    conns = stub.connections
+    started = time.perf_counter()
+    results = asyncio.run(client.reverse_many(pts))
+    errors = sum(isinstance(r, BaseException) for r in results)
+    wall = time.perf_counter() - started
+    print(
+        f"  {f'batch   c={concurrency}':<24} {(len(results) - errors) / wall:>7.0f} req/s"
+        f"  {'':<25}  errors {errors:>3}  connections {stub.connections - conns:>4}"
+        f"  (retried {client.retried})"
+    )
+    client.close()
+
+
+def main():
+    stub = StubServer()
+    print(f"{CALLS} reverse lookups, stub latency {LATENCY_MS} ms + {HANDSHAKE_MS} ms per new connection")
+    for concurrency in CONCURRENCY:
+        run_before(stub, concurrency)
+        run_after(stub, concurrency)
+
+    stub.fail_rate = FAIL_RATE
+    print(f"with {FAIL_RATE:.0%} of responses 503:")
+    run_before(stub, CONCURRENCY[0])
+    run_after(stub, CONCURRENCY[0])
+
+
+if __name__ == "__main__":
+    main()
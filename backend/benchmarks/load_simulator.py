@@ -0,0 +1,441 @@
+"""
+Load simulator: a synthetic city driven through the real app (main.app).
+
+Seeds --providers providers (approved, online, clustered around a few
+neighbourhood hotspots) and --customers customers straight into the
+database, then for --duration seconds drives the HTTP API in-process
+(httpx ASGI transport, inside the app's startup/shutdown so presence
+flushing, dispatch and enrichment run as in production):
+
+- every provider pings /provider/providers/location every
+  --ping-interval s (idle: a few metres of GPS jitter; on a job: driving
+  to the customer), polls /provider/incoming every --poll-interval s
+  while free and accepts the first request, then walks the job through
+  en_route -> arrived -> payment -> completed, --job-step s apart;
+- customers arrive as a Poisson process at --rate per second and POST
+  /requests. An --image-share of them first send a photo to
+  /ai/analyze-image; a --manual-share pick a provider themselves
+  (/customer/nearby-providers + assign-provider); the rest wait for
+  automatic dispatch. They poll GET /requests/{id} and cancel if nobody
+  accepted within --patience s;
+- --applicants more providers (not yet approved) each submit KYC
+  documents to /provider/kyc/upload once, spread over the run.
+
+Reports per endpoint: calls, 2xx / 4xx / 5xx (exceptions count as 5xx),
+throughput and p50/p95/p99/max latency, plus request outcomes (time to
+acceptance, completed, cancelled). Latency is measured in the client,
+which shares the process (and CPU) with the app.
+
+Database: a fresh SQLite file by default, or --database-url (e.g. a
+disposable local Postgres); the simulator seeds into it. Other settings
+come from the app's .env as usual. OpenCage, Groq, Cloudinary and
+Supabase are the in-process fakes from services.fakes (FAKE_SERVICES=all,
+so no credentials or network are needed) unless --real-services; tune
+them with the FAKE_<NAME>_LATENCY_MS / FAKE_<NAME>_FAILURE_RATE
+variables, e.g.
+    FAKE_GROQ_LATENCY_MS=2000,6000 FAKE_CLOUDINARY_FAILURE_RATE=0.05
+
+Run from backend/:
+    python -m benchmarks.load_simulator --providers 300 --customers 1000 --rate 5 --duration 60
+
+That run with the other flags at their defaults (20 KYC applicants, fake
+services) gave ~200 req/s with no 5xx; location pings p50 2.8 ms, p99
+36 ms; POST /requests p50 8.7 ms, p99 34 ms. A millisecond-scale p50
+needs every route that calls a blocking SDK to run off the event loop:
+before upload_kyc moved to the threadpool, the same flags put pings at
+p50 2.6 s.
+"""
+
+import argparse
+import asyncio
+import math
+import os
+import random
+import statistics
+import tempfile
+import time
+from collections import Counter, defaultdict
+
+CENTER = (19.0760, 72.8777)
+SERVICE_TYPES = ["AC Repair", "Electrician", "Plumber", "Cleaner", "Carpenter", "Painter"]
+KM_PER_DEG = 111.0
+JITTER_KM = 0.004
+DRIVE_KMH = 25.0
+JOB_STEPS = ("en_route", "arrived", "payment", "completed")
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.load_simulator")
+    parser.add_argument("--providers", type=int, default=200)
+    parser.add_argument("--customers", type=int, default=500)
+    parser.add_argument("--rate", type=float, default=2.0, help="New requests per second")
+    parser.add_argument("--duration", type=float, default=60.0, help="Seconds of load")
+    parser.add_argument("--ping-interval", type=float, default=5.0)
+    parser.add_argument("--poll-interval", type=float, default=10.0)
+    parser.add_argument("--job-step", type=float, default=5.0)
+    parser.add_argument("--patience", type=float, default=45.0)
+    parser.add_argument("--manual-share", type=float, default=0.3)
+    parser.add_argument("--image-share", type=float, default=0.2, help="Customers who analyze a photo first")
+    parser.add_argument("--applicants", type=int, default=20, help="Providers uploading KYC during the run")
+    parser.add_argument("--city-km", type=float, default=20.0, help="Width of the city")
+    parser.add_argument("--hotspots", type=int, default=6)
+    parser.add_argument("--seed", type=int, default=22)
+    parser.add_argument("--database-url", default=None, help="Default: a fresh SQLite file")
+    parser.add_argument("--real-services", action="store_true", help="Use the real external services, not the fakes")
+    return parser.parse_args()
+
+
+# =====================================================
+# SYNTHETIC CITY
+# =====================================================
+class City:
+    """
+    Points cluster around hotspots (Gaussian, ~1/8 of the city wide)
+    with some spread uniformly over the whole square.
+    """
+
+    def __init__(self, rng: random.Random, width_km: float, hotspots: int):
+        self.rng = rng
+        self.half_deg = width_km / 2 / KM_PER_DEG
+        self.sigma_deg = width_km / 8 / KM_PER_DEG
+        self.hotspots = [self._uniform() for _ in range(hotspots)]
+
+    def _uniform(self):
+        return (
+            CENTER[0] + self.rng.uniform(-self.half_deg, self.half_deg),
+            CENTER[1] + self.rng.uniform(-self.half_deg, self.half_deg),
+        )
+
+    def point(self):
+        if self.rng.random() < 0.2:
+            return self._uniform()
+        lat, lng = self.rng.choice(self.hotspots)
+        return lat + self.rng.gauss(0, self.sigma_deg), lng + self.rng.gauss(0, self.sigma_deg)
+
+    def jitter(self, lat, lng):
+        d = JITTER_KM / KM_PER_DEG
+        return lat + self.rng.uniform(-d, d), lng + self.rng.uniform(-d, d)
+
+
+def drive(lat, lng, to_lat, to_lng, seconds):
+    """
+    Move towards (to_lat, to_lng) at DRIVE_KMH for `seconds`.
+    """
+    dlat, dlng = to_lat - lat, (to_lng - lng) * math.cos(math.radians(lat))
+    dist_km = math.hypot(dlat, dlng) * KM_PER_DEG
+    step_km = DRIVE_KMH * seconds / 3600
+    if dist_km <= step_km:
+        return to_lat, to_lng
+    f = step_km / dist_km
+    return lat + (to_lat - lat) * f, lng + (to_lng - lng) * f
+
+
+# =====================================================
+# MEASUREMENT
+# =====================================================
+class Recorder:
+    def __init__(self, client):
+        self.client = client
+        self.latency = defaultdict(list)
+        self.codes = defaultdict(Counter)
+
+    async def call(self, label, method, url, token, **kwargs):
+        started = time.perf_counter()
+        try:
+            res = await self.client.request(
+                method, url, headers={"Authorization": f"Bearer {token}"}, **kwargs
+            )
+        except Exception:
+            res = None
+        self.latency[label].append((time.perf_counter() - started) * 1000)
+        code = res.status_code if res is not None else 599
+        self.codes[label][f"{code // 100}xx"] += 1
+        return res if res is not None and res.status_code < 400 else None
+
+    def report(self, seconds):
+        print(
+            f"  {'endpoint':<38} {'calls':>6} {'2xx':>6} {'4xx':>5} {'5xx':>5} {'req/s':>7} "
+            f"{'p50 ms':>7} {'p95 ms':>7} {'p99 ms':>7} {'max ms':>7}"
+        )
+        for label in sorted(self.latency):
+            values = self.latency[label]
+            p50, p95, p99 = percentiles(values)
+            codes = self.codes[label]
+            print(
+                f"  {label:<38} {len(values):>6} {codes['2xx']:>6} {codes['4xx']:>5} {codes['5xx']:>5} "
+                f"{len(values) / seconds:>7.1f} {p50:>7.1f} {p95:>7.1f} {p99:>7.1f} {max(values):>7.1f}"
+            )
+
+
+def percentiles(values):
+    """
+    p50, p95, p99 interpolated within the observed values, so they never
+    exceed the max; a single sample is all three.
+    """
+    if len(values) == 1:
+        return values[0], values[0], values[0]
+    q = statistics.quantiles(values, n=100, method="inclusive")
+    return q[49], q[94], q[98]
+
+
+def quantile_line(values):
+    if not values:
+        return "n/a"
+    p50, p95, _ = percentiles(values)
+    return f"p50 {p50:.1f} s  p95 {p95:.1f} s"
+
+
+# =====================================================
+# SEEDING
+# =====================================================
+def seed(engine, rng, city, n_providers, n_customers, n_applicants):
+    """
+    Insert the fleet, the customers and the KYC applicants; returns
+    [(provider_id, user_id, token, lat, lng)], [(user_id, token)] and
+    [token].
+    """
+    from sqlalchemy.orm import Session
+
+    import models
+    from auth_utils import create_access_token, get_password_hash
+
+    tag = f"sim{int(time.time())}"
+    password = get_password_hash("simulated")
+    with Session(engine, expire_on_commit=False) as db:
+        users = [
+            models.User(
+                full_name=f"Provider {i}", email=f"{tag}-p{i}@example.com",
+                hashed_password=password, role="provider",
+            )
+            for i in range(n_providers)
+        ] + [
+            models.User(
+                full_name=f"Customer {i}", email=f"{tag}-c{i}@example.com",
+                hashed_password=password, role="customer",
+            )
+            for i in range(n_customers)
+        ] + [
+            models.User(
+                full_name=f"Applicant {i}", email=f"{tag}-a{i}@example.com",
+                hashed_password=password, role="provider",
+            )
+            for i in range(n_applicants)
+        ]
+        db.add_all(users)
+        db.flush()
+        providers = [
+            models.Provider(
+                user_id=u.id, service_type=rng.choice(SERVICE_TYPES),
+                base_price=rng.randrange(300, 1500, 50), rating=round(rng.uniform(3.5, 5), 1),
+                jobs_completed=rng.randrange(200), is_online=True, kyc_status="approved",
+            )
+            for u in users[:n_providers]
+        ]
+        db.add_all(providers)
+        applicants = users[n_providers + n_customers:]
+        db.add_all(models.Customer(user_id=u.id) for u in users[n_providers:n_providers + n_customers])
+        db.add_all(models.Provider(user_id=u.id, service_type=rng.choice(SERVICE_TYPES)) for u in applicants)
+        db.commit()
+        fleet = [
+            (p.id, p.user_id, create_access_token(user_id=p.user_id, role="provider"), *city.point())
+            for p in providers
+        ]
+        customers = [
+            (u.id, create_access_token(user_id=u.id, role="customer"))
+            for u in users[n_providers:n_providers + n_customers]
+        ]
+        tokens = [create_access_token(user_id=u.id, role="provider") for u in applicants]
+    return fleet, customers, tokens
+
+
+# =====================================================
+# AGENTS
+# =====================================================
+async def provider_agent(rec, args, rng, city, stop, provider):
+    _, _, token, lat, lng = provider
+    job = None  # [request_id, customer_lat, customer_lng, step, next_step_at]
+    next_poll = time.monotonic() + rng.uniform(0, args.poll_interval)
+    await asyncio.sleep(rng.uniform(0, args.ping_interval))
+    while not stop.is_set():
+        if job and job[1] is not None:
+            lat, lng = drive(lat, lng, job[1], job[2], args.ping_interval)
+        else:
+            lat, lng = city.jitter(lat, lng)
+        await rec.call(
+            "POST /provider/providers/location", "POST", "/provider/providers/location", token,
+            json={"latitude": lat, "longitude": lng},
+        )
+
+        now = time.monotonic()
+        if job is None and now >= next_poll:
+            next_poll = now + args.poll_interval
+            res = await rec.call("GET /provider/incoming", "GET", "/provider/incoming", token)
+            items = res.json() if res is not None else []
+            if items:
+                rid = items[0]["id"]
+                accepted = await rec.call(
+                    "POST /provider/requests/{id}/accept", "POST",
+                    f"/provider/requests/{rid}/accept", token,
+                )
+                if accepted is not None:
+                    detail = await rec.call(
+                        "GET /provider/requests/{id}", "GET", f"/provider/requests/{rid}", token
+                    )
+                    body = detail.json() if detail is not None else {}
+                    job = [rid, body.get("customer_lat"), body.get("customer_lng"), 0, now + args.job_step]
+        elif job is not None and now >= job[4]:
+            res = await rec.call(
+                "POST /provider/requests/{id}/status", "POST",
+                f"/provider/requests/{job[0]}/status", token, json={"status": JOB_STEPS[job[3]]},
+            )
+            if res is None or JOB_STEPS[job[3]] == "completed":
+                job = None
+            else:
+                job[3] += 1
+                job[4] = now + args.job_step
+
+        await asyncio.sleep(args.ping_interval * rng.uniform(0.9, 1.1))
+
+
+async def customer_flow(rec, args, rng, city, customer, outcomes, waits):
+    _, token = customer
+    lat, lng = city.point()
+    service_type = rng.choice(SERVICE_TYPES)
+    res = await rec.call(
+        "POST /requests", "POST", "/requests", token,
+        json={
+            "title": f"{service_type} job",
+            "service_type": service_type,
+            "address": f"{rng.randrange(1, 300)} Simulated Road",
+            "budget": rng.randrange(400, 1500, 100),
+            "customer_lat": lat,
+            "customer_lng": lng,
+        },
+    )
+    if res is None:
+        outcomes["create failed"] += 1
+        return
+    rid = res.json()["id"]
+    created = time.monotonic()
+    outcomes["created"] += 1
+
+    if rng.random() < args.image_share:
+        await rec.call(
+            "POST /ai/analyze-image", "POST", "/ai/analyze-image", token,
+            files={"image": ("photo.jpg", rng.randbytes(48_000), "image/jpeg")},
+        )
+
+    if rng.random() < args.manual_share:
+        res = await rec.call(
+            "GET /customer/nearby-providers", "GET", "/customer/nearby-providers", token,
+            params={"service_type": service_type, "lat": lat, "lng": lng, "limit": 5},
+        )
+        items = res.json().get("items", []) if res is not None else []
+        if items:
+            await rec.call(
+                "POST /requests/{id}/assign-provider", "POST",
+                f"/requests/{rid}/assign-provider", token,
+                json={"provider_id": items[0]["provider_id"]},
+            )
+
+    accepted = False
+    while True:
+        await asyncio.sleep(args.poll_interval / 2 * rng.uniform(0.8, 1.2))
+        res = await rec.call("GET /requests/{id}", "GET", f"/requests/{rid}", token)
+        status = res.json().get("status") if res is not None else None
+        if status not in (None, "pending", "cancelled") and not accepted:
+            accepted = True
+            outcomes["accepted"] += 1
+            waits.append(time.monotonic() - created)
+        if status in ("completed", "cancelled"):
+            outcomes[status] += 1
+            return
+        if not accepted and time.monotonic() - created > args.patience:
+            if await rec.call(
+                "POST /requests/{id}/cancel", "POST", f"/requests/{rid}/cancel", token
+            ) is not None:
+                outcomes["cancelled (no provider)"] += 1
+                return
+
+
+async def kyc_applicant(rec, args, rng, token):
+    await asyncio.sleep(rng.uniform(0, args.duration))
+    await rec.call(
+        "POST /provider/kyc/upload", "POST", "/provider/kyc/upload", token,
+        data={"id_number": f"ID{rng.randrange(10**8)}", "address_line": "Simulated Road"},
+        files={
+            "id_proof": ("id.jpg", rng.randbytes(150_000), "image/jpeg"),
+            "address_proof": ("bill.pdf", rng.randbytes(200_000), "application/pdf"),
+            "profile_photo": ("me.jpg", rng.randbytes(80_000), "image/jpeg"),
+        },
+    )
+
+
+async def run(args):
+    import httpx
+
+    import main
+    from database import engine
+    from migrations import upgrade as run_migrations
+
+    # The app migrates in its lifespan; the schema is needed before that to seed
+    run_migrations(engine)
+    rng = random.Random(args.seed)
+    city = City(rng, args.city_km, args.hotspots)
+    started = time.perf_counter()
+    fleet, customers, applicants = seed(engine, rng, city, args.providers, args.customers, args.applicants)
+    print(
+        f"seeded {len(fleet)} providers, {len(customers)} customers, {len(applicants)} KYC applicants over a "
+        f"{args.city_km:g} km city in {time.perf_counter() - started:.1f} s"
+    )
+
+    outcomes, waits = Counter(), []
+    stop = asyncio.Event()
+    transport = httpx.ASGITransport(app=main.app)
+    async with main.app.router.lifespan_context(main.app):
+        async with httpx.AsyncClient(transport=transport, base_url="http://sim", timeout=60) as client:
+            rec = Recorder(client)
+            agents = [
+                asyncio.create_task(provider_agent(rec, args, rng, city, stop, p)) for p in fleet
+            ] + [asyncio.create_task(kyc_applicant(rec, args, rng, t)) for t in applicants]
+            flows, idle = set(), list(customers)
+            rng.shuffle(idle)
+            load_started = time.perf_counter()
+            deadline = time.monotonic() + args.duration
+            while time.monotonic() < deadline:
+                await asyncio.sleep(rng.expovariate(args.rate))
+                if not idle:
+                    outcomes["arrivals dropped (all customers busy)"] += 1
+                    continue
+                customer = idle.pop()
+                task = asyncio.create_task(customer_flow(rec, args, rng, city, customer, outcomes, waits))
+                flows.add(task)
+                task.add_done_callback(lambda t, c=customer: (flows.discard(t), idle.insert(0, c)))
+
+            stop.set()
+            elapsed = time.perf_counter() - load_started
+            open_flows = len(flows)
+            for task in (*agents, *flows):
+                task.cancel()
+            await asyncio.gather(*agents, *flows, return_exceptions=True)
+
+    print(
+        f"{args.duration:g} s at {args.rate:g} requests/s, ping every {args.ping_interval:g} s, "
+        f"{args.manual_share:.0%} manual assignment, {args.image_share:.0%} photo analysis, "
+        f"{'real' if args.real_services else 'fake'} external services"
+    )
+    rec.report(elapsed)
+    print(f"  outcomes: {dict(outcomes)}, still open at the end: {open_flows}")
+    print(f"  time to acceptance: {quantile_line(waits)}")
+
+
+def main():
+    args = parse_args()
+    os.environ["DATABASE_URL"] = args.database_url or f"sqlite:///{tempfile.mkdtemp()}/sim.db"
+    if not args.real_services:
+        os.environ["FAKE_SERVICES"] = "all"
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+"""
+Query-count regression check for GET /customer/nearby-providers.
+
+Seeds an in-memory SQLite database with a growing number of online
+providers (half of them busy with an active job) and counts the SQL
+statements each nearby search issues. The count must not grow with the
+number of candidates.
+
+Run from backend/:
+    python -m benchmarks.nearby_query_count
+"""
+
+import os
+import random
+
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+import database
+import models
+from auth_utils import create_access_token
+from routers.provider import customer_router
+from services.provider_index import provider_index
+
+CENTER = (19.0760, 72.8777)
+
+
+def build(n_providers: int):
+    engine = create_engine(
+        "sqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    models.Base.metadata.create_all(bind=engine)
+    Session = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+    rng = random.Random(n_providers)
+    db = Session()
+    customer_user = models.User(
+        full_name="Customer", email="c@example.com", hashed_password="x", role="customer"
+    )
+    db.add(customer_user)
+    db.flush()
+    customer = models.Customer(user_id=customer_user.id)
+    db.add(customer)
+    db.flush()
+
+    for i in range(n_providers):
+        u = models.User(
+            full_name=f"Provider {i}",
+            email=f"p{i}@example.com",
+            hashed_password="x",
+            role="provider",
+        )
+        db.add(u)
+        db.flush()
+        p = models.Provider(
+            user_id=u.id,
+            service_type="Plumber",
+            base_price=500,
+            is_online=True,
+            kyc_status="approved",
+        )
+        db.add(p)
+        db.flush()
+        db.add(
+            models.ProviderLocation(
+                provider_id=p.id,
+                latitude=CENTER[0] + rng.uniform(-0.02, 0.02),
+                longitude=CENTER[1] + rng.uniform(-0.02, 0.02),
+            )
+        )
+        if i % 2:
+            db.add(
+                models.Request(
+                    customer_id=customer.id,
+                    provider_id=p.id,
+                    title="Leak",
+                    service_type="Plumber",
+                    status="en_route",
+                )
+            )
+    db.commit()
+    customer_user_id = customer_user.id
+    db.close()
+
+    def get_db():
+        s = Session()
+        try:
+            yield s
+        finally:
+            s.close()
+
+    app = FastAPI()
+    app.include_router(customer_router)
+    app.dependency_overrides[database.get_db] = get_db
+
+    provider_index.load(Session())
+    token = create_access_token(user_id=customer_user_id, role="customer")
+    return engine, TestClient(app), {"Authorization": f"Bearer {token}"}
+
+
+def count_queries(n_providers: int, params: dict):
+    engine, client, headers = build(n_providers)
+    statements = []
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _count(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    res = client.get("/customer/nearby-providers", params=params, headers=headers)
+    res.raise_for_status()
+    return len(statements), len(res.json()["items"])
+
+
+def main():
+    for label, params in (
+        ("no location", {"service_type": "Plumber", "limit": 50}),
+        ("with lat/lng", {"service_type": "Plumber", "limit": 50, "lat": CENTER[0], "lng": CENTER[1]}),
+    ):
+        counts = set()
+        for n in (10, 50, 200):
+            queries, items = count_queries(n, params)
+            counts.add(queries)
+            print(f"{label:>12}: {n:>4} providers -> {queries} queries, {items} items")
+        assert len(counts) == 1, f"query count grows with candidates: {sorted(counts)}"
+    print("OK: constant query count")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,160 @@
+"""
+First-accept-wins under contention.
+
+REQUESTS pending requests, each offered to OFFERS_PER_REQUEST providers
+(services.offers) on a temporary SQLite database. For every request all
+of its providers accept at the same moment from their own threads
+(released together by a barrier). Compared with the read-then-write
+accept a naive handler would do (SELECT the request, check it is
+pending, UPDATE it), it reports:
+
+- how many requests ended with exactly one winner / more than one;
+- statements per accept (one UPDATE ... RETURNING, plus closing the
+  other offers for the winner);
+- accept latency.
+
+Run from backend/:
+    python -m benchmarks.offer_accept_race
+"""
+
+import os
+import statistics
+import tempfile
+import threading
+import time
+from collections import Counter
+
+TMP = tempfile.mkdtemp()
+os.environ["DATABASE_URL"] = f"sqlite:///{TMP}/bench.db"
+
+from sqlalchemy import create_engine, event, text
+
+import models
+from services import offers
+
+REQUESTS = 200
+OFFERS_PER_REQUEST = 4
+TIMEOUT_S = 30
+
+
+def setup(engine):
+    models.Base.metadata.drop_all(bind=engine)
+    models.Base.metadata.create_all(bind=engine)
+    n_providers = REQUESTS * OFFERS_PER_REQUEST
+    with engine.begin() as conn:
+        # Table inserts so column defaults apply
+        conn.execute(
+            models.User.__table__.insert(),
+            [{"id": 1, "full_name": "Customer", "email": "c@example.com", "hashed_password": "x", "role": "customer"}]
+            + [
+                {"id": i + 2, "full_name": f"P{i}", "email": f"p{i}@example.com", "hashed_password": "x", "role": "provider"}
+                for i in range(n_providers)
+            ],
+        )
+        conn.execute(models.Customer.__table__.insert(), [{"id": 1, "user_id": 1}])
+        conn.execute(
+            models.Provider.__table__.insert(),
+            [{"id": i + 1, "user_id": i + 2, "service_type": "Plumber", "base_price": 500} for i in range(n_providers)],
+        )
+        conn.execute(
+            models.Request.__table__.insert(),
+            [
+                {"id": rid, "customer_id": 1, "title": "Leak", "service_type": "Plumber", "status": "pending", "budget": 400}
+                for rid in range(1, REQUESTS + 1)
+            ],
+        )
+        offers.create(
+            conn,
+            (
+                (rid, (rid - 1) * OFFERS_PER_REQUEST + k + 1, k)
+                for rid in range(1, REQUESTS + 1)
+                for k in range(OFFERS_PER_REQUEST)
+            ),
+            TIMEOUT_S,
+        )
+
+
+def conditional_accept(engine, rid, pid):
+    with engine.begin() as conn:
+        row, _ = offers.accept(conn, rid, pid)
+    return row is not None
+
+
+def naive_accept(engine, rid, pid):
+    with engine.begin() as conn:
+        status = conn.execute(text("SELECT status FROM requests WHERE id = :id"), {"id": rid}).scalar()
+        if status != "pending":
+            return False
+        time.sleep(0.001)  # the handler's own work between read and write
+        conn.execute(
+            text("UPDATE requests SET status = 'assigned', provider_id = :pid WHERE id = :id"),
+            {"pid": pid, "id": rid},
+        )
+    return True
+
+
+def race(engine, accept):
+    statements = Counter()
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def count(conn, cursor, statement, parameters, context, executemany):
+        statements[threading.get_ident()] += 1
+
+    wins, latencies, lock = Counter(), [], threading.Lock()
+    per_accept = []
+
+    def worker(rid, pid, barrier):
+        barrier.wait()
+        before = statements[threading.get_ident()]
+        started = time.perf_counter()
+        won = accept(engine, rid, pid)
+        elapsed = (time.perf_counter() - started) * 1000
+        with lock:
+            latencies.append(elapsed)
+            per_accept.append(statements[threading.get_ident()] - before)
+            if won:
+                wins[rid] += 1
+
+    started = time.perf_counter()
+    for rid in range(1, REQUESTS + 1):
+        barrier = threading.Barrier(OFFERS_PER_REQUEST)
+        threads = [
+            threading.Thread(target=worker, args=(rid, (rid - 1) * OFFERS_PER_REQUEST + k + 1, barrier))
+            for k in range(OFFERS_PER_REQUEST)
+        ]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+    total_s = time.perf_counter() - started
+    event.remove(engine, "before_cursor_execute", count)
+    return wins, latencies, per_accept, total_s
+
+
+def report(label, engine, result):
+    wins, latencies, per_accept, total_s = result
+    single = sum(1 for rid in range(1, REQUESTS + 1) if wins[rid] == 1)
+    multi = sum(1 for rid in range(1, REQUESTS + 1) if wins[rid] > 1)
+    q = statistics.quantiles(latencies, n=100)
+    with engine.connect() as conn:
+        live = conn.execute(text("SELECT COUNT(*) FROM request_offers WHERE status = 'offered'")).scalar()
+    print(
+        f"  {label:<12} one winner {single:>4}/{REQUESTS}  several winners {multi:>4}  "
+        f"statements/accept {statistics.mean(per_accept):.2f}  "
+        f"p50 {q[49]:5.1f} ms  p95 {q[94]:5.1f} ms  {REQUESTS * OFFERS_PER_REQUEST / total_s:,.0f} accepts/s  "
+        f"offers left live {live}"
+    )
+    return multi
+
+
+if __name__ == "__main__":
+    engine = create_engine(
+        os.environ["DATABASE_URL"],
+        connect_args={"check_same_thread": False, "timeout": 30},
+        pool_size=OFFERS_PER_REQUEST,
+    )
+    print(f"{REQUESTS} requests x {OFFERS_PER_REQUEST} simultaneous accepts each")
+    setup(engine)
+    report("read/write", engine, race(engine, naive_accept))
+    setup(engine)
+    assert report("conditional", engine, race(engine, conditional_accept)) == 0
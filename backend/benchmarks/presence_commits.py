@@ -0,0 +1,138 @@
+"""
+Commits per second for provider location pings, before and after the
+write-coalescing presence store.
+
+Simulates a fleet of online providers, each pinging every
+PING_INTERVAL seconds for SIM_SECONDS of simulated time, against a
+SQLite file database:
+
+  before  the old endpoint body: read the provider, update
+          providers.last_latitude/last_longitude, commit
+  after   services.presence.record_ping + a flush every FLUSH_SECONDS
+          (provider_locations upsert + trail insert)
+
+Run from backend/:
+    python -m benchmarks.presence_commits
+"""
+
+import os
+import tempfile
+import time
+
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.orm import sessionmaker
+
+import models
+from services.presence import FLUSH_SECONDS, presence, record_ping
+
+PING_INTERVAL = 3
+SIM_SECONDS = 60
+CENTER = (19.0760, 72.8777)
+
+
+def build(path: str, n_providers: int):
+    engine = create_engine(f"sqlite:///{path}")
+    models.Base.metadata.create_all(bind=engine)
+    Session = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+    db = Session()
+    user_ids = []
+    for i in range(n_providers):
+        u = models.User(
+            full_name=f"Provider {i}",
+            email=f"p{i}@example.com",
+            hashed_password="x",
+            role="provider",
+        )
+        db.add(u)
+        db.flush()
+        p = models.Provider(
+            user_id=u.id,
+            service_type="Plumber",
+            kyc_status="approved",
+            is_online=True,
+            last_latitude=CENTER[0],
+            last_longitude=CENTER[1],
+        )
+        db.add(p)
+        db.flush()
+        db.add(models.ProviderLocation(provider_id=p.id, latitude=CENTER[0], longitude=CENTER[1]))
+        user_ids.append(u.id)
+    db.commit()
+    db.close()
+
+    commits = [0]
+    event.listen(engine, "commit", lambda conn: commits.__setitem__(0, commits[0] + 1))
+    return engine, Session, user_ids, commits
+
+
+def pings(user_ids):
+    """(sim_second, user_id, lat, lng) for the whole simulated window."""
+    for t in range(SIM_SECONDS):
+        for i, uid in enumerate(user_ids):
+            if i % PING_INTERVAL == t % PING_INTERVAL:
+                yield t, uid, CENTER[0] + t * 1e-4, CENTER[1] + i * 1e-5
+
+
+def run_before(Session, user_ids):
+    db = Session()
+    for _, uid, lat, lng in pings(user_ids):
+        provider = db.query(models.Provider).filter(models.Provider.user_id == uid).first()
+        provider.last_latitude = lat
+        provider.last_longitude = lng
+        db.commit()
+    db.close()
+
+
+def run_after(engine, Session, user_ids):
+    presence.__init__()  # fresh caches per run
+    db = Session()
+    next_flush = FLUSH_SECONDS
+    for t, uid, lat, lng in pings(user_ids):
+        if t >= next_flush:
+            presence.flush(engine)
+            next_flush += FLUSH_SECONDS
+        record_ping(db, uid, lat, lng, True)
+    presence.flush(engine)
+    db.close()
+
+
+def measure(label, n_providers, runner):
+    with tempfile.TemporaryDirectory() as tmp:
+        engine, Session, user_ids, commits = build(os.path.join(tmp, "bench.db"), n_providers)
+        n_pings = sum(1 for _ in pings(user_ids))
+
+        started = time.perf_counter()
+        if runner is run_after:
+            runner(engine, Session, user_ids)
+        else:
+            runner(Session, user_ids)
+        elapsed = time.perf_counter() - started
+
+        with engine.connect() as conn:
+            moved = conn.execute(
+                text(
+                    "SELECT (SELECT COUNT(*) FROM providers WHERE last_latitude <> :lat)"
+                    " + (SELECT COUNT(*) FROM provider_locations WHERE latitude <> :lat)"
+                ),
+                {"lat": CENTER[0]},
+            ).scalar()
+        engine.dispose()
+
+    print(
+        f"{label:>6} {n_providers:>6} providers  {n_pings:>7} pings  "
+        f"{commits[0]:>7} commits  {commits[0] / SIM_SECONDS:>8.1f} commits/s  "
+        f"{n_pings / elapsed:>9.0f} pings/s wall  {moved} rows moved"
+    )
+
+
+if __name__ == "__main__":
+    print(
+        f"ping every {PING_INTERVAL}s, {SIM_SECONDS}s simulated, "
+        f"flush every {FLUSH_SECONDS:g}s"
+    )
+    for n in (300, 1500):
+        measure("before", n, run_before)
+        measure("after", n, run_after)
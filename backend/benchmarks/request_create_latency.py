@@ -0,0 +1,145 @@
+"""
+POST /requests latency with address enrichment in the background.
+
+Creates REQUESTS requests (location, no address) at ARRIVALS_PER_SECOND
+against a temporary SQLite database, with OpenCage played by the local
+stub from geocoding_client_bench (UPSTREAM_MS per lookup, 10% of
+responses 503). Reports:
+
+- the POST latency now (database insert only);
+- the reverse-geocode latency create_request used to add inline,
+  measured with the same client on a fresh set of points;
+- the lag until each address lands ("request.updated" published).
+
+Run from backend/:
+    python -m benchmarks.request_create_latency
+"""
+
+import os
+import random
+import statistics
+import tempfile
+import time
+
+TMP = tempfile.mkdtemp()
+os.environ["DATABASE_URL"] = f"sqlite:///{TMP}/bench.db"
+os.environ["GEOCODE_CACHE_PATH"] = f"{TMP}/geocode.sqlite3"
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+import database
+import models
+from auth_utils import create_access_token
+from benchmarks.geocoding_client_bench import StubServer
+from routers.requests import requests_router
+from services import enrichment
+from services.enrichment import address_enricher
+from services.geocoding import geocoder, reverse_geocode_sync
+
+REQUESTS = 200
+ARRIVALS_PER_SECOND = 20
+UPSTREAM_MS = 250
+FAIL_RATE = 0.1
+CENTER = (19.0760, 72.8777)
+
+
+def quantiles(values):
+    q = statistics.quantiles(values, n=100)
+    return f"p50 {q[49]:>7.1f} ms  p95 {q[94]:>7.1f} ms  max {max(values):>7.1f} ms"
+
+
+def main():
+    stub = StubServer(latency_ms=UPSTREAM_MS)
+    stub.fail_rate = FAIL_RATE
+    geocoder.base_url = stub.url
+
+    engine = create_engine(os.environ["DATABASE_URL"], connect_args={"check_same_thread": False})
+    models.Base.metadata.create_all(bind=engine)
+    Session = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+    db = Session()
+    user = models.User(full_name="Customer", email="c@example.com", hashed_password="x", role="customer")
+    db.add(user)
+    db.flush()
+    db.add(models.Customer(user_id=user.id))
+    db.commit()
+    token = create_access_token(user_id=user.id, role="customer")
+    db.close()
+
+    def get_db():
+        s = Session()
+        try:
+            yield s
+        finally:
+            s.close()
+
+    app = FastAPI()
+    app.include_router(requests_router)
+    app.dependency_overrides[database.get_db] = get_db
+    client = TestClient(app)
+    headers = {"Authorization": f"Bearer {token}"}
+
+    # Record when each address lands
+    landed = {}
+    publish = enrichment.hub.publish
+
+    def record(channel, event_type, data):
+        if event_type == "request.updated":
+            landed.setdefault(data["id"], time.perf_counter())
+        publish(channel, event_type, data)
+
+    enrichment.hub.publish = record
+    address_enricher.poll_seconds = 1
+    address_enricher.start(engine)
+
+    rng = random.Random(7)
+    created, post_ms = {}, []
+    for i in range(REQUESTS):
+        payload = {
+            "title": f"Leak {i}",
+            "service_type": "Plumber",
+            "customer_lat": CENTER[0] + rng.uniform(-0.05, 0.05),
+            "customer_lng": CENTER[1] + rng.uniform(-0.05, 0.05),
+        }
+        started = time.perf_counter()
+        res = client.post("/requests", json=payload, headers=headers)
+        done = time.perf_counter()
+        res.raise_for_status()
+        post_ms.append((done - started) * 1000)
+        created[res.json()["id"]] = done
+        time.sleep(max(0.0, 1 / ARRIVALS_PER_SECOND - (done - started)))
+
+    deadline = time.time() + 60
+    while len(landed) < REQUESTS and time.time() < deadline:
+        time.sleep(0.1)
+    address_enricher.stop()
+
+    inline_ms = []
+    for _ in range(REQUESTS // 4):
+        lat, lng = CENTER[0] + rng.uniform(1, 2), CENTER[1] + rng.uniform(1, 2)
+        started = time.perf_counter()
+        try:
+            reverse_geocode_sync(lat, lng)
+        except Exception:
+            pass
+        inline_ms.append((time.perf_counter() - started) * 1000)
+    geocoder.close()
+
+    lag_ms = [(landed[i] - created[i]) * 1000 for i in created if i in landed]
+    with engine.connect() as conn:
+        statuses = dict(conn.exec_driver_sql(
+            "SELECT address_status, COUNT(*) FROM requests GROUP BY address_status"
+        ).all())
+
+    print(f"{REQUESTS} requests at {ARRIVALS_PER_SECOND}/s, upstream {UPSTREAM_MS} ms, {FAIL_RATE:.0%} upstream errors")
+    print(f"  POST /requests       {quantiles(post_ms)}")
+    print(f"  inline geocode (old) {quantiles(inline_ms)}  added to every POST before")
+    print(f"  address lag          {quantiles(lag_ms)}")
+    print(f"  statuses {statuses}, enricher {address_enricher.stats()}, geocoder {geocoder.stats()}")
+
+
+if __name__ == "__main__":
+    main()
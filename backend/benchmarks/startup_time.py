@@ -0,0 +1,86 @@
+"""
+Cold start: how long a fresh worker takes before it can answer /health.
+
+Each run is a new interpreter (as a Render cold start or a new uvicorn
+worker would be) that reports:
+
+- import:  `import main` (app, routers, models);
+- startup: the lifespan hook (migrations, background writers);
+- first /health: the first response once started;
+- whether importing main pulled in an external SDK (groq, supabase,
+  cloudinary) - those should load on first use only.
+
+The first run migrates an empty SQLite database; later runs start
+against the migrated one, like a restart. Prints the median of --runs.
+
+Run from backend/:
+    python -m benchmarks.startup_time --runs 7
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+SDKS = ("groq", "supabase", "cloudinary")
+
+
+async def child():
+    started = time.perf_counter()
+    import main
+
+    imported = time.perf_counter()
+    import httpx
+
+    sdks = [m for m in SDKS if m in sys.modules]
+    transport = httpx.ASGITransport(app=main.app)
+    async with main.app.router.lifespan_context(main.app):
+        ready = time.perf_counter()
+        async with httpx.AsyncClient(transport=transport, base_url="http://startup") as client:
+            res = await client.get("/health")
+        answered = time.perf_counter()
+        assert res.status_code == 200, res.text
+    print(json.dumps({
+        "import": (imported - started) * 1000,
+        "startup": (ready - imported) * 1000,
+        "health": (answered - ready) * 1000,
+        "total": (answered - started) * 1000,
+        "sdks": sdks,
+    }))
+
+
+def spawn(env):
+    out = subprocess.run(
+        [sys.executable, "-m", "benchmarks.startup_time", "--child"],
+        env=env, capture_output=True, text=True, check=True,
+    ).stdout
+    return json.loads(out.strip().splitlines()[-1])
+
+
+def report(label, runs):
+    line = "  ".join(
+        f"{key} {statistics.median(r[key] for r in runs):7.1f} ms"
+        for key in ("import", "startup", "health", "total")
+    )
+    print(f"  {label:<14} {line}  SDKs loaded at import: {runs[0]['sdks'] or 'none'}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.startup_time")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        import asyncio
+
+        asyncio.run(child())
+    else:
+        env = {**os.environ, "DATABASE_URL": f"sqlite:///{tempfile.mkdtemp()}/startup.db"}
+        print(f"median of {args.runs} fresh interpreters")
+        report("empty database", [spawn(env)])
+        report("migrated", [spawn(env) for _ in range(args.runs)])
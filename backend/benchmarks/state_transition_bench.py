@@ -0,0 +1,147 @@
+"""
+Request status transitions: load/check/mutate/commit/refresh vs one
+guarded UPDATE ... RETURNING (services.request_state).
+
+1. Walk REQUESTS requests through pending -> assigned -> en_route ->
+   arrived -> payment -> completed both ways on a temporary SQLite
+   database. Reports statements per transition and latency.
+2. Race: for RACES pending requests a provider accept and a customer
+   cancel run at the same moment. With the old pattern both can
+   "succeed" (the last write wins while both callers were told OK);
+   with guarded transitions exactly one does.
+
+Run from backend/:
+    python -m benchmarks.state_transition_bench
+"""
+
+import os
+import statistics
+import tempfile
+import threading
+import time
+
+TMP = tempfile.mkdtemp()
+os.environ["DATABASE_URL"] = f"sqlite:///{TMP}/bench.db"
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+
+import models
+from services import request_state
+
+REQUESTS = 300
+RACES = 200
+PATH = ("assigned", "en_route", "arrived", "payment", "completed")
+
+
+def setup(engine, n):
+    models.Base.metadata.drop_all(bind=engine)
+    models.Base.metadata.create_all(bind=engine)
+    with engine.begin() as conn:
+        conn.execute(models.User.__table__.insert(), [
+            {"id": 1, "full_name": "C", "email": "c@example.com", "hashed_password": "x", "role": "customer"},
+            {"id": 2, "full_name": "P", "email": "p@example.com", "hashed_password": "x", "role": "provider"},
+        ])
+        conn.execute(models.Customer.__table__.insert(), [{"id": 1, "user_id": 1}])
+        conn.execute(models.Provider.__table__.insert(), [{"id": 1, "user_id": 2, "service_type": "Plumber"}])
+        conn.execute(models.Request.__table__.insert(), [
+            {"id": i, "customer_id": 1, "provider_id": 1, "title": "Leak", "service_type": "Plumber", "status": "pending"}
+            for i in range(1, n + 1)
+        ])
+
+
+def legacy(Session, request_id, to, guard_col, guard_id, expect, pause=0.0):
+    db = Session()
+    try:
+        r = (
+            db.query(models.Request)
+            .filter(models.Request.id == request_id, getattr(models.Request, guard_col) == guard_id)
+            .first()
+        )
+        if r is None or r.status != expect:
+            return False
+        time.sleep(pause)  # the handler's own work between read and write
+        r.status = to
+        db.commit()
+        db.refresh(r)
+        return True
+    finally:
+        db.close()
+
+
+def guarded(engine, request_id, to, guard_col, guard_id):
+    with engine.begin() as conn:
+        row = request_state.transition(
+            conn, request_id, to, where=f"{guard_col} = :gid", params={"gid": guard_id}
+        )
+    return row is not None
+
+
+def walk(engine, Session, label, step):
+    count = [0]
+
+    def counter(*args):
+        count[0] += 1
+
+    event.listen(engine, "before_cursor_execute", counter)
+    latencies = []
+    previous = "pending"
+    for to in PATH:
+        for rid in range(1, REQUESTS + 1):
+            started = time.perf_counter()
+            assert step(rid, to, previous)
+            latencies.append((time.perf_counter() - started) * 1000)
+        previous = to
+    event.remove(engine, "before_cursor_execute", counter)
+    q = statistics.quantiles(latencies, n=100)
+    print(
+        f"  {label:<9} statements/transition {count[0] / len(latencies):.2f}  "
+        f"p50 {q[49]:.2f} ms  p95 {q[94]:.2f} ms"
+    )
+
+
+def race(label, accept, cancel):
+    both = one = 0
+    for rid in range(1, RACES + 1):
+        results, barrier = [], threading.Barrier(2)
+
+        def run(fn):
+            barrier.wait()
+            results.append(fn(rid))
+
+        threads = [threading.Thread(target=run, args=(fn,)) for fn in (accept, cancel)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        both += all(results)
+        one += sum(results) == 1
+    print(f"  {label:<9} exactly one succeeded {one:>4}/{RACES}  both told OK {both:>4}")
+    return both
+
+
+if __name__ == "__main__":
+    engine = create_engine(
+        os.environ["DATABASE_URL"], connect_args={"check_same_thread": False, "timeout": 30}
+    )
+    Session = sessionmaker(bind=engine)
+
+    print(f"{REQUESTS} requests x {len(PATH)} transitions")
+    setup(engine, REQUESTS)
+    walk(engine, Session, "legacy", lambda rid, to, prev: legacy(Session, rid, to, "provider_id", 1, prev))
+    setup(engine, REQUESTS)
+    walk(engine, Session, "guarded", lambda rid, to, prev: guarded(engine, rid, to, "provider_id", 1))
+
+    print(f"{RACES} accept vs cancel races")
+    setup(engine, RACES)
+    race(
+        "legacy",
+        lambda rid: legacy(Session, rid, "assigned", "provider_id", 1, "pending", 0.001),
+        lambda rid: legacy(Session, rid, "cancelled", "customer_id", 1, "pending", 0.001),
+    )
+    setup(engine, RACES)
+    assert race(
+        "guarded",
+        lambda rid: guarded(engine, rid, "assigned", "provider_id", 1),
+        lambda rid: guarded(engine, rid, "cancelled", "customer_id", 1),
+    ) == 0
@@ -0,0 +1,100 @@
+"""
+Trail size and route query time before and after simplification.
+
+Seeds a SQLite file database with JOBS one-hour jobs (a point every
+POINT_SECONDS along a piecewise-straight route with a few metres of GPS
+noise, plus a parked stretch at the customer's address), runs
+services.location_trail.simplify_trail until the backlog is empty and
+reports the row count and the time to load one job's route.
+
+Run from backend/:
+    python -m benchmarks.trail_simplify
+"""
+
+import os
+import random
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+
+from sqlalchemy import create_engine, func
+from sqlalchemy.orm import sessionmaker
+
+import models
+from services.location_trail import SIMPLIFY_EPSILON_M, append_points, route, simplify_trail
+
+JOBS = 200
+POINT_SECONDS = 15
+CENTER = (19.0760, 72.8777)
+NOISE_DEG = 2e-5  # ~2 m
+
+
+def job_points(rng: random.Random, provider_id: int, request_id: int, start: datetime):
+    lat, lng = CENTER[0] + rng.uniform(-0.05, 0.05), CENTER[1] + rng.uniform(-0.05, 0.05)
+    points, t = [], start
+    # 40 min driving in 4 legs, then 20 min parked at the job
+    for _ in range(4):
+        heading_lat, heading_lng = rng.uniform(-1, 1) * 8e-5, rng.uniform(-1, 1) * 8e-5
+        for _ in range(40):
+            lat, lng = lat + heading_lat, lng + heading_lng
+            points.append((provider_id, request_id,
+                           lat + rng.uniform(-NOISE_DEG, NOISE_DEG),
+                           lng + rng.uniform(-NOISE_DEG, NOISE_DEG), t))
+            t += timedelta(seconds=POINT_SECONDS)
+    for _ in range(80):
+        points.append((provider_id, request_id,
+                       lat + rng.uniform(-NOISE_DEG, NOISE_DEG),
+                       lng + rng.uniform(-NOISE_DEG, NOISE_DEG), t))
+        t += timedelta(seconds=POINT_SECONDS)
+    return points
+
+
+def route_ms(Session) -> float:
+    db = Session()
+    started = time.perf_counter()
+    for rid in range(1, JOBS + 1):
+        route(db, rid)
+    elapsed = time.perf_counter() - started
+    db.close()
+    return elapsed / JOBS * 1000
+
+
+def main():
+    rng = random.Random(3)
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_engine(f"sqlite:///{os.path.join(tmp, 'trail.db')}")
+        models.Base.metadata.create_all(bind=engine)
+        Session = sessionmaker(bind=engine)
+
+        start = datetime.utcnow() - timedelta(days=1)
+        with engine.begin() as conn:
+            for rid in range(1, JOBS + 1):
+                append_points(conn, job_points(rng, rid % 50 + 1, rid, start))
+
+        def count():
+            db = Session()
+            n = db.query(func.count(models.ProviderLocationPoint.id)).scalar()
+            db.close()
+            return n
+
+        before, before_ms = count(), route_ms(Session)
+
+        started = time.perf_counter()
+        passes = 0
+        while simplify_trail(engine)[0]:
+            passes += 1
+        simplify_s = time.perf_counter() - started
+
+        after, after_ms = count(), route_ms(Session)
+        engine.dispose()
+
+    print(f"{JOBS} jobs, a point every {POINT_SECONDS}s, epsilon {SIMPLIFY_EPSILON_M:g} m")
+    print(f"  before: {before:>7} points  {before / JOBS:>6.0f}/job  route {before_ms:.2f} ms")
+    print(f"  after:  {after:>7} points  {after / JOBS:>6.0f}/job  route {after_ms:.2f} ms")
+    print(f"  simplify: {passes} passes, {simplify_s:.2f} s, {1 - after / before:.0%} smaller")
+
+
+if __name__ == "__main__":
+    main()
@@ -7,10 +7,13 @@ DATABASE_URL = os.getenv("DATABASE_URL")
 if not DATABASE_URL:
     raise RuntimeError("DATABASE_URL is not set")
 
+# sslmode is a libpq option; local SQLite URLs (CLI, scripts) don't take it
+connect_args = {"sslmode": "require"} if DATABASE_URL.startswith("postgres") else {}
+
 engine = create_engine(
     DATABASE_URL,
     pool_pre_ping=True,
-    connect_args={"sslmode": "require"},
+    connect_args=connect_args,
 )
 
 
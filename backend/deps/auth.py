@@ -1,10 +1,13 @@
-from fastapi import Depends, HTTPException, status
+from typing import Optional
+
+from fastapi import Depends, HTTPException, Query, status
 from fastapi.security import OAuth2PasswordBearer
 from jose import jwt, JWTError
 
 from auth_utils import SECRET_KEY, ALGORITHM
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/login")
+optional_oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/login", auto_error=False)
 
 
 def get_current_user(token: str = Depends(oauth2_scheme)) -> dict:
@@ -16,6 +19,21 @@ def get_current_user(token: str = Depends(oauth2_scheme)) -> dict:
     - role OR user_role
     Normalizes role to lowercase to avoid "Customer" vs "customer" issues.
     """
+    return decode_token(token)
+
+
+def get_stream_user(
+    header_token: Optional[str] = Depends(optional_oauth2_scheme),
+    token: Optional[str] = Query(None, description="JWT for EventSource clients"),
+) -> dict:
+    """
+    Same as get_current_user, but also accepts the JWT as a ?token= query
+    parameter because browser EventSource cannot set headers.
+    """
+    return decode_token(header_token or token)
+
+
+def decode_token(token: Optional[str]) -> dict:
     if not token:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -2,13 +2,18 @@ from dotenv import load_dotenv
 
 load_dotenv()
 
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
-import os
-import utils.cloudinary_config
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
 from database import engine
-import models
+from migrations import upgrade as run_migrations
+from services.dispatch import dispatcher
+from services.enrichment import address_enricher
+from services.geocoding import geocoder
+from services.image_analysis import image_analyzer
+from services.presence import presence
 
 # Routers
 from routers.auth import router as auth_router
@@ -25,15 +30,30 @@ from routers.provider_kyc import router as provider_kyc_router
 from routers.provider_presence import router as provider_presence_router
 from routers.location import router as location_router
 
-# =========================
-# Database init
-# =========================
-models.Base.metadata.create_all(bind=engine)
-
 # =========================
 # App init
 # =========================
-app = FastAPI(title="QuickServe API")
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Schema work and background writers run here rather than at import,
+    # so importing the app (workers, scripts, tests) has no side effects.
+    # External clients (Cloudinary, Groq, Supabase) are created on first use.
+    run_migrations(engine)
+    presence.start(engine)
+    address_enricher.start(engine)
+    dispatcher.start(engine)
+    try:
+        yield
+    finally:
+        # Final flush so the last pings are not lost on deploy
+        presence.stop()
+        address_enricher.stop()
+        dispatcher.stop()
+        geocoder.close()
+        image_analyzer.close()
+
+
+app = FastAPI(title="QuickServe API", lifespan=lifespan)
 
 app.add_middleware(
     CORSMiddleware,
@@ -56,6 +76,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],
 )
 
 # =========================
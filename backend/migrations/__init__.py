@@ -0,0 +1,14 @@
+# backend/migrations/__init__.py
+"""
+Versioned schema migrations.
+
+Migrations run once at application startup (see main.py) and record what
+was applied in the `schema_migrations` table, so request handlers never
+inspect the catalog. Use `python -m migrations` from backend/ to apply or
+inspect them by hand.
+"""
+
+from migrations.runner import current_version, status, upgrade
+from migrations.versions import MIGRATIONS
+
+__all__ = ["MIGRATIONS", "current_version", "status", "upgrade"]
@@ -0,0 +1,67 @@
+# backend/migrations/__main__.py
+"""
+Usage (from backend/):
+    python -m migrations status
+    python -m migrations upgrade [--to VERSION]
+    python -m migrations advise [--force-index] [--verbose]
+"""
+
+import argparse
+import logging
+
+from dotenv import load_dotenv
+
+
+def main():
+    load_dotenv()
+
+    from database import engine
+    from migrations import current_version, status, upgrade
+
+    parser = argparse.ArgumentParser(prog="python -m migrations")
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("status", help="List migrations and whether they are applied")
+    up = sub.add_parser("upgrade", help="Apply pending migrations")
+    up.add_argument("--to", type=int, default=None, help="Stop at this version")
+    adv = sub.add_parser("advise", help="EXPLAIN hot queries and flag seq scans")
+    adv.add_argument(
+        "--force-index",
+        action="store_true",
+        help="Disable seq scans (Postgres) to check that an index is usable",
+    )
+    adv.add_argument("--verbose", action="store_true", help="Print full plans")
+
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+
+    if args.command == "status":
+        for m in status(engine):
+            state = m["applied_at"] or "pending"
+            print(f"{m['version']:04d}  {m['name']:<24} {state}")
+        print(f"current version: {current_version(engine)}")
+
+    elif args.command == "upgrade":
+        applied = upgrade(engine, target=args.to)
+        if applied:
+            print("applied: " + ", ".join(f"{v:04d}" for v in applied))
+        else:
+            print("nothing to apply")
+        print(f"current version: {current_version(engine)}")
+
+    elif args.command == "advise":
+        from migrations.advisor import advise
+
+        report = advise(engine, force_index=args.force_index)
+        for entry in report:
+            seq = entry["seq_scans"]
+            verdict = f"SEQ SCAN on {', '.join(seq)}" if seq else "index"
+            print(f"{entry['name']:<24} {verdict}")
+            if args.verbose:
+                print(entry["plan"])
+                print()
+        flagged = sum(1 for e in report if e["seq_scans"])
+        print(f"{flagged} of {len(report)} hot queries use a sequential scan")
+
+
+if __name__ == "__main__":
+    main()
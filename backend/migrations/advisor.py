@@ -0,0 +1,90 @@
+# backend/migrations/advisor.py
+"""
+Index advisor: EXPLAIN the registered hot queries and report the ones
+whose plan contains a sequential scan.
+
+Postgres picks a seq scan on small tables even when a usable index
+exists, so `force_index=True` disables seq scans for the check; a query
+that still seq-scans then has no usable index at all.
+"""
+
+import json
+from typing import Dict, List, Tuple
+
+from sqlalchemy import text
+from sqlalchemy.engine import Engine
+
+ACTIVE = "('assigned', 'en_route', 'arrived', 'payment')"
+
+# name -> (SQL, sample params); keep in step with the router queries
+HOT_QUERIES: Dict[str, Tuple[str, dict]] = {
+    "provider_incoming": (
+        "SELECT * FROM requests WHERE provider_id = :pid AND status = 'pending' "
+        "ORDER BY id DESC LIMIT 10",
+        {"pid": 1},
+    ),
+    "provider_current_job": (
+        f"SELECT * FROM requests WHERE provider_id = :pid AND status IN {ACTIVE} "
+        "ORDER BY id DESC LIMIT 1",
+        {"pid": 1},
+    ),
+    "customer_my_requests": (
+        "SELECT * FROM requests WHERE customer_id = :cid ORDER BY id DESC LIMIT 20",
+        {"cid": 1},
+    ),
+    "admin_requests": (
+        "SELECT * FROM requests WHERE status = :status AND service_type = :st "
+        "ORDER BY id DESC LIMIT 100",
+        {"status": "pending", "st": "Plumber"},
+    ),
+    "nearby_providers": (
+        "SELECT p.* FROM providers p WHERE p.is_online = true "
+        "AND p.service_type = :st AND p.kyc_status = 'approved' "
+        "AND NOT EXISTS (SELECT 1 FROM requests r WHERE r.provider_id = p.id "
+        f"AND r.status IN {ACTIVE}) LIMIT 20",
+        {"st": "Plumber"},
+    ),
+    "admin_kyc_queue": (
+        "SELECT * FROM providers WHERE kyc_status = 'pending' ORDER BY id LIMIT 50",
+        {},
+    ),
+}
+
+
+def _pg_seq_scans(plan: dict) -> List[str]:
+    found = []
+    if plan.get("Node Type") == "Seq Scan":
+        found.append(plan.get("Relation Name", "?"))
+    for child in plan.get("Plans", []):
+        found.extend(_pg_seq_scans(child))
+    return found
+
+
+def advise(engine: Engine, force_index: bool = False) -> List[dict]:
+    """
+    One entry per hot query: {"name", "seq_scans": [tables], "plan": str}.
+    """
+    report = []
+    with engine.connect() as conn:
+        dialect = conn.dialect.name
+        for name, (sql, params) in HOT_QUERIES.items():
+            if dialect == "postgresql":
+                with conn.begin():
+                    if force_index:
+                        conn.execute(text("SET LOCAL enable_seqscan = off"))
+                    raw = conn.execute(
+                        text(f"EXPLAIN (FORMAT JSON) {sql}"), params
+                    ).scalar()
+                plan = (json.loads(raw) if isinstance(raw, str) else raw)[0]["Plan"]
+                seq = _pg_seq_scans(plan)
+                pretty = json.dumps(plan, indent=2)
+            else:
+                rows = conn.execute(text(f"EXPLAIN QUERY PLAN {sql}"), params).fetchall()
+                details = [r[-1] for r in rows]
+                # SQLite: "SCAN t [USING INDEX]" walks every row, "SEARCH t" doesn't
+                seq = [d.split()[1] for d in details if d.startswith("SCAN ")]
+                pretty = "\n".join(details)
+
+            report.append({"name": name, "seq_scans": seq, "plan": pretty})
+
+    return report
@@ -0,0 +1,16 @@
+# backend/migrations/ops.py
+"""
+Small idempotent helpers for migration steps.
+
+The baseline migration builds tables from the current models, so later
+steps must tolerate objects that already exist on a fresh database.
+"""
+
+from sqlalchemy import inspect, text
+from sqlalchemy.engine import Connection
+
+
+def add_column_if_missing(conn: Connection, table: str, column: str, sql_type: str):
+    existing = {c["name"] for c in inspect(conn).get_columns(table)}
+    if column not in existing:
+        conn.execute(text(f'ALTER TABLE {table} ADD COLUMN "{column}" {sql_type}'))
@@ -0,0 +1,98 @@
+# backend/migrations/runner.py
+import logging
+from datetime import datetime
+from typing import List, Optional
+
+from sqlalchemy import inspect, text
+from sqlalchemy.engine import Connection, Engine
+
+from migrations.versions import MIGRATIONS
+
+logger = logging.getLogger("quickserve.migrations")
+
+VERSION_TABLE = "schema_migrations"
+
+# Arbitrary key for pg_advisory_xact_lock so concurrent workers don't race
+ADVISORY_LOCK_KEY = 7_240_113
+
+
+def _ensure_version_table(conn: Connection):
+    conn.execute(
+        text(
+            f"""
+            CREATE TABLE IF NOT EXISTS {VERSION_TABLE} (
+                version INTEGER PRIMARY KEY,
+                name VARCHAR NOT NULL,
+                applied_at TIMESTAMP NOT NULL
+            )
+            """
+        )
+    )
+
+
+def _applied(conn: Connection) -> dict:
+    if not inspect(conn).has_table(VERSION_TABLE):
+        return {}
+    rows = conn.execute(
+        text(f"SELECT version, name, applied_at FROM {VERSION_TABLE}")
+    ).fetchall()
+    return {r[0]: (r[1], r[2]) for r in rows}
+
+
+def current_version(engine: Engine) -> int:
+    with engine.connect() as conn:
+        applied = _applied(conn)
+    return max(applied, default=0)
+
+
+def status(engine: Engine) -> List[dict]:
+    """
+    One entry per known migration with its applied timestamp (or None).
+    """
+    with engine.connect() as conn:
+        applied = _applied(conn)
+
+    return [
+        {
+            "version": m.VERSION,
+            "name": m.NAME,
+            "applied_at": applied[m.VERSION][1] if m.VERSION in applied else None,
+        }
+        for m in MIGRATIONS
+    ]
+
+
+def upgrade(engine: Engine, target: Optional[int] = None) -> List[int]:
+    """
+    Apply pending migrations up to `target` (default: latest) in a single
+    transaction. Returns the versions that were applied.
+    """
+    done = []
+    with engine.begin() as conn:
+        if conn.dialect.name == "postgresql":
+            conn.execute(
+                text("SELECT pg_advisory_xact_lock(:key)"),
+                {"key": ADVISORY_LOCK_KEY},
+            )
+
+        _ensure_version_table(conn)
+        applied = _applied(conn)
+
+        for m in MIGRATIONS:
+            if m.VERSION in applied:
+                continue
+            if target is not None and m.VERSION > target:
+                break
+
+            logger.info("Applying migration %04d %s", m.VERSION, m.NAME)
+            m.upgrade(conn)
+            conn.execute(
+                text(
+                    f"INSERT INTO {VERSION_TABLE} (version, name, applied_at) "
+                    "VALUES (:version, :name, :applied_at)"
+                ),
+                {"version": m.VERSION, "name": m.NAME, "applied_at": datetime.utcnow()},
+            )
+            done.append(m.VERSION)
+
+    return done
@@ -0,0 +1,27 @@
+# backend/migrations/versions/__init__.py
+"""
+Ordered migration registry. Each module defines VERSION, NAME and
+upgrade(conn); append new ones here with the next VERSION.
+"""
+
+from migrations.versions import (
+    m0001_baseline,
+    m0002_profile_columns,
+    m0003_hot_path_indexes,
+    m0004_location_trail,
+    m0005_address_enrichment,
+    m0006_request_offers,
+    m0007_request_version,
+)
+
+MIGRATIONS = [
+    m0001_baseline,
+    m0002_profile_columns,
+    m0003_hot_path_indexes,
+    m0004_location_trail,
+    m0005_address_enrichment,
+    m0006_request_offers,
+    m0007_request_version,
+]
+
+assert [m.VERSION for m in MIGRATIONS] == list(range(1, len(MIGRATIONS) + 1))
@@ -0,0 +1,15 @@
+"""
+Create any missing tables from the models (what main.py used to do with
+Base.metadata.create_all on every import).
+"""
+
+from sqlalchemy.engine import Connection
+
+import models
+
+VERSION = 1
+NAME = "baseline"
+
+
+def upgrade(conn: Connection):
+    models.Base.metadata.create_all(bind=conn)
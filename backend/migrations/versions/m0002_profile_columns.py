@@ -0,0 +1,35 @@
+"""
+Provider profile/location columns and users.phone, previously added on
+the fly by routers.provider.ensure_columns.
+"""
+
+from sqlalchemy.engine import Connection
+
+from migrations.ops import add_column_if_missing
+
+VERSION = 2
+NAME = "profile_columns"
+
+PROVIDER_COLUMNS = {
+    "bio": "TEXT",
+    "experience_years": "INTEGER",
+    "city": "TEXT",
+    "address_line": "TEXT",
+    "working_days": "TEXT",
+    "start_time": "TEXT",
+    "end_time": "TEXT",
+    "last_latitude": "DOUBLE PRECISION",
+    "last_longitude": "DOUBLE PRECISION",
+}
+
+USER_COLUMNS = {
+    "phone": "TEXT",
+}
+
+
+def upgrade(conn: Connection):
+    for col, typ in PROVIDER_COLUMNS.items():
+        add_column_if_missing(conn, "providers", col, typ)
+
+    for col, typ in USER_COLUMNS.items():
+        add_column_if_missing(conn, "users", col, typ)
@@ -0,0 +1,35 @@
+"""
+Composite and partial indexes for the request/provider hot queries.
+
+Plain CREATE INDEX (not CONCURRENTLY) because migrations run inside one
+transaction; it briefly blocks writes to the table while building.
+"""
+
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+
+VERSION = 3
+NAME = "hot_path_indexes"
+
+ACTIVE = "status IN ('assigned', 'en_route', 'arrived', 'payment')"
+
+INDEXES = [
+    "CREATE INDEX IF NOT EXISTS ix_requests_provider_status_id "
+    "ON requests (provider_id, status, id)",
+    f"CREATE INDEX IF NOT EXISTS ix_requests_active_provider "
+    f"ON requests (provider_id) WHERE {ACTIVE}",
+    "CREATE INDEX IF NOT EXISTS ix_requests_customer_id_id "
+    "ON requests (customer_id, id)",
+    "CREATE INDEX IF NOT EXISTS ix_requests_status_service_id "
+    "ON requests (status, service_type, id)",
+    "CREATE INDEX IF NOT EXISTS ix_providers_online_service_kyc "
+    "ON providers (service_type, kyc_status) WHERE is_online = {true}",
+    "CREATE INDEX IF NOT EXISTS ix_providers_kyc_status_id "
+    "ON providers (kyc_status, id)",
+]
+
+
+def upgrade(conn: Connection):
+    true = "true" if conn.dialect.name == "postgresql" else "1"
+    for ddl in INDEXES:
+        conn.execute(text(ddl.replace("{true}", true)))
@@ -0,0 +1,50 @@
+"""
+Single current-position table and the location trail.
+
+provider_locations becomes the only stored current position: it gets a
+unique index on provider_id (older databases were created without one)
+and is backfilled from providers.last_latitude/last_longitude, which is
+what the app actually wrote until now. Only providers without a row are
+backfilled: a row written by the old /providers/location endpoint may be
+newer than last_*, which carries no timestamp to compare. Also creates
+the append-only provider_location_trail table with its BRIN index.
+"""
+
+from sqlalchemy import inspect, text
+from sqlalchemy.engine import Connection
+
+import models
+
+VERSION = 4
+NAME = "location_trail"
+
+
+def _has_unique_provider_id(conn: Connection) -> bool:
+    insp = inspect(conn)
+    uniques = [u["column_names"] for u in insp.get_unique_constraints("provider_locations")]
+    uniques += [i["column_names"] for i in insp.get_indexes("provider_locations") if i["unique"]]
+    return ["provider_id"] in uniques
+
+
+def upgrade(conn: Connection):
+    if not _has_unique_provider_id(conn):
+        conn.execute(text(
+            "DELETE FROM provider_locations WHERE id NOT IN "
+            "(SELECT MAX(id) FROM provider_locations GROUP BY provider_id)"
+        ))
+        conn.execute(text(
+            "CREATE UNIQUE INDEX IF NOT EXISTS ux_provider_locations_provider_id "
+            "ON provider_locations (provider_id)"
+        ))
+
+    has_position = "last_latitude IS NOT NULL AND last_longitude IS NOT NULL"
+    conn.execute(text(
+        "INSERT INTO provider_locations "
+        "(provider_id, latitude, longitude, is_online, updated_at) "
+        "SELECT id, last_latitude, last_longitude, is_online, CURRENT_TIMESTAMP "
+        f"FROM providers WHERE {has_position} "
+        "AND id NOT IN (SELECT provider_id FROM provider_locations "
+        "WHERE provider_id IS NOT NULL)"
+    ))
+
+    models.ProviderLocationPoint.__table__.create(bind=conn, checkfirst=True)
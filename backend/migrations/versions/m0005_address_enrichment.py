@@ -0,0 +1,20 @@
+"""
+requests.address_status and the partial index the address enrichment
+worker polls.
+"""
+
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+
+from migrations.ops import add_column_if_missing
+
+VERSION = 5
+NAME = "address_enrichment"
+
+
+def upgrade(conn: Connection):
+    add_column_if_missing(conn, "requests", "address_status", "VARCHAR(20)")
+    conn.execute(text(
+        "CREATE INDEX IF NOT EXISTS ix_requests_address_pending "
+        "ON requests (id) WHERE address_status = 'pending'"
+    ))
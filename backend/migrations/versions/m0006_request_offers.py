@@ -0,0 +1,15 @@
+"""
+request_offers: dispatcher offers of a pending request to several
+providers at once.
+"""
+
+from sqlalchemy.engine import Connection
+
+import models
+
+VERSION = 6
+NAME = "request_offers"
+
+
+def upgrade(conn: Connection):
+    models.RequestOffer.__table__.create(bind=conn, checkfirst=True)
@@ -0,0 +1,15 @@
+"""
+requests.version: optimistic-concurrency counter bumped by every status
+transition (services.request_state).
+"""
+
+from sqlalchemy.engine import Connection
+
+from migrations.ops import add_column_if_missing
+
+VERSION = 7
+NAME = "request_version"
+
+
+def upgrade(conn: Connection):
+    add_column_if_missing(conn, "requests", "version", "INTEGER NOT NULL DEFAULT 0")
@@ -1,5 +1,6 @@
 # backend/models.py
 from sqlalchemy import (
+    BigInteger,
     Column,
     Integer,
     String,
@@ -8,12 +9,18 @@ from sqlalchemy import (
     Text,
     DateTime,
     Boolean,
+    Index,
+    UniqueConstraint,
+    text,
 )
 from sqlalchemy.orm import relationship
 from datetime import datetime
 
 from database import Base
 
+# Statuses in which a request occupies its provider (see services.request_state)
+ACTIVE_STATUS_SQL = "status IN ('assigned', 'en_route', 'arrived', 'payment')"
+
 # --------------------------------------------------
 # USERS
 # --------------------------------------------------
@@ -26,6 +33,7 @@ class User(Base):
     email = Column(String, unique=True, index=True, nullable=False)
     hashed_password = Column(String, nullable=False)
     role = Column(String, nullable=False)  # customer | provider | admin
+    phone = Column(String, nullable=True)
 
     customer = relationship("Customer", back_populates="user", uselist=False)
     provider = relationship("Provider", back_populates="user", uselist=False)
@@ -52,6 +60,17 @@ class Customer(Base):
 
 class Provider(Base):
     __tablename__ = "providers"
+    __table_args__ = (
+        # nearby search / admin online filters only ever look at online providers
+        Index(
+            "ix_providers_online_service_kyc",
+            "service_type",
+            "kyc_status",
+            postgresql_where=text("is_online = true"),
+            sqlite_where=text("is_online = 1"),
+        ),
+        Index("ix_providers_kyc_status_id", "kyc_status", "id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"), unique=True, nullable=False)
@@ -74,7 +93,8 @@ class Provider(Base):
     start_time = Column(String, nullable=True)    # "09:00"
     end_time = Column(String, nullable=True)      # "20:00"
 
-    # Live location (also used by ensure_columns on Postgres)
+    # Legacy copy of the live location; the current position lives in
+    # provider_locations (see services.presence). No longer written.
     last_latitude = Column(Float, nullable=True)
     last_longitude = Column(Float, nullable=True)
 
@@ -109,6 +129,28 @@ class Admin(Base):
 
 class Request(Base):
     __tablename__ = "requests"
+    __table_args__ = (
+        # incoming (provider_id, status='pending' ORDER BY id DESC)
+        Index("ix_requests_provider_status_id", "provider_id", "status", "id"),
+        # current-job and the busy-provider check
+        Index(
+            "ix_requests_active_provider",
+            "provider_id",
+            postgresql_where=text(ACTIVE_STATUS_SQL),
+            sqlite_where=text(ACTIVE_STATUS_SQL),
+        ),
+        # /requests/my ORDER BY id DESC
+        Index("ix_requests_customer_id_id", "customer_id", "id"),
+        # /admin/requests filters
+        Index("ix_requests_status_service_id", "status", "service_type", "id"),
+        # address enrichment queue
+        Index(
+            "ix_requests_address_pending",
+            "id",
+            postgresql_where=text("address_status = 'pending'"),
+            sqlite_where=text("address_status = 'pending'"),
+        ),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     customer_id = Column(Integer, ForeignKey("customers.id"), nullable=False)
@@ -118,6 +160,9 @@ class Request(Base):
     service_type = Column(String, nullable=False)
     budget = Column(Float, nullable=True)
     address = Column(String, nullable=True)
+    # "pending" while services.enrichment reverse-geocodes the customer
+    # location, then "resolved" or "unresolved"; NULL if never needed
+    address_status = Column(String(20), nullable=True)
     description = Column(Text, nullable=True)
     image_url = Column(String, nullable=True)
 
@@ -126,16 +171,56 @@ class Request(Base):
     customer_lng = Column(Float, nullable=True)
 
     status = Column(String, default="pending")
+    # Bumped by every guarded update in services.request_state
+    version = Column(Integer, nullable=False, default=0, server_default="0")
 
     customer = relationship("Customer", back_populates="requests")
     provider = relationship("Provider", back_populates="requests")
 
 
+class RequestOffer(Base):
+    """
+    A pending request offered to one provider by the dispatcher. Several
+    providers hold offers for the same request at once; the first accept
+    wins and the others are withdrawn (services.offers).
+    """
+
+    __tablename__ = "request_offers"
+    __table_args__ = (
+        UniqueConstraint("request_id", "provider_id", name="ux_request_offers_request_provider"),
+        # a provider's live offers (incoming list, accept check)
+        Index(
+            "ix_request_offers_live_provider",
+            "provider_id",
+            postgresql_where=text("status = 'offered'"),
+            sqlite_where=text("status = 'offered'"),
+        ),
+        # expiry sweep
+        Index(
+            "ix_request_offers_live_expires",
+            "expires_at",
+            postgresql_where=text("status = 'offered'"),
+            sqlite_where=text("status = 'offered'"),
+        ),
+    )
+
+    id = Column(Integer, primary_key=True)
+    request_id = Column(Integer, ForeignKey("requests.id"), nullable=False)
+    provider_id = Column(Integer, ForeignKey("providers.id"), nullable=False)
+    rank = Column(Integer, nullable=False, default=0)
+    # offered -> accepted | withdrawn | declined | expired
+    status = Column(String(20), nullable=False, default="offered")
+    created_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+    expires_at = Column(DateTime, nullable=False)
+
+
 # --------------------------------------------------
 # PROVIDER LIVE LOCATION (GPS)
 # --------------------------------------------------
 
 class ProviderLocation(Base):
+    """Current position, one row per provider."""
+
     __tablename__ = "provider_locations"
 
     id = Column(Integer, primary_key=True, index=True)
@@ -149,6 +234,37 @@ class ProviderLocation(Base):
     provider = relationship("Provider", back_populates="location")
 
 
+class ProviderLocationPoint(Base):
+    """
+    Append-only location history. Rows arrive in time order, so a BRIN
+    index on recorded_at stays tiny; old points are thinned out by
+    services.location_trail.simplify_trail. No foreign keys, to keep the
+    batched inserts cheap.
+    """
+
+    __tablename__ = "provider_location_trail"
+    __table_args__ = (
+        Index("ix_trail_recorded_at_brin", "recorded_at", postgresql_using="brin"),
+        # route of one job
+        Index("ix_trail_request_recorded_at", "request_id", "recorded_at"),
+        # simplification backlog; small because old points are all simplified
+        Index(
+            "ix_trail_unsimplified",
+            "recorded_at",
+            postgresql_where=text("simplified = false"),
+            sqlite_where=text("simplified = 0"),
+        ),
+    )
+
+    id = Column(BigInteger().with_variant(Integer, "sqlite"), primary_key=True)
+    provider_id = Column(Integer, nullable=False)
+    request_id = Column(Integer, nullable=True)
+    recorded_at = Column(DateTime, nullable=False)
+    latitude = Column(Float, nullable=False)
+    longitude = Column(Float, nullable=False)
+    simplified = Column(Boolean, default=False, nullable=False)
+
+
 # --------------------------------------------------
 # PROVIDER KYC
 # --------------------------------------------------
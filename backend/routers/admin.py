@@ -9,6 +9,15 @@ import models
 from dependencies.admin_required import admin_required
 from utils.settings_store import load_settings, save_settings
 from schemas import AdminStatsOut, KycRejectIn
+from services.dispatch import dispatcher
+from services.geocode_cache import geocode_cache
+from services.geocoding import geocoder
+from services.image_analysis import image_analyzer
+from services.presence import presence
+from services.provider_index import provider_index
+from services.realtime import hub
+from services.stats_cache import provider_state, stats_counters
+from utils.pagination import keyset_page
 
 router = APIRouter(
     prefix="/admin",
@@ -22,20 +31,7 @@ router = APIRouter(
 
 @router.get("/stats", response_model=AdminStatsOut)
 def admin_stats(db: Session = Depends(get_db)):
-    return {
-        "pending_kyc": db.query(models.Provider)
-        .filter(models.Provider.kyc_status == "pending")
-        .count(),
-        "total_providers": db.query(models.Provider).count(),
-        "online_providers": db.query(models.Provider)
-        .filter(models.Provider.is_online == True)
-        .count(),
-        "total_customers": db.query(models.User)
-        .filter(models.User.role == "customer")
-        .count(),
-        "total_requests": db.query(models.Request).count(),
-        "open_reports": 0,
-    }
+    return {**stats_counters.snapshot(db), "open_reports": 0}
 
 # ======================================================
 # KYC QUEUE
@@ -45,10 +41,14 @@ def admin_stats(db: Session = Depends(get_db)):
 def kyc_queue(
     status: str = Query("pending"),
     search: str = "",
-    limit: int = 50,
+    limit: int = Query(50, ge=1, le=200),
+    cursor: Optional[str] = None,
     offset: int = 0,
     db: Session = Depends(get_db),
 ):
+    """
+    Ordered by provider id; `total` is only computed for the first page.
+    """
     q = (
         db.query(models.Provider, models.User)
         .join(models.User, models.User.id == models.Provider.user_id)
@@ -63,11 +63,20 @@ def kyc_queue(
             )
         )
 
-    total = q.count()
-    rows = q.offset(offset).limit(limit).all()
+    total = None if cursor else q.count()
+    rows, next_cursor = keyset_page(
+        q,
+        models.Provider.id,
+        limit=limit,
+        cursor=cursor,
+        offset=offset,
+        descending=False,
+        row_id=lambda row: row[0].id,
+    )
 
     return {
         "total": total,
+        "next_cursor": next_cursor,
         "items": [
             {
                 "provider_id": p.id,
@@ -151,6 +160,7 @@ def kyc_approve(provider_id: int, db: Session = Depends(get_db)):
     if not provider:
         raise HTTPException(status_code=404, detail="Provider not found")
 
+    before = provider_state(provider)
     provider.kyc_status = "approved"
 
     kyc = (
@@ -162,6 +172,9 @@ def kyc_approve(provider_id: int, db: Session = Depends(get_db)):
         kyc.rejection_reason = None
 
     db.commit()
+    stats_counters.provider_changed(before, provider)
+    presence.resume(provider.id)
+    provider_index.sync(provider, *presence.current(provider))
     return {"message": "KYC approved", "kyc_status": provider.kyc_status}
 
 
@@ -179,6 +192,7 @@ def kyc_reject(
     if not provider:
         raise HTTPException(status_code=404, detail="Provider not found")
 
+    before = provider_state(provider)
     provider.kyc_status = "rejected"
 
     kyc = (
@@ -190,6 +204,8 @@ def kyc_reject(
         kyc.rejection_reason = payload.reason
 
     db.commit()
+    stats_counters.provider_changed(before, provider)
+    provider_index.remove(provider.id)
     return {"message": "KYC rejected", "kyc_status": provider.kyc_status}
 
 # ======================================================
@@ -207,6 +223,9 @@ def admin_providers(
     service_type: str = "",
     kyc_status: str = "",
     is_online: Optional[bool] = None,
+    limit: int = Query(100, ge=1, le=200),
+    cursor: Optional[str] = None,
+    offset: int = 0,
     db: Session = Depends(get_db),
 ):
     q = (
@@ -231,9 +250,18 @@ def admin_providers(
     if is_online is not None:
         q = q.filter(models.Provider.is_online == is_online)
 
-    rows = q.all()
+    rows, next_cursor = keyset_page(
+        q,
+        models.Provider.id,
+        limit=limit,
+        cursor=cursor,
+        offset=offset,
+        descending=False,
+        row_id=lambda row: row[0].id,
+    )
 
     return {
+        "next_cursor": next_cursor,
         "items": [
             {
                 "provider_id": p.id,
@@ -255,7 +283,8 @@ def admin_providers(
 @router.get("/customers")
 def admin_customers(
     search: str = "",
-    limit: int = 50,
+    limit: int = Query(50, ge=1, le=200),
+    cursor: Optional[str] = None,
     offset: int = 0,
     db: Session = Depends(get_db),
 ):
@@ -269,11 +298,19 @@ def admin_customers(
             )
         )
 
-    total = q.count()
-    users = q.offset(offset).limit(limit).all()
+    total = None if cursor else q.count()
+    users, next_cursor = keyset_page(
+        q,
+        models.User.id,
+        limit=limit,
+        cursor=cursor,
+        offset=offset,
+        descending=False,
+    )
 
     return {
         "total": total,
+        "next_cursor": next_cursor,
         "items": [{"id": u.id, "name": u.full_name, "email": u.email} for u in users],
     }
 
@@ -286,19 +323,17 @@ def admin_requests(
     status: str = Query("", description="Filter by request status"),
     service_type: str = Query("", description="Filter by service type"),
     limit: int = Query(100, ge=1, le=200),
-    offset: int = Query(0, ge=0),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    offset: int = Query(0, ge=0, description="Legacy; ignored when cursor is set"),
     db: Session = Depends(get_db),
     user: dict = Depends(admin_required),
 ):
     """
     List service requests for admin, including customer location and provider info.
+    Newest first; `total` is only computed for the first page.
     """
-    q = (
-        db.query(models.Request)
-        .options(
-            joinedload(models.Request.provider).joinedload(models.Provider.user)
-        )
-        .order_by(models.Request.id.desc())
+    q = db.query(models.Request).options(
+        joinedload(models.Request.provider).joinedload(models.Provider.user)
     )
 
     if status:
@@ -307,11 +342,14 @@ def admin_requests(
     if service_type:
         q = q.filter(models.Request.service_type == service_type)
 
-    total = q.count()
-    rows = q.offset(offset).limit(limit).all()
+    total = None if cursor else q.count()
+    rows, next_cursor = keyset_page(
+        q, models.Request.id, limit=limit, cursor=cursor, offset=offset
+    )
 
     return {
         "total": total,
+        "next_cursor": next_cursor,
         "items": [
             {
                 "id": r.id,
@@ -360,6 +398,30 @@ def admin_reports(
 ):
     return {"total": 0, "items": []}
 
+# ======================================================
+# LIVE CONNECTIONS
+# ======================================================
+@router.get("/realtime")
+def realtime_stats():
+    return {**hub.stats(), "presence": presence.stats()}
+
+# ======================================================
+# CACHES
+# ======================================================
+@router.get("/caches")
+def cache_stats():
+    return {"geocode": geocode_cache.stats(), "geocoder": geocoder.stats()}
+
+
+@router.get("/dispatch")
+def dispatch_stats():
+    return dispatcher.stats()
+
+
+@router.get("/ai")
+def ai_stats():
+    return image_analyzer.stats()
+
 # ======================================================
 # SETTINGS
 # ======================================================
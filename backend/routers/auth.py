@@ -4,6 +4,7 @@ from sqlalchemy.orm import Session
 
 import models, schemas
 from database import get_db
+from services.stats_cache import stats_counters
 from auth_utils import (
     verify_password,
     get_password_hash,
@@ -45,6 +46,11 @@ def signup(user_in: schemas.UserCreate, db: Session = Depends(get_db)):
 
     db.commit()
     db.refresh(user)
+
+    if user.role == "customer":
+        stats_counters.incr("total_customers")
+    elif user.role == "provider":
+        stats_counters.incr("total_providers")
     return user
 
 
@@ -7,6 +7,9 @@ from database import get_db
 from deps.customer import customer_required
 import models
 from auth_utils import verify_password, get_password_hash
+from services.presence import presence
+from services.provider_index import provider_index, search_radius_km
+from services.request_state import provider_has_active_job
 
 router = APIRouter(prefix="/customer", tags=["customer"])
 
@@ -123,25 +126,59 @@ SERVICE_MAP = {
 @router.get("/nearby-providers")
 def nearby_providers(
     service_type: str = Query(..., description="Service type from the smart request UI"),
+    lat: Optional[float] = Query(None, ge=-90, le=90, description="Customer latitude"),
+    lng: Optional[float] = Query(None, ge=-180, le=180, description="Customer longitude"),
+    radius_km: Optional[float] = Query(None, gt=0, description="Defaults to admin setting"),
+    limit: int = Query(20, ge=1, le=50),
     db: Session = Depends(get_db),
     user: dict = Depends(customer_required),
 ):
     """
-    Returns approved, online providers that match the chosen service type.
+    Returns approved, online providers without an active job that match
+    the chosen service type.
     Uses SERVICE_MAP so all smart-request chips map to the correct provider.service_type.
+
+    With lat/lng, only providers inside the search radius are returned,
+    nearest first, using the in-memory provider index.
     """
 
     # fallback: if no mapping, use the raw service_type
     allowed_types = SERVICE_MAP.get(service_type, [service_type])
 
-    providers = (
-        db.query(models.Provider, models.User)
-        .join(models.User, models.User.id == models.Provider.user_id)
-        .filter(models.Provider.service_type.in_(allowed_types))
-        .filter(models.Provider.kyc_status == "approved")
-        .filter(models.Provider.is_online == True)
-        .all()
-    )
+    distances = {}
+    if lat is not None and lng is not None:
+        provider_index.ensure_loaded(db)
+        hits = provider_index.nearest(
+            allowed_types, lat, lng, search_radius_km(radius_km), 200
+        )
+        if not hits:
+            return {"items": []}
+        distances = dict(hits)
+
+        found = {
+            p.id: (p, u)
+            for p, u in db.query(models.Provider, models.User)
+            .join(models.User, models.User.id == models.Provider.user_id)
+            .filter(models.Provider.id.in_(distances.keys()))
+            .filter(~provider_has_active_job())
+            .all()
+        }
+        providers = [found[pid] for pid, _ in hits if pid in found][:limit]
+    else:
+        providers = (
+            db.query(models.Provider, models.User)
+            .join(models.User, models.User.id == models.Provider.user_id)
+            .filter(models.Provider.service_type.in_(allowed_types))
+            .filter(models.Provider.kyc_status == "approved")
+            .filter(models.Provider.is_online == True)
+            .filter(~provider_has_active_job())
+            .limit(limit * 2)
+            .all()
+        )
+        # Lapsed presence leases are an in-memory set, not a timestamp filter
+        providers = [
+            (p, u) for p, u in providers if not presence.is_expired(p.id)
+        ][:limit]
 
     items = [
         {
@@ -152,8 +189,9 @@ def nearby_providers(
             "base_price": p.base_price,
             "kyc_status": p.kyc_status,
             "is_online": bool(p.is_online),
+            "distance_km": distances.get(p.id),
         }
         for p, u in providers
     ]
 
-    return {"items": items}
\ No newline at end of file
+    return {"items": items}
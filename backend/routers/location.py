@@ -1,11 +1,14 @@
 from fastapi import APIRouter, HTTPException
-from services.location_service import reverse_geocode
+from services.geocoding import GeocodingError, reverse_geocode
 
 router = APIRouter(prefix="/location", tags=["location"])
 
 @router.get("/reverse")
-def reverse_location(lat: float, lng: float):
-    result = reverse_geocode(lat, lng)
+async def reverse_location(lat: float, lng: float):
+    try:
+        result = await reverse_geocode(lat, lng)
+    except GeocodingError:
+        raise HTTPException(status_code=502, detail="Geocoding service unavailable")
     if not result:
         raise HTTPException(status_code=400, detail="Unable to resolve location")
 
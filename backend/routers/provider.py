@@ -1,13 +1,24 @@
+from datetime import datetime
 from typing import Optional, List
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import exists, or_
 from sqlalchemy.orm import Session
-from sqlalchemy import text
 
-from database import get_db
-from deps.auth import get_current_user
+from database import SessionLocal, get_db
+from deps.auth import get_current_user, get_stream_user
 from deps.customer import customer_required
 import models
+from schemas import ProviderLocationIn
 from schemas.provider import ProviderMeOut, ProviderMeUpdateIn, AvailabilityIn
+from services import offers, request_state
+from services.live_location import live_locations
+from services.presence import presence, record_ping
+from services.provider_index import provider_index, search_radius_km
+from services.realtime import provider_channel, sse_response
+from services.request_state import provider_has_active_job
+from services.stats_cache import provider_state, stats_counters
+from utils.pagination import keyset_page
 
 # -------------------------------------------------
 # PROVIDER ROUTER
@@ -39,63 +50,11 @@ def list_to_csv(arr: Optional[List[str]]):
     return ",".join(arr)
 
 
-def ensure_columns(db: Session):
-    """
-    Safe column creation for Postgres (Render/local Postgres).
-    Adds extra columns to providers/users if they are missing.
-    """
-    provider_cols = {
-        "bio": "TEXT",
-        "experience_years": "INTEGER",
-        "city": "TEXT",
-        "address_line": "TEXT",
-        "working_days": "TEXT",
-        "start_time": "TEXT",
-        "end_time": "TEXT",
-        # live location stored on Provider
-        "last_latitude": "DOUBLE PRECISION",
-        "last_longitude": "DOUBLE PRECISION",
-    }
-
-    user_cols = {
-        "phone": "TEXT",
-    }
-
-    def existing_cols(table: str) -> set[str]:
-        rows = db.execute(
-            text(
-                """
-                SELECT column_name
-                FROM information_schema.columns
-                WHERE table_schema = 'public'
-                  AND table_name = :table
-                """
-            ),
-            {"table": table},
-        ).fetchall()
-        return {r[0] for r in rows}
-
-    provider_existing = existing_cols("providers")
-    user_existing = existing_cols("users")
-
-    for col, typ in provider_cols.items():
-        if col not in provider_existing:
-            db.execute(text(f'ALTER TABLE providers ADD COLUMN "{col}" {typ}'))
-
-    for col, typ in user_cols.items():
-        if col not in user_existing:
-            db.execute(text(f'ALTER TABLE users ADD COLUMN "{col}" {typ}'))
-
-    db.commit()
-
-
 # =====================================================
 # GET /provider/me
 # =====================================================
 @provider_router.get("/me", response_model=ProviderMeOut)
 def get_me(db: Session = Depends(get_db), token=Depends(provider_required)):
-    ensure_columns(db)
-
     user_id = int(token["user_id"])
     user = db.query(models.User).filter_by(id=user_id).first()
     provider = db.query(models.Provider).filter_by(user_id=user_id).first()
@@ -138,8 +97,6 @@ def update_me(
     db: Session = Depends(get_db),
     token=Depends(provider_required),
 ):
-    ensure_columns(db)
-
     user_id = int(token["user_id"])
     user = db.query(models.User).filter_by(id=user_id).first()
     provider = db.query(models.Provider).filter_by(user_id=user_id).first()
@@ -166,6 +123,8 @@ def update_me(
             setattr(provider, field, value)
 
     db.commit()
+    presence.resume(provider.id)
+    provider_index.sync(provider, *presence.current(provider))
     return {"ok": True}
 
 
@@ -178,8 +137,6 @@ def update_availability(
     db: Session = Depends(get_db),
     token=Depends(provider_required),
 ):
-    ensure_columns(db)
-
     user_id = int(token["user_id"])
     provider = db.query(models.Provider).filter_by(user_id=user_id).first()
     if not provider:
@@ -188,12 +145,17 @@ def update_availability(
     if payload.is_online and provider.kyc_status != "approved":
         raise HTTPException(status_code=400, detail="KYC not approved")
 
+    before = provider_state(provider)
     provider.is_online = payload.is_online
     provider.working_days = list_to_csv(payload.working_days)
     provider.start_time = payload.start_time
     provider.end_time = payload.end_time
 
     db.commit()
+    stats_counters.provider_changed(before, provider)
+    presence.set_online(provider)
+    presence.resume(provider.id)
+    provider_index.sync(provider, *presence.current(provider))
     return {"ok": True, "is_online": bool(provider.is_online)}
 
 
@@ -202,31 +164,37 @@ def update_availability(
 # =====================================================
 @provider_router.post("/providers/location")
 def update_location(
-    payload: dict,
+    payload: ProviderLocationIn,
     db: Session = Depends(get_db),
     user: dict = Depends(get_current_user),
 ):
-    ensure_columns(db)
-
     if user.get("role") != "provider":
         raise HTTPException(status_code=403, detail="Provider access required")
 
-    provider = (
-        db.query(models.Provider)
-        .filter(models.Provider.user_id == user["user_id"])
-        .first()
+    provider_id = record_ping(
+        db, user["user_id"], payload.latitude, payload.longitude, payload.is_online
     )
-    if not provider:
-        raise HTTPException(status_code=404, detail="Provider not found")
+    live_locations.update(provider_id, payload.latitude, payload.longitude)
+    return {"ok": True}
 
-    provider.last_latitude = payload.get("latitude")
-    provider.last_longitude = payload.get("longitude")
 
-    if "is_online" in payload:
-        provider.is_online = bool(payload.get("is_online"))
+# =====================================================
+# POST /provider/heartbeat
+# =====================================================
+@provider_router.post("/heartbeat")
+def heartbeat(
+    db: Session = Depends(get_db),
+    user: dict = Depends(get_current_user),
+):
+    """
+    Renews the presence lease without a location fix. The app calls this
+    while online so a parked phone (no GPS callbacks) stays searchable.
+    """
+    if user.get("role") != "provider":
+        raise HTTPException(status_code=403, detail="Provider access required")
 
-    db.commit()
-    return {"ok": True}
+    record_ping(db, user["user_id"], None, None)
+    return {"ok": True, "lease_seconds": presence.lease_seconds}
 
 
 # =====================================================
@@ -237,8 +205,6 @@ def provider_location_me(
     db: Session = Depends(get_db),
     user: dict = Depends(get_current_user),
 ):
-    ensure_columns(db)
-
     if user.get("role") != "provider":
         raise HTTPException(status_code=403, detail="Provider access required")
 
@@ -250,10 +216,8 @@ def provider_location_me(
     if not provider:
         raise HTTPException(status_code=404, detail="Provider not found")
 
-    return {
-        "latitude": getattr(provider, "last_latitude", None),
-        "longitude": getattr(provider, "last_longitude", None),
-    }
+    lat, lng = presence.current(provider)
+    return {"latitude": lat, "longitude": lng}
 
 
 # =====================================================
@@ -296,8 +260,7 @@ def incoming_requests(
         .limit(10)
         .all()
     )
-
-    return [
+    items = [
         {
             "id": r.id,
             "title": r.title,
@@ -308,13 +271,43 @@ def incoming_requests(
         for r in rows
     ]
 
+    # Dispatcher offers; accepting one sets the price to base_price
+    offered = (
+        db.query(models.Request, models.RequestOffer.expires_at)
+        .join(models.RequestOffer, models.RequestOffer.request_id == models.Request.id)
+        .filter(
+            models.RequestOffer.provider_id == provider.id,
+            models.RequestOffer.status == offers.OFFERED,
+            models.RequestOffer.expires_at > datetime.utcnow(),
+            models.Request.status == "pending",
+        )
+        .order_by(models.Request.id.desc())
+        .limit(10)
+        .all()
+    )
+    items += [
+        {
+            "id": r.id,
+            "title": r.title,
+            "service_type": r.service_type,
+            "status": r.status,
+            "budget": provider.base_price if provider.base_price is not None else r.budget,
+            "offer_expires_at": expires_at.isoformat() + "Z",
+        }
+        for r, expires_at in offered
+    ]
+    items.sort(key=lambda item: item["id"], reverse=True)
+    return items[:10]
+
 
 # =====================================================
 # GET /provider/history
 # =====================================================
 @provider_router.get("/history")
 def provider_history(
+    response: Response,
     limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor from the previous page"),
     db: Session = Depends(get_db),
     user: dict = Depends(get_current_user),
 ):
@@ -329,13 +322,14 @@ def provider_history(
     if not provider:
         raise HTTPException(status_code=404, detail="Provider not found")
 
-    rows = (
-        db.query(models.Request)
-        .filter(models.Request.provider_id == provider.id)
-        .order_by(models.Request.id.desc())
-        .limit(limit)
-        .all()
+    rows, next_cursor = keyset_page(
+        db.query(models.Request).filter(models.Request.provider_id == provider.id),
+        models.Request.id,
+        limit=limit,
+        cursor=cursor,
     )
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
 
     return [
         {
@@ -389,9 +383,44 @@ def current_job(db: Session = Depends(get_db), user: dict = Depends(get_current_
         "description": getattr(r, "description", None),
         "customer_lat": getattr(r, "customer_lat", None),
         "customer_lng": getattr(r, "customer_lng", None),
+        "version": r.version,
     }
 
 
+# =====================================================
+# GET /provider/events  (Server-Sent Events)
+# =====================================================
+def _provider_id_for_user(user_id: int) -> Optional[int]:
+    db = SessionLocal()
+    try:
+        return (
+            db.query(models.Provider.id)
+            .filter(models.Provider.user_id == user_id)
+            .scalar()
+        )
+    finally:
+        db.close()
+
+
+@provider_router.get("/events")
+async def provider_events(user: dict = Depends(get_stream_user)):
+    """
+    Push stream of this provider's job events: "request.assigned" when a
+    customer assigns them, "request.offered" when dispatch offers them a
+    request, "request.status" / "request.withdrawn" when the customer
+    cancels or reassigns or another provider took the offer. /provider/incoming and
+    /provider/current-job remain the polling fallback.
+    """
+    if user.get("role") != "provider":
+        raise HTTPException(status_code=403, detail="Provider access required")
+
+    provider_id = await run_in_threadpool(_provider_id_for_user, user["user_id"])
+    if provider_id is None:
+        raise HTTPException(status_code=404, detail="Provider not found")
+
+    return sse_response(provider_channel(provider_id))
+
+
 def _get_current_provider(db: Session, user: dict) -> models.Provider:
     if user.get("role") != "provider":
         raise HTTPException(status_code=403, detail="Provider access required")
@@ -405,6 +434,28 @@ def _get_current_provider(db: Session, user: dict) -> models.Provider:
     return provider
 
 
+def _current_provider_id(db: Session, user: dict) -> int:
+    """
+    Provider id from the presence cache, without a query when warm.
+    """
+    if user.get("role") != "provider":
+        raise HTTPException(status_code=403, detail="Provider access required")
+    known = presence.lookup(user["user_id"])
+    if known:
+        return known[0]
+    provider = _get_current_provider(db, user)
+    presence.remember(user["user_id"], provider.id, bool(provider.is_online))
+    return provider.id
+
+
+def _has_live_offer(provider_id: int):
+    return exists().where(
+        models.RequestOffer.request_id == models.Request.id,
+        models.RequestOffer.provider_id == provider_id,
+        models.RequestOffer.status == offers.OFFERED,
+    )
+
+
 # =====================================================
 # GET /provider/requests/{id}
 # =====================================================
@@ -420,7 +471,10 @@ def provider_request_detail(
         db.query(models.Request)
         .filter(
             models.Request.id == request_id,
-            models.Request.provider_id == provider.id,
+            or_(
+                models.Request.provider_id == provider.id,
+                _has_live_offer(provider.id),
+            ),
         )
         .first()
     )
@@ -437,6 +491,7 @@ def provider_request_detail(
         "customer_lng": getattr(r, "customer_lng", None),
         "address": getattr(r, "address", None),
         "description": getattr(r, "description", None),
+        "version": r.version,
     }
 
 
@@ -449,25 +504,27 @@ def provider_accept_request(
     db: Session = Depends(get_db),
     user: dict = Depends(get_current_user),
 ):
-    provider = _get_current_provider(db, user)
-
-    r = (
-        db.query(models.Request)
-        .filter(
-            models.Request.id == request_id,
-            models.Request.provider_id == provider.id,
+    """
+    One conditional UPDATE: the request must still be pending and either
+    assigned to this provider or offered to them (services.offers). Of
+    several providers accepting the same offer exactly one gets it; the
+    others' offers are withdrawn in the same transaction.
+    """
+    provider_id = _current_provider_id(db, user)
+
+    row, withdrawn = offers.accept(db.connection(), request_id, provider_id)
+    if row is None:
+        db.rollback()
+        request_state.explain_miss(
+            db.connection(), request_id, "assigned",
+            where=offers.OFFERED_GUARD, params={"pid": provider_id},
+            conflict="Request is no longer available",
         )
-        .first()
-    )
-    if not r:
-        raise HTTPException(status_code=404, detail="Request not found")
-    if r.status != "pending":
-        raise HTTPException(status_code=400, detail="Request is not pending")
-
-    r.status = "assigned"
     db.commit()
-    db.refresh(r)
-    return {"id": r.id, "status": r.status}
+
+    request_state.announce(row)
+    offers.publish_withdrawn(row.id, withdrawn)
+    return {"id": row.id, "status": row.status, "version": row.version}
 
 
 # =====================================================
@@ -479,30 +536,30 @@ def provider_reject_request(
     db: Session = Depends(get_db),
     user: dict = Depends(get_current_user),
 ):
-    provider = _get_current_provider(db, user)
-
-    r = (
-        db.query(models.Request)
-        .filter(
-            models.Request.id == request_id,
-            models.Request.provider_id == provider.id,
-        )
-        .first()
-    )
-    if not r:
-        raise HTTPException(status_code=404, detail="Request not found")
-    if r.status != "pending":
-        raise HTTPException(status_code=400, detail="Request is not pending")
-
-    r.status = "cancelled"
+    provider_id = _current_provider_id(db, user)
+
+    # Declining a dispatcher offer leaves the request open for others
+    if offers.decline(db.connection(), request_id, provider_id):
+        db.commit()
+        return {"id": request_id, "status": "pending"}
+
+    guard = {"where": "provider_id = :pid", "params": {"pid": provider_id}}
+    row = request_state.transition(db.connection(), request_id, "cancelled", **guard)
+    if row is None:
+        db.rollback()
+        request_state.explain_miss(db.connection(), request_id, "cancelled", **guard)
     db.commit()
-    db.refresh(r)
-    return {"id": r.id, "status": r.status}
+
+    request_state.announce(row)
+    return {"id": row.id, "status": row.status, "version": row.version}
 
 
 # =====================================================
 # POST /provider/requests/{id}/status
 # =====================================================
+PROVIDER_STATUSES = {"assigned", "en_route", "arrived", "payment", "completed"}
+
+
 @provider_router.post("/requests/{request_id}/status")
 def provider_update_status(
     request_id: int,
@@ -510,30 +567,27 @@ def provider_update_status(
     db: Session = Depends(get_db),
     user: dict = Depends(get_current_user),
 ):
-    provider = _get_current_provider(db, user)
-
-    r = (
-        db.query(models.Request)
-        .filter(
-            models.Request.id == request_id,
-            models.Request.provider_id == provider.id,
-        )
-        .first()
-    )
-    if not r:
-        raise HTTPException(status_code=404, detail="Request not found")
+    """
+    Body: {"status": ..., "version": optional}. With `version` the change
+    only applies if nobody else changed the request since it was read.
+    """
+    provider_id = _current_provider_id(db, user)
 
     new_status = payload.get("status")
-    allowed = {"assigned", "en_route", "arrived", "payment", "completed"}
-    if new_status not in allowed:
+    if new_status not in PROVIDER_STATUSES:
         raise HTTPException(status_code=400, detail="Invalid status")
-    if r.status == "completed":
-        raise HTTPException(status_code=400, detail="Job already completed")
 
-    r.status = new_status
+    guard = {"where": "provider_id = :pid", "params": {"pid": provider_id}}
+    row = request_state.transition(
+        db.connection(), request_id, new_status, version=payload.get("version"), **guard
+    )
+    if row is None:
+        db.rollback()
+        request_state.explain_miss(db.connection(), request_id, new_status, **guard)
     db.commit()
-    db.refresh(r)
-    return {"id": r.id, "status": r.status}
+
+    request_state.announce(row)
+    return {"id": row.id, "status": row.status, "version": row.version}
 
 
 # -------------------------------------------------
@@ -546,6 +600,9 @@ customer_router = APIRouter(prefix="/customer", tags=["customer-providers"])
 def nearby_providers(
     service_type: str = "",
     limit: int = Query(20, ge=1, le=50),
+    lat: Optional[float] = Query(None, ge=-90, le=90),
+    lng: Optional[float] = Query(None, ge=-180, le=180),
+    radius_km: Optional[float] = Query(None, gt=0),
     db: Session = Depends(get_db),
     user: dict = Depends(customer_required),
 ):
@@ -557,44 +614,59 @@ def nearby_providers(
     if not customer:
         raise HTTPException(status_code=400, detail="Customer profile not found")
 
-    q = (
-        db.query(models.Provider, models.User)
-        .join(models.User, models.User.id == models.Provider.user_id)
-        .filter(models.Provider.is_online == True)
-    )
-    if service_type:
-        q = q.filter(models.Provider.service_type == service_type)
-
-    rows = q.limit(200).all()
-    active_statuses = ["assigned", "en_route", "arrived", "payment"]
-
-    items = []
-    for p, u in rows:
-        has_active = (
-            db.query(models.Request)
-            .filter(
-                models.Request.provider_id == p.id,
-                models.Request.status.in_(active_statuses),
-            )
-            .first()
+    distances = {}
+    if lat is not None and lng is not None:
+        # Nearest-first candidates from the in-memory grid index
+        provider_index.ensure_loaded(db)
+        hits = provider_index.nearest(
+            [service_type] if service_type else None,
+            lat,
+            lng,
+            search_radius_km(radius_km),
+            200,
         )
-        if has_active:
-            continue
-
-        items.append(
-            {
-                "provider_id": p.id,
-                "name": u.full_name,
-                "area": getattr(p, "city", "") or "Mumbai",
-                "distance_km": None,
-                "est_min": getattr(p, "base_price", 0) or 0,
-                "est_max": (getattr(p, "base_price", 0) or 0) + 500,
-                "rating": getattr(p, "rating", 4.5),
-                "jobs": getattr(p, "jobs_completed", 0),
-            }
+        if not hits:
+            return {"items": []}
+        distances = dict(hits)
+
+        # One query for all candidates; busy providers drop out via NOT EXISTS
+        found = {
+            p.id: (p, u)
+            for p, u in db.query(models.Provider, models.User)
+            .join(models.User, models.User.id == models.Provider.user_id)
+            .filter(models.Provider.id.in_(distances.keys()))
+            .filter(~provider_has_active_job())
+            .all()
+        }
+        rows = [found[pid] for pid, _ in hits if pid in found][:limit]
+    else:
+        q = (
+            db.query(models.Provider, models.User)
+            .join(models.User, models.User.id == models.Provider.user_id)
+            .filter(models.Provider.is_online == True)
+            .filter(~provider_has_active_job())
         )
-        if len(items) >= limit:
-            break
+        if service_type:
+            q = q.filter(models.Provider.service_type == service_type)
+
+        rows = [
+            (p, u) for p, u in q.limit(limit * 2).all()
+            if not presence.is_expired(p.id)
+        ][:limit]
+
+    items = [
+        {
+            "provider_id": p.id,
+            "name": u.full_name,
+            "area": getattr(p, "city", "") or "Mumbai",
+            "distance_km": distances.get(p.id),
+            "est_min": getattr(p, "base_price", 0) or 0,
+            "est_max": (getattr(p, "base_price", 0) or 0) + 500,
+            "rating": getattr(p, "rating", 4.5),
+            "jobs": getattr(p, "jobs_completed", 0),
+        }
+        for p, u in rows
+    ]
 
     return {"items": items}
 
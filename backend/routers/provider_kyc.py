@@ -9,7 +9,10 @@ from sqlalchemy.orm import Session
 from database import get_db
 import models, schemas
 from deps.auth import get_current_user
-from utils.supabase_client import supabase
+from utils.supabase_client import get_supabase
+from services.presence import presence
+from services.provider_index import provider_index
+from services.stats_cache import provider_state, stats_counters
 
 router = APIRouter(prefix="/provider/kyc", tags=["provider-kyc"])
 
@@ -46,12 +49,13 @@ def upload_file_to_supabase(file: UploadFile, folder: str) -> str:
     content = file.file.read()
     file.file.seek(0)
 
-    supabase.storage.from_("kyc").upload(
+    bucket = get_supabase().storage.from_("kyc")
+    bucket.upload(
         filename,
         content,
         {"content-type": file.content_type or "application/octet-stream"},
     )
-    return supabase.storage.from_("kyc").get_public_url(filename)
+    return bucket.get_public_url(filename)
 
 
 @router.get("/status", response_model=schemas.ProviderKycStatusOut)
@@ -66,8 +70,10 @@ def kyc_status(
     return {"status": provider.kyc_status or "not_submitted"}
 
 
+# Plain def: the Supabase uploads and the Session are blocking, so this
+# runs in the threadpool instead of stalling the event loop
 @router.post("/upload")
-async def upload_kyc(
+def upload_kyc(
     id_number: str = Form(...),
     address_line: Optional[str] = Form(None),
     id_proof: UploadFile = File(...),
@@ -124,9 +130,13 @@ async def upload_kyc(
             )
         )
 
+    before = provider_state(provider)
     provider.kyc_status = "pending"
     provider.is_online = False
 
     db.commit()
+    stats_counters.provider_changed(before, provider)
+    presence.set_online(provider)
+    provider_index.remove(provider.id)
 
     return {"ok": True, "status": "pending"}
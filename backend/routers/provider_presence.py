@@ -1,11 +1,11 @@
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
-from datetime import datetime
 
 from database import get_db
 from deps.auth import get_current_user
-import models
 from schemas import ProviderLocationIn
+from services.live_location import live_locations
+from services.presence import record_ping
 
 router = APIRouter(prefix="/providers", tags=["provider-presence"])
 
@@ -28,35 +28,8 @@ def update_provider_location(
     db: Session = Depends(get_db),
     token=Depends(provider_required),
 ):
-    user_id = int(token["user_id"])
-
-    provider = (
-        db.query(models.Provider)
-        .filter(models.Provider.user_id == user_id)
-        .first()
-    )
-    if not provider:
-        raise HTTPException(status_code=404, detail="Provider not found")
-
-    location = (
-        db.query(models.ProviderLocation)
-        .filter(models.ProviderLocation.provider_id == provider.id)
-        .first()
+    provider_id = record_ping(
+        db, int(token["user_id"]), payload.latitude, payload.longitude
     )
-
-    if location:
-        location.latitude = payload.latitude
-        location.longitude = payload.longitude
-        location.updated_at = datetime.utcnow()
-    else:
-        db.add(
-            models.ProviderLocation(
-                provider_id=provider.id,
-                latitude=payload.latitude,
-                longitude=payload.longitude,
-                updated_at=datetime.utcnow(),
-            )
-        )
-
-    db.commit()
+    live_locations.update(provider_id, payload.latitude, payload.longitude)
     return {"ok": True}
@@ -10,17 +10,25 @@ from fastapi import (
     UploadFile,
     File,
     Query,
+    Response,
 )
+from fastapi.concurrency import run_in_threadpool
 from pydantic import BaseModel, Field
 from sqlalchemy.orm import Session
 
-from database import get_db
+from database import SessionLocal, get_db
 from deps.customer import customer_required
-from deps.auth import get_current_user
+from deps.auth import get_current_user, get_stream_user
 import models
-from services.location_service import reverse_geocode
-from services.cloudinary_service import upload_temp_image
-from services.groq_vision import analyze_service_image
+from services import offers, request_state
+from services.enrichment import address_enricher
+from services.image_analysis import ai_job_channel, image_analyzer
+from services.live_location import live_locations
+from services.location_trail import route
+from services.presence import presence
+from services.realtime import request_channel, sse_response
+from services.stats_cache import stats_counters
+from utils.pagination import keyset_page
 
 # =====================================================
 # SCHEMAS
@@ -32,8 +40,8 @@ class RequestCreateIn(BaseModel):
     address: Optional[str] = None
     description: Optional[str] = None
     budget: Optional[float] = None
-    customer_lat: Optional[float] = None
-    customer_lng: Optional[float] = None
+    customer_lat: Optional[float] = Field(None, ge=-90, le=90)
+    customer_lng: Optional[float] = Field(None, ge=-180, le=180)
 
 
 # =====================================================
@@ -64,22 +72,22 @@ def create_request(
         raise HTTPException(status_code=400, detail="Customer profile not found")
 
     address = payload.address
+    address_status = None
 
-    # If we have lat/lng but no address, try reverse geocoding
+    # Lat/lng but no address: store now, services.enrichment fills it in
     if (
         payload.customer_lat is not None
         and payload.customer_lng is not None
         and not address
     ):
-        geo = reverse_geocode(payload.customer_lat, payload.customer_lng)
-        if geo:
-            address = geo.get("formatted")
+        address_status = "pending"
 
     req = models.Request(
         customer_id=customer.id,
         title=payload.title,
         service_type=payload.service_type,
         address=address,
+        address_status=address_status,
         description=payload.description,
         budget=payload.budget,
         customer_lat=payload.customer_lat,
@@ -90,6 +98,9 @@ def create_request(
     db.add(req)
     db.commit()
     db.refresh(req)
+    stats_counters.incr("total_requests")
+    if address_status:
+        address_enricher.notify()
 
     return {
         "id": req.id,
@@ -97,6 +108,7 @@ def create_request(
         "service_type": req.service_type,
         "status": req.status,
         "address": req.address,
+        "address_status": req.address_status,
         "customer_lat": req.customer_lat,
         "customer_lng": req.customer_lng,
         "budget": req.budget,
@@ -109,11 +121,17 @@ def create_request(
 
 @requests_router.get("/my")
 def my_requests(
+    response: Response,
     limit: int = Query(20, ge=1, le=100),
-    offset: int = Query(0, ge=0),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    offset: int = Query(0, ge=0, description="Legacy; ignored when cursor is set"),
     db: Session = Depends(get_db),
     user: dict = Depends(customer_required),
 ):
+    """
+    Newest first. The next page cursor is sent in the X-Next-Cursor header
+    so the response body stays a plain list.
+    """
     customer = (
         db.query(models.Customer)
         .filter(models.Customer.user_id == user["user_id"])
@@ -122,14 +140,15 @@ def my_requests(
     if not customer:
         raise HTTPException(status_code=400, detail="Customer profile not found")
 
-    rows = (
-        db.query(models.Request)
-        .filter(models.Request.customer_id == customer.id)
-        .order_by(models.Request.id.desc())
-        .offset(offset)
-        .limit(limit)
-        .all()
+    rows, next_cursor = keyset_page(
+        db.query(models.Request).filter(models.Request.customer_id == customer.id),
+        models.Request.id,
+        limit=limit,
+        cursor=cursor,
+        offset=offset,
     )
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
 
     return [
         {
@@ -139,6 +158,7 @@ def my_requests(
             "status": r.status,
             "budget": getattr(r, "budget", None),
             "address": getattr(r, "address", None),
+            "address_status": getattr(r, "address_status", None),
             "description": getattr(r, "description", None),
             "provider_id": getattr(r, "provider_id", None),
         }
@@ -193,19 +213,31 @@ def assign_provider(
     if not provider:
         raise HTTPException(status_code=404, detail="Provider not found")
 
-    r.provider_id = provider.id
-
-    if hasattr(provider, "base_price"):
-        r.budget = provider.base_price
+    # Only if nothing (accept, dispatch, another tab) changed it since the read
+    previous_provider_id = r.provider_id
+    guard = {"where": "customer_id = :cid", "params": {"cid": customer.id}}
+    row = request_state.reassign(
+        db.connection(), r.id, provider.id, provider.base_price, version=r.version, **guard
+    )
+    if row is None:
+        db.rollback()
+        request_state.explain_miss(
+            db.connection(), r.id, "pending", allowed=("pending",), **guard
+        )
 
+    # The customer's pick replaces any dispatcher offers
+    withdrawn = offers.close(db.connection(), r.id)
     db.commit()
-    db.refresh(r)
+
+    request_state.announce_assignment(row, previous_provider_id)
+    offers.publish_withdrawn(row.id, withdrawn)
 
     return {
-        "id": r.id,
-        "status": r.status,
-        "provider_id": r.provider_id,
-        "budget": getattr(r, "budget", None),
+        "id": row.id,
+        "status": row.status,
+        "provider_id": row.provider_id,
+        "budget": row.budget,
+        "version": row.version,
     }
 
 
@@ -227,30 +259,125 @@ def cancel_request(
     if not customer:
         raise HTTPException(status_code=400, detail="Customer profile not found")
 
-    req = (
+    guard = {"where": "customer_id = :cid", "params": {"cid": customer.id}}
+    row = request_state.transition(db.connection(), request_id, "cancelled", **guard)
+    if row is None:
+        db.rollback()
+        request_state.explain_miss(db.connection(), request_id, "cancelled", **guard)
+    withdrawn = offers.close(db.connection(), row.id)
+    db.commit()
+
+    request_state.announce(row)
+    offers.publish_withdrawn(row.id, withdrawn)
+
+    return {
+        "id": row.id,
+        "status": row.status,
+        "version": row.version,
+    }
+
+
+# =====================================================
+# REQUEST EVENTS (Server-Sent Events)
+# =====================================================
+
+def _customer_owns_request(user_id: int, request_id: int) -> bool:
+    db = SessionLocal()
+    try:
+        return (
+            db.query(models.Request.id)
+            .join(models.Customer, models.Customer.id == models.Request.customer_id)
+            .filter(
+                models.Request.id == request_id,
+                models.Customer.user_id == user_id,
+            )
+            .first()
+            is not None
+        )
+    finally:
+        db.close()
+
+
+@requests_router.get("/{request_id}/events")
+async def request_events(request_id: int, user: dict = Depends(get_stream_user)):
+    """
+    Push stream for the owning customer: "request.status" on every status
+    transition, "request.provider" when a provider is assigned, and
+    "location"/"location.delta" with the provider's position during an
+    active job (see services.live_location). GET /requests/{id} remains
+    the polling fallback.
+    """
+    if user.get("role") != "customer":
+        raise HTTPException(status_code=403, detail="Customer access required")
+
+    owned = await run_in_threadpool(_customer_owns_request, user["user_id"], request_id)
+    if not owned:
+        raise HTTPException(status_code=404, detail="Request not found")
+
+    return sse_response(request_channel(request_id))
+
+
+# =====================================================
+# PROVIDER LOCATION SNAPSHOT
+# =====================================================
+
+@requests_router.get("/{request_id}/provider-location")
+def request_provider_location(
+    request_id: int,
+    db: Session = Depends(get_db),
+    user: dict = Depends(customer_required),
+):
+    """
+    Latest position of the assigned provider, for the first map render or
+    after a gap in the location stream.
+    """
+    r = (
         db.query(models.Request)
+        .join(models.Customer, models.Customer.id == models.Request.customer_id)
         .filter(
             models.Request.id == request_id,
-            models.Request.customer_id == customer.id,
+            models.Customer.user_id == user["user_id"],
         )
         .first()
     )
-    if not req:
+    if not r:
         raise HTTPException(status_code=404, detail="Request not found")
 
-    if str(req.status).lower() != "pending":
-        raise HTTPException(
-            status_code=400,
-            detail="Only pending requests can be cancelled",
-        )
+    latest = live_locations.latest(r.id)
+    if latest is None and r.provider is not None:
+        latest = presence.current(r.provider)
 
-    req.status = "cancelled"
-    db.commit()
-    db.refresh(req)
+    lat, lng = latest or (None, None)
+    return {"latitude": lat, "longitude": lng}
+
+
+@requests_router.get("/{request_id}/route")
+def request_route(
+    request_id: int,
+    db: Session = Depends(get_db),
+    user: dict = Depends(customer_required),
+):
+    """
+    Stored path of the provider during this job, oldest point first.
+    Lags the live stream by up to one presence flush.
+    """
+    owned = (
+        db.query(models.Request.id)
+        .join(models.Customer, models.Customer.id == models.Request.customer_id)
+        .filter(
+            models.Request.id == request_id,
+            models.Customer.user_id == user["user_id"],
+        )
+        .first()
+    )
+    if not owned:
+        raise HTTPException(status_code=404, detail="Request not found")
 
     return {
-        "id": req.id,
-        "status": req.status,
+        "points": [
+            {"latitude": lat, "longitude": lng, "recorded_at": at.isoformat()}
+            for lat, lng, at in route(db, request_id)
+        ]
     }
 
 
@@ -290,6 +417,7 @@ def get_request(
         "status": r.status,
         "budget": getattr(r, "budget", None),
         "address": getattr(r, "address", None),
+        "address_status": getattr(r, "address_status", None),
         "description": getattr(r, "description", None),
         "provider_id": getattr(r, "provider_id", None),
     }
@@ -300,29 +428,52 @@ def get_request(
 # =====================================================
 
 @ai_router.post("/analyze-image")
-async def analyze_image(image: UploadFile = File(...)):
+async def analyze_image(
+    response: Response,
+    image: UploadFile = File(...),
+    job: bool = Query(False, description="Return a job id at once instead of waiting"),
+):
     """
     Uploads the received image to Cloudinary and runs Groq vision to
     infer the service type. Returns a stable JSON payload.
+
+    With ?job=true it answers 202 with a job id straight away; fetch the
+    outcome from /ai/jobs/{id} or listen on /ai/jobs/{id}/events.
     """
     image_bytes = await image.read()
     logger.info("Received image: %s (%d bytes)", image.filename, len(image_bytes))
 
-    try:
-        image_url = upload_temp_image(image_bytes)
-        logger.info("Cloudinary URL: %s", image_url)
-        result = analyze_service_image(image_url)
-        logger.info("Groq result: %s", result)
-    except Exception as exc:
-        logger.exception("AI image analysis failed")
-        raise HTTPException(
-            status_code=500,
-            detail=f"AI image analysis failed: {exc}",
-        )
+    if not job:
+        return await image_analyzer.analyze(image_bytes)
 
+    pending = image_analyzer.submit(image_bytes)
+    response.status_code = 202
     return {
-        "suggested_service": result.get("service", "Appliance repair"),
-        "suggested_title": "Service request",
-        "suggested_description": result.get("description", ""),
-        "ai_provider": "groq",
+        **pending,
+        "status_url": f"/ai/jobs/{pending['id']}",
+        "events_url": f"/ai/jobs/{pending['id']}/events",
     }
+
+
+@ai_router.get("/jobs/{job_id}")
+async def analyze_image_job(job_id: str):
+    """
+    status "pending", "done" (with `result`, the same payload as the
+    synchronous call) or "failed" (with `error`).
+    """
+    job = image_analyzer.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found or expired")
+    return job
+
+
+@ai_router.get("/jobs/{job_id}/events")
+async def analyze_image_job_events(job_id: str):
+    """
+    Push stream with one "ai.result" event (the job, as in /ai/jobs/{id})
+    when the analysis finishes. The unguessable job id is the credential,
+    as for the job itself.
+    """
+    if image_analyzer.get(job_id) is None:
+        raise HTTPException(status_code=404, detail="Job not found or expired")
+    return sse_response(ai_job_channel(job_id), lambda: image_analyzer.result_event(job_id))
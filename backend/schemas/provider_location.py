@@ -3,8 +3,10 @@ from pydantic import BaseModel, Field
 
 
 class ProviderLocationIn(BaseModel):
-    latitude: float = Field(..., example=18.5204)
-    longitude: float = Field(..., example=73.8567)
+    latitude: float = Field(..., ge=-90, le=90, example=18.5204)
+    longitude: float = Field(..., ge=-180, le=180, example=73.8567)
+    # Omitted: leave the provider's online flag as it is
+    is_online: Optional[bool] = None
 
 
 class ProviderLocationOut(BaseModel):
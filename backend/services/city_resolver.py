@@ -0,0 +1,126 @@
+# backend/services/city_resolver.py
+"""
+Offline lat/lng -> city resolution.
+
+City centroids come from a bundled CSV (data/cities.csv: name, state,
+country, latitude, longitude, radius_km; point CITY_DATA_PATH at a
+larger extract with the same columns to extend it). They are loaded
+once into a k-d tree over unit-sphere vectors, so a lookup is a
+nearest-two query with no network.
+
+The local answer is "ambiguous" when the point is outside the nearest
+city's radius, or inside two cities' radii at similar distances. Only
+then does `city_for` fall back to OpenCage (through the geocode cache).
+"""
+
+import csv
+import logging
+import math
+import os
+import threading
+from pathlib import Path
+from typing import List, NamedTuple, Optional
+
+from services.geocoding import reverse_geocode_sync
+from utils.distance import EARTH_RADIUS_KM
+from utils.kdtree import KDTree
+
+logger = logging.getLogger("quickserve.city_resolver")
+
+DATA_PATH = Path(
+    os.getenv("CITY_DATA_PATH", Path(__file__).resolve().parent.parent / "data" / "cities.csv")
+)
+# second city counts as a contender when it is at most this much farther
+AMBIGUITY_RATIO = 1.25
+
+
+class City(NamedTuple):
+    name: str
+    state: str
+    country: str
+    latitude: float
+    longitude: float
+    radius_km: float
+
+
+class Resolution(NamedTuple):
+    city: City
+    distance_km: float
+    ambiguous: bool
+
+
+def _unit_vector(lat: float, lng: float):
+    la, lo = math.radians(lat), math.radians(lng)
+    return (math.cos(la) * math.cos(lo), math.cos(la) * math.sin(lo), math.sin(la))
+
+
+def _chord2_to_km(chord2: float) -> float:
+    # great-circle distance from the squared chord between unit vectors
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(chord2) / 2))
+
+
+class CityResolver:
+    def __init__(self, path: Path = DATA_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        self._cities: List[City] = []
+        self._tree: Optional[KDTree] = None
+
+    def _load(self):
+        with self._lock:
+            if self._tree is not None:
+                return
+            with open(self.path, newline="", encoding="utf-8") as f:
+                cities = [
+                    City(
+                        row["name"],
+                        row["state"],
+                        row["country"],
+                        float(row["latitude"]),
+                        float(row["longitude"]),
+                        float(row.get("radius_km") or 10),
+                    )
+                    for row in csv.DictReader(f)
+                ]
+            self._cities = cities
+            self._tree = KDTree([_unit_vector(c.latitude, c.longitude) for c in cities])
+            logger.info("City resolver loaded %d cities from %s", len(cities), self.path)
+
+    def resolve(self, lat: float, lng: float) -> Resolution:
+        if self._tree is None:
+            self._load()
+
+        hits = self._tree.query(_unit_vector(lat, lng), k=2)
+        nearest = self._cities[hits[0][1]]
+        d1 = _chord2_to_km(hits[0][0])
+
+        ambiguous = d1 > nearest.radius_km
+        if not ambiguous and len(hits) > 1:
+            other = self._cities[hits[1][1]]
+            d2 = _chord2_to_km(hits[1][0])
+            ambiguous = d2 <= other.radius_km and d2 <= d1 * AMBIGUITY_RATIO
+
+        return Resolution(nearest, d1, ambiguous)
+
+
+city_resolver = CityResolver()
+
+
+def city_for(lat: float, lng: float) -> Optional[str]:
+    """
+    City name for a point: the local answer when it is clear-cut,
+    otherwise OpenCage's (cached). If OpenCage has no answer, the nearest
+    city is used when the point is inside its radius, else None.
+    """
+    local = city_resolver.resolve(lat, lng)
+    if not local.ambiguous:
+        return local.city.name
+
+    try:
+        geo = reverse_geocode_sync(lat, lng)
+    except Exception:
+        logger.warning("Reverse geocode failed for ambiguous city lookup", exc_info=True)
+        geo = None
+    if geo and geo.get("city"):
+        return geo["city"]
+    return local.city.name if local.distance_km <= local.city.radius_km else None
@@ -1,18 +1,42 @@
-import cloudinary.uploader
 import logging
-from utils import cloudinary_config  # noqa
+import threading
+from typing import Optional
+from services import fakes
+from utils import cloudinary_config
 
 logger = logging.getLogger("quickserve.cloudinary")
 
-def upload_temp_image(image_bytes: bytes) -> str:
+_lock = threading.Lock()
+_uploader = None
+
+
+def get_uploader():
+    """
+    cloudinary.uploader, configured on first use (or the fake).
+    """
+    global _uploader
+    with _lock:
+        if _uploader is None:
+            if fakes.use_fake("cloudinary"):
+                _uploader = fakes.FakeCloudinaryUploader(fakes.LatencyModel.from_env("cloudinary"))
+            else:
+                cloudinary_config.configure()
+                import cloudinary.uploader
+
+                _uploader = cloudinary.uploader
+        return _uploader
+
+
+def upload_temp_image(image_bytes: bytes, timeout: Optional[float] = None) -> str:
     logger.info("Uploading image to Cloudinary (%d bytes)", len(image_bytes))
     try:
-        result = cloudinary.uploader.upload(
+        result = get_uploader().upload(
             image_bytes,
             folder="quickserve_tmp",
             resource_type="image",
             use_filename=True,
             unique_filename=True,
+            **({"timeout": timeout} if timeout else {}),
         )
         logger.info("Cloudinary upload result: %s", result)
     except Exception as exc:
@@ -0,0 +1,359 @@
+# backend/services/dispatch.py
+"""
+Automatic dispatch of open requests to available providers.
+
+Every WINDOW_SECONDS the worker takes the open requests (pending, no
+provider yet, with a customer location; oldest first, up to MAX_BATCH)
+and matches them in one go:
+
+1. Candidates: the CANDIDATES_PER_REQUEST nearest providers of the
+   request's service type from the in-memory provider index (online,
+   approved, lease alive), minus providers that are busy, already hold
+   a pending request or a live offer.
+2. Cost of each request/provider pair (lower is better, all terms
+   >= 0): distance as a share of the search radius, rating below 5,
+   little experience (jobs_completed), and base_price above the
+   request's budget as a share of the budget. See `pair_cost`.
+3. A global min-cost matching over those pairs (utils.assignment), so
+   one provider is not handed to the first request that happens to be
+   looked at when another request needs them more.
+
+Each matched request is then offered (services.offers) to its matched
+provider plus the next best candidates, `dispatch_offer_count` in all
+(other requests' matched providers are left out), for
+`dispatch_offer_timeout_s` seconds. Each of them gets "request.offered";
+the first to accept wins and the rest are withdrawn. Offers that expire
+are swept at the start of a window and the request goes back into the
+pool, minus the providers it was already offered to. Providers holding
+a live offer count as busy. Turn it off with the `auto_dispatch` admin
+setting.
+
+One dispatcher per deployment: every worker process that runs the app
+starts one, so on Postgres each window first takes a transaction-level
+advisory lock (like the migration runner) and a worker that doesn't get
+it skips the window. Offers are only inserted while the request is
+still open, so a request assigned or cancelled mid-window gets none.
+"""
+
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterable, List, NamedTuple, Optional, Set, Tuple
+
+from sqlalchemy import bindparam, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+from services import offers
+from services.provider_index import provider_index, search_radius_km
+from services.realtime import hub, provider_channel
+from services.request_state import ACTIVE_STATUSES
+from utils.assignment import min_cost_matching
+from utils.settings_store import cached_settings
+
+logger = logging.getLogger("quickserve.dispatch")
+
+WINDOW_SECONDS = float(os.getenv("DISPATCH_WINDOW_SECONDS", "2"))
+MAX_BATCH = int(os.getenv("DISPATCH_MAX_BATCH", "5000"))
+CANDIDATES_PER_REQUEST = 8
+ID_CHUNK = 1000
+# Arbitrary key for pg_try_advisory_xact_lock: one dispatcher per deployment
+ADVISORY_LOCK_KEY = 7_240_119
+
+# Cost weights
+W_DISTANCE = 1.0
+W_RATING = 0.4
+W_EXPERIENCE = 0.2
+W_PRICE = 0.6
+# Assumed for providers without ratings yet
+NEUTRAL_RATING = 4.0
+
+
+class OpenRequest(NamedTuple):
+    id: int
+    title: str
+    service_type: str
+    lat: float
+    lng: float
+    budget: Optional[float]
+
+
+class ProviderStats(NamedTuple):
+    rating: Optional[float]
+    jobs_completed: Optional[int]
+    base_price: Optional[float]
+
+
+def pair_cost(
+    distance_km: float, radius_km: float, provider: ProviderStats, budget: Optional[float]
+) -> float:
+    rating = provider.rating if provider.rating is not None else NEUTRAL_RATING
+    jobs = provider.jobs_completed or 0
+    cost = W_DISTANCE * distance_km / radius_km
+    cost += W_RATING * max(0.0, 5.0 - rating) / 5.0
+    cost += W_EXPERIENCE * 10.0 / (10.0 + jobs)
+    if budget and provider.base_price:
+        cost += W_PRICE * max(0.0, provider.base_price - budget) / budget
+    return cost
+
+
+def candidates(
+    requests: List[OpenRequest],
+    radius_km: float,
+    busy: Set[int],
+    offered: Set[Tuple[int, int]] = frozenset(),
+) -> Dict[int, List[Tuple[int, float]]]:
+    """
+    Request index -> [(provider_id, distance_km)], nearest first.
+    `offered` holds (request_id, provider_id) pairs not to repeat.
+    """
+    out = {}
+    for i, r in enumerate(requests):
+        near = provider_index.nearest(
+            [r.service_type], r.lat, r.lng, radius_km, CANDIDATES_PER_REQUEST * 3
+        )
+        picked = [
+            (pid, d) for pid, d in near
+            if pid not in busy and (r.id, pid) not in offered
+        ][:CANDIDATES_PER_REQUEST]
+        if picked:
+            out[i] = picked
+    return out
+
+
+def assign(
+    requests: List[OpenRequest],
+    cands: Dict[int, List[Tuple[int, float]]],
+    stats: Dict[int, ProviderStats],
+    radius_km: float,
+) -> List[Tuple[OpenRequest, int]]:
+    """
+    Min-cost matching of requests to their candidates.
+    """
+    missing = ProviderStats(None, None, None)
+    edges = [
+        (i, pid, pair_cost(d, radius_km, stats.get(pid, missing), requests[i].budget))
+        for i, near in cands.items()
+        for pid, d in near
+    ]
+    return [(requests[i], pid) for i, pid in min_cost_matching(edges)]
+
+
+def offer_lists(
+    requests: List[OpenRequest],
+    cands: Dict[int, List[Tuple[int, float]]],
+    stats: Dict[int, ProviderStats],
+    radius_km: float,
+    count: int,
+) -> List[Tuple[OpenRequest, List[int]]]:
+    """
+    The matched provider of each request first, then its cheapest other
+    candidates up to `count`. A provider matched to one request is not a
+    backup for another.
+    """
+    missing = ProviderStats(None, None, None)
+    index = {r.id: i for i, r in enumerate(requests)}
+    pairs = assign(requests, cands, stats, radius_km)
+    primaries = {pid for _, pid in pairs}
+    out = []
+    for req, pid in pairs:
+        backups = sorted(
+            (pair_cost(d, radius_km, stats.get(other, missing), req.budget), other)
+            for other, d in cands[index[req.id]]
+            if other not in primaries
+        )
+        out.append((req, [pid] + [other for _, other in backups[:max(0, count - 1)]]))
+    return out
+
+
+class Dispatcher:
+    def __init__(self, window_seconds: float = WINDOW_SECONDS, max_batch: int = MAX_BATCH):
+        self.window_seconds = window_seconds
+        self.max_batch = max_batch
+        self._engine: Optional[Engine] = None
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.windows = 0
+        self.considered = 0
+        self.offered = 0
+        self.offers = 0
+        self.expired = 0
+        self.skipped = 0
+        self.last_batch_ms = 0.0
+
+    # -------------------------------------------------
+    # Database
+    # -------------------------------------------------
+    def _open_requests(self, conn) -> List[OpenRequest]:
+        rows = conn.execute(
+            text(
+                "SELECT id, title, service_type, customer_lat, customer_lng, budget "
+                "FROM requests r WHERE status = 'pending' AND provider_id IS NULL "
+                "AND customer_lat IS NOT NULL AND customer_lng IS NOT NULL "
+                "AND NOT EXISTS (SELECT 1 FROM request_offers o "
+                "WHERE o.request_id = r.id AND o.status = 'offered') "
+                "ORDER BY id LIMIT :n"
+            ),
+            {"n": self.max_batch},
+        ).all()
+        return [OpenRequest(*row) for row in rows]
+
+    def _busy(self, conn) -> Set[int]:
+        # Providers on a job, holding a pending request or a live offer
+        statuses = ("pending", *ACTIVE_STATUSES)
+        rows = conn.execute(
+            text(
+                "SELECT provider_id FROM requests "
+                "WHERE provider_id IS NOT NULL AND status IN :statuses "
+                "UNION SELECT provider_id FROM request_offers WHERE status = 'offered'"
+            ).bindparams(bindparam("statuses", expanding=True)),
+            {"statuses": statuses},
+        ).all()
+        return {row[0] for row in rows}
+
+    def _stats(self, conn, provider_ids: Iterable[int]) -> Dict[int, ProviderStats]:
+        ids = sorted(set(provider_ids))
+        query = text(
+            "SELECT id, rating, jobs_completed, base_price FROM providers WHERE id IN :ids"
+        ).bindparams(bindparam("ids", expanding=True))
+        out = {}
+        for start in range(0, len(ids), ID_CHUNK):
+            for pid, rating, jobs, price in conn.execute(query, {"ids": ids[start:start + ID_CHUNK]}):
+                out[pid] = ProviderStats(rating, jobs, price)
+        return out
+
+    @contextmanager
+    def _leader(self, engine: Engine):
+        """
+        Yields whether this process may dispatch the window. On Postgres
+        only the worker holding the advisory lock does; it is released
+        with the transaction at the end of the window.
+        """
+        if engine.dialect.name != "postgresql":
+            yield True
+            return
+        with engine.begin() as conn:
+            yield conn.execute(
+                text("SELECT pg_try_advisory_xact_lock(:key)"), {"key": ADVISORY_LOCK_KEY}
+            ).scalar()
+
+    # -------------------------------------------------
+    # Dispatch
+    # -------------------------------------------------
+    def dispatch_once(self, engine: Optional[Engine] = None) -> int:
+        """
+        Offer one window of open requests. Returns the number offered.
+        """
+        engine = engine or self._engine
+        with self._leader(engine) as leader:
+            if not leader:
+                self.skipped += 1
+                return 0
+            return self._dispatch(engine)
+
+    def _dispatch(self, engine: Engine) -> int:
+        settings = cached_settings()
+        if not settings.get("auto_dispatch", True):
+            return 0
+        count = max(1, int(settings.get("dispatch_offer_count", 3)))
+        timeout_s = float(settings.get("dispatch_offer_timeout_s", 30))
+
+        started = time.perf_counter()
+        with engine.begin() as conn:
+            expired = offers.expire(conn)
+        for rid, pid in expired:
+            offers.publish_withdrawn(rid, [pid])
+
+        with Session(engine) as db:
+            provider_index.ensure_loaded(db)
+
+        with engine.connect() as conn:
+            requests = self._open_requests(conn)
+            if not requests:
+                self.expired += len(expired)
+                return 0
+            busy = self._busy(conn)
+            offered = offers.offered_before(conn, (r.id for r in requests))
+            radius_km = search_radius_km()
+            cands = candidates(requests, radius_km, busy, offered)
+            stats = self._stats(conn, (pid for near in cands.values() for pid, _ in near))
+
+        lists = offer_lists(requests, cands, stats, radius_km, count)
+        with engine.begin() as conn:
+            expires_at, created = offers.create(
+                conn,
+                ((req.id, pid, rank) for req, pids in lists for rank, pid in enumerate(pids)),
+                timeout_s,
+            )
+        # Drop requests assigned or cancelled while this window ran
+        lists = [(req, pids) for req, pids in lists if req.id in created]
+
+        for req, pids in lists:
+            for rank, pid in enumerate(pids):
+                price = stats[pid].base_price if pid in stats else None
+                hub.publish(
+                    provider_channel(pid),
+                    "request.offered",
+                    {
+                        "id": req.id,
+                        "title": req.title,
+                        "service_type": req.service_type,
+                        "status": "pending",
+                        # What accepting sets it to: the provider's base price
+                        "budget": price if price is not None else req.budget,
+                        "rank": rank,
+                        "expires_at": expires_at.isoformat() + "Z",
+                    },
+                )
+
+        n_offers = sum(len(pids) for _, pids in lists)
+        self.windows += 1
+        self.considered += len(requests)
+        self.offered += len(lists)
+        self.offers += n_offers
+        self.expired += len(expired)
+        self.last_batch_ms = round((time.perf_counter() - started) * 1000, 1)
+        logger.debug(
+            "Offered %d of %d open requests (%d offers) in %.1f ms",
+            len(lists), len(requests), n_offers, self.last_batch_ms,
+        )
+        return len(lists)
+
+    def _run(self):
+        while not self._stop.wait(self.window_seconds):
+            try:
+                self.dispatch_once()
+            except Exception:
+                logger.exception("Dispatch window failed")
+
+    def start(self, engine: Engine):
+        self._engine = engine
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="dispatch", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self.window_seconds + 5)
+            self._thread = None
+
+    def stats(self) -> dict:
+        return {
+            "enabled": bool(cached_settings().get("auto_dispatch", True)),
+            "window_seconds": self.window_seconds,
+            "windows": self.windows,
+            "considered": self.considered,
+            "offered": self.offered,
+            "offers": self.offers,
+            "expired": self.expired,
+            "skipped": self.skipped,
+            "last_batch_ms": self.last_batch_ms,
+        }
+
+
+dispatcher = Dispatcher()
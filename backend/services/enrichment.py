@@ -0,0 +1,150 @@
+# backend/services/enrichment.py
+"""
+Background address enrichment for new requests.
+
+create_request never waits on OpenCage. When the customer sends a
+location without an address, the request is stored with
+address_status = 'pending' and the worker is woken up. Each pass takes
+up to BATCH_SIZE pending requests (oldest first, off a partial index),
+reverse-geocodes them in one concurrent batch (services.geocoding,
+cache first), stores the addresses and publishes "request.updated" to
+the request's stream and, once assigned, its provider's.
+
+A location OpenCage has no address for, or rejects outright (see
+GeocodingError.permanent), is marked 'unresolved' so it cannot hold up
+the queue. Lookups that failed otherwise stay pending and are retried
+on a later pass; the worker
+also polls every POLL_SECONDS so rows from other workers and from
+before a restart are picked up.
+"""
+
+import asyncio
+import logging
+import os
+import threading
+from typing import Optional
+
+from sqlalchemy import text
+from sqlalchemy.engine import Engine
+
+from services.geocoding import GeocodingError, reverse_geocode_many
+from services.realtime import hub, provider_channel, request_channel
+
+logger = logging.getLogger("quickserve.enrichment")
+
+POLL_SECONDS = float(os.getenv("ENRICHMENT_POLL_SECONDS", "5"))
+BATCH_SIZE = 50
+
+PENDING = "pending"
+RESOLVED = "resolved"
+UNRESOLVED = "unresolved"
+
+
+class AddressEnricher:
+    def __init__(self, poll_seconds: float = POLL_SECONDS, batch_size: int = BATCH_SIZE):
+        self.poll_seconds = poll_seconds
+        self.batch_size = batch_size
+        self._engine: Optional[Engine] = None
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.resolved = 0
+        self.unresolved = 0
+        self.failed = 0
+
+    def notify(self):
+        """A request was stored with a pending address."""
+        self._wake.set()
+
+    def enrich_once(self, engine: Optional[Engine] = None) -> int:
+        """
+        Enrich one batch and return the number of requests completed. A
+        full batch means more may be waiting.
+        """
+        engine = engine or self._engine
+        with engine.connect() as conn:
+            rows = conn.execute(
+                text(
+                    "SELECT id, customer_lat, customer_lng, provider_id FROM requests "
+                    "WHERE address_status = :pending ORDER BY id LIMIT :n"
+                ),
+                {"pending": PENDING, "n": self.batch_size},
+            ).all()
+        if not rows:
+            return 0
+
+        results = asyncio.run(reverse_geocode_many([(r[1], r[2]) for r in rows]))
+
+        done = []
+        for (request_id, _, _, provider_id), geo in zip(rows, results):
+            if isinstance(geo, GeocodingError) and geo.permanent:
+                logger.warning("Address lookup rejected for request %s: %s", request_id, geo)
+                done.append((request_id, provider_id, None, UNRESOLVED))
+                continue
+            if isinstance(geo, BaseException):
+                logger.warning("Address lookup failed for request %s: %s", request_id, geo)
+                self.failed += 1
+                continue
+            address = geo.get("formatted") if geo else None
+            done.append((request_id, provider_id, address, RESOLVED if address else UNRESOLVED))
+
+        published = []
+        with engine.begin() as conn:
+            for request_id, provider_id, address, status in done:
+                # Guarded so a row finished by another worker is left alone
+                res = conn.execute(
+                    text(
+                        "UPDATE requests SET address = :address, address_status = :status "
+                        "WHERE id = :id AND address_status = :pending"
+                    ),
+                    {"address": address, "status": status, "id": request_id, "pending": PENDING},
+                )
+                if res.rowcount:
+                    published.append((request_id, provider_id, address, status))
+
+        for request_id, provider_id, address, status in published:
+            if status == RESOLVED:
+                self.resolved += 1
+            else:
+                self.unresolved += 1
+            event = {"id": request_id, "address": address, "address_status": status}
+            hub.publish(request_channel(request_id), "request.updated", event)
+            if provider_id:
+                hub.publish(provider_channel(provider_id), "request.updated", event)
+
+        return len(done)
+
+    def _run(self):
+        while not self._stop.is_set():
+            self._wake.wait(self.poll_seconds)
+            self._wake.clear()
+            if self._stop.is_set():
+                break
+            try:
+                while self.enrich_once() == self.batch_size:
+                    pass
+            except Exception:
+                logger.exception("Address enrichment pass failed")
+
+    def start(self, engine: Engine):
+        self._engine = engine
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="address-enrichment", daemon=True)
+        self._thread.start()
+        # Pick up whatever was left pending before the restart
+        self._wake.set()
+
+    def stop(self):
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout=10)
+            self._thread = None
+
+    def stats(self) -> dict:
+        return {"resolved": self.resolved, "unresolved": self.unresolved, "failed": self.failed}
+
+
+address_enricher = AddressEnricher()
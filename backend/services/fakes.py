@@ -0,0 +1,242 @@
+# backend/services/fakes.py
+"""
+In-process stand-ins for the external services, for offline runs and
+load tests.
+
+FAKE_SERVICES picks which ones are replaced: a comma-separated list of
+opencage, groq, cloudinary, supabase, or "all". Each fake implements
+only the slice of the real SDK the app uses, so the calling code is the
+same either way:
+
+- opencage:   an httpx transport under services.geocoding's client
+              (its pooling, retries and backoff still run);
+- groq:       client.chat.completions.create(...) -> JSON content;
+- cloudinary: uploader.upload(bytes, ...) -> {"secure_url": ...};
+- supabase:   client.storage.from_(bucket).upload / get_public_url.
+
+Every call waits a latency drawn from a log-normal distribution and
+fails at a configured rate:
+    FAKE_<NAME>_LATENCY_MS   "median,p99" in ms (defaults in DEFAULTS)
+    FAKE_<NAME>_FAILURE_RATE share of calls that fail, e.g. 0.02
+Failures look like the real service's: OpenCage answers 503, the SDK
+fakes raise.
+"""
+
+import asyncio
+import hashlib
+import json
+import math
+import os
+import random
+import threading
+import time
+from types import SimpleNamespace
+from typing import Dict, Optional, Tuple
+
+import httpx
+
+SERVICES = ("opencage", "groq", "cloudinary", "supabase")
+
+# name -> (median ms, p99 ms)
+DEFAULTS: Dict[str, Tuple[float, float]] = {
+    "opencage": (150, 600),
+    "groq": (1200, 4000),
+    "cloudinary": (400, 1500),
+    "supabase": (250, 900),
+}
+
+# z-score of the 99th percentile
+_Z99 = 2.326
+
+_VISION_SERVICES = (
+    "Electrical issue", "AC Repair", "Plumbing leak", "Cleaning",
+    "Carpentry", "Appliance repair", "Painting",
+)
+_CITIES = ("Mumbai", "Thane", "Navi Mumbai", "Pune")
+
+
+def _enabled() -> set:
+    raw = os.getenv("FAKE_SERVICES", "")
+    names = {n.strip().lower() for n in raw.split(",") if n.strip()}
+    return set(SERVICES) if "all" in names else names
+
+
+def use_fake(name: str) -> bool:
+    return name in _enabled()
+
+
+class LatencyModel:
+    """
+    Log-normal latency with the given median and p99, plus a failure rate.
+    """
+
+    def __init__(self, median_ms: float, p99_ms: float, failure_rate: float = 0.0, seed: Optional[int] = None):
+        self.median_ms = median_ms
+        self.p99_ms = max(p99_ms, median_ms)
+        self.failure_rate = failure_rate
+        self._sigma = math.log(self.p99_ms / median_ms) / _Z99 if median_ms > 0 else 0.0
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls, name: str) -> "LatencyModel":
+        median, p99 = DEFAULTS[name]
+        raw = os.getenv(f"FAKE_{name.upper()}_LATENCY_MS")
+        if raw:
+            parts = [float(x) for x in raw.split(",")]
+            median, p99 = parts[0], parts[1] if len(parts) > 1 else parts[0]
+        rate = float(os.getenv(f"FAKE_{name.upper()}_FAILURE_RATE", "0"))
+        return cls(median, p99, rate)
+
+    def draw(self) -> Tuple[float, bool]:
+        """
+        (seconds to wait, whether this call fails)
+        """
+        with self._lock:
+            ms = self.median_ms * math.exp(self._rng.gauss(0, self._sigma)) if self.median_ms > 0 else 0.0
+            return ms / 1000, self._rng.random() < self.failure_rate
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """
+        Sleep one draw; like an SDK with a request timeout, raise
+        TimeoutError at `timeout` if the draw is longer.
+        """
+        seconds, fail = self.draw()
+        if timeout is not None and seconds > timeout:
+            time.sleep(timeout)
+            raise TimeoutError(f"fake call timed out after {timeout:g} s")
+        time.sleep(seconds)
+        return fail
+
+    async def await_(self) -> bool:
+        seconds, fail = self.draw()
+        await asyncio.sleep(seconds)
+        return fail
+
+
+def _digest(data) -> str:
+    if isinstance(data, str):
+        data = data.encode()
+    return hashlib.sha1(data).hexdigest()
+
+
+# =====================================================
+# OPENCAGE
+# =====================================================
+class FakeOpenCageTransport(httpx.AsyncBaseTransport):
+    """
+    Answers OpenCage geocode requests with a synthetic result.
+    """
+
+    def __init__(self, latency: LatencyModel):
+        self.latency = latency
+        self.calls = 0
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        self.calls += 1
+        if await self.latency.await_():
+            return httpx.Response(503, json={"status": {"code": 503, "message": "fake outage"}})
+
+        query = request.url.params.get("q", "")
+        h = int(_digest(query)[:8], 16)
+        try:
+            lat, lng = (float(x) for x in query.split(","))
+        except ValueError:
+            # Forward lookup: a stable point near the centre of Mumbai
+            lat, lng = 19.0 + (h % 1000) / 5000, 72.8 + (h // 1000 % 1000) / 5000
+        if not (-90 <= lat <= 90 and -180 <= lng <= 180):
+            return httpx.Response(400, json={"status": {"code": 400, "message": "invalid coordinates"}})
+        city = _CITIES[h % len(_CITIES)]
+        result = {
+            "formatted": f"{h % 300 + 1} Fake Road, {city}, Maharashtra, India",
+            "components": {"city": city, "state": "Maharashtra", "country": "India", "postcode": "400001"},
+            "geometry": {"lat": lat, "lng": lng},
+        }
+        return httpx.Response(200, json={"results": [result], "status": {"code": 200}})
+
+
+# =====================================================
+# GROQ
+# =====================================================
+class FakeGroq:
+    """
+    client.chat.completions.create(...) returning a JSON answer picked
+    from the image URL, like the vision prompt asks for.
+    """
+
+    def __init__(self, latency: LatencyModel):
+        self.latency = latency
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self._create))
+
+    def _create(self, model: str, messages: list, timeout: Optional[float] = None, **kwargs):
+        if self.latency.wait(timeout):
+            raise RuntimeError("fake Groq: 503 Service Unavailable")
+        url = ""
+        for part in messages[-1].get("content", []):
+            if isinstance(part, dict) and part.get("type") == "image_url":
+                url = part["image_url"]["url"]
+        service = _VISION_SERVICES[int(_digest(url)[:8], 16) % len(_VISION_SERVICES)]
+        content = json.dumps({"service": service, "description": f"Looks like {service.lower()} work."})
+        message = SimpleNamespace(content=content)
+        return SimpleNamespace(choices=[SimpleNamespace(message=message)], model=model)
+
+
+# =====================================================
+# CLOUDINARY
+# =====================================================
+class FakeCloudinaryUploader:
+    """
+    uploader.upload(bytes, folder=...) -> {"secure_url": ...}; nothing is kept.
+    """
+
+    def __init__(self, latency: LatencyModel):
+        self.latency = latency
+
+    def upload(self, file, folder: str = "", timeout: Optional[float] = None, **options) -> dict:
+        if self.latency.wait(timeout):
+            raise RuntimeError("fake Cloudinary: 500 Internal Server Error")
+        public_id = f"{folder}/{_digest(file)[:20]}".strip("/")
+        return {
+            "public_id": public_id,
+            "bytes": len(file),
+            "secure_url": f"https://res.cloudinary.invalid/fake/image/upload/{public_id}.jpg",
+        }
+
+
+# =====================================================
+# SUPABASE
+# =====================================================
+class _FakeBucket:
+    def __init__(self, storage: "_FakeStorage", name: str):
+        self.storage = storage
+        self.name = name
+
+    def upload(self, path: str, file, file_options: Optional[dict] = None):
+        if self.storage.latency.wait():
+            raise RuntimeError("fake Supabase storage: 503 Service Unavailable")
+        with self.storage.lock:
+            self.storage.objects[(self.name, path)] = len(file)
+        return SimpleNamespace(path=path, full_path=f"{self.name}/{path}")
+
+    def get_public_url(self, path: str) -> str:
+        return f"https://storage.supabase.invalid/storage/v1/object/public/{self.name}/{path}"
+
+
+class _FakeStorage:
+    def __init__(self, latency: LatencyModel):
+        self.latency = latency
+        self.lock = threading.Lock()
+        # (bucket, path) -> size; contents are not kept
+        self.objects: Dict[Tuple[str, str], int] = {}
+
+    def from_(self, bucket: str) -> _FakeBucket:
+        return _FakeBucket(self, bucket)
+
+
+class FakeSupabase:
+    """
+    The storage part of the Supabase client.
+    """
+
+    def __init__(self, latency: LatencyModel):
+        self.storage = _FakeStorage(latency)
@@ -0,0 +1,165 @@
+# backend/services/geocode_cache.py
+"""
+Reverse-geocode cache keyed by quantized coordinates.
+
+Coordinates are rounded to GEOCODE_CACHE_PRECISION decimal places (4 is
+~11 m, i.e. "the same street"), so nearby lookups share one entry. An
+in-memory LRU sits in front of a local SQLite file that survives
+restarts and is shared by the workers on one host. Entries expire after
+GEOCODE_CACHE_TTL_SECONDS; lookups that found no address are cached for
+NEGATIVE_TTL_SECONDS so a bad spot doesn't hit OpenCage on every call.
+"""
+
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Optional, Tuple
+
+logger = logging.getLogger("quickserve.geocode_cache")
+
+CACHE_PATH = os.getenv("GEOCODE_CACHE_PATH", "geocode_cache.sqlite3")
+PRECISION = int(os.getenv("GEOCODE_CACHE_PRECISION", "4"))
+TTL_SECONDS = int(os.getenv("GEOCODE_CACHE_TTL_SECONDS", str(30 * 24 * 3600)))
+NEGATIVE_TTL_SECONDS = 3600
+MEMORY_ENTRIES = int(os.getenv("GEOCODE_CACHE_SIZE", "10000"))
+
+_MISSING = object()
+
+
+class GeocodeCache:
+    def __init__(
+        self,
+        path: str = CACHE_PATH,
+        precision: int = PRECISION,
+        ttl_seconds: int = TTL_SECONDS,
+        memory_entries: int = MEMORY_ENTRIES,
+    ):
+        self.path = path
+        self.precision = precision
+        self.ttl_seconds = ttl_seconds
+        self.memory_entries = memory_entries
+        self._lock = threading.Lock()
+        # key -> (expires_at, result)
+        self._lru: "OrderedDict[str, Tuple[float, Optional[dict]]]" = OrderedDict()
+        self._db: Optional[sqlite3.Connection] = None
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.expired = 0
+        self.evictions = 0
+
+    def key(self, lat: float, lng: float) -> str:
+        return f"{lat:.{self.precision}f},{lng:.{self.precision}f}"
+
+    # -------------------------------------------------
+    # Persistent store
+    # -------------------------------------------------
+    def _conn(self) -> sqlite3.Connection:
+        if self._db is None:
+            db = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute("PRAGMA synchronous=NORMAL")
+            db.execute(
+                "CREATE TABLE IF NOT EXISTS reverse_geocode ("
+                "key TEXT PRIMARY KEY, payload TEXT, expires_at REAL NOT NULL)"
+            )
+            self._db = db
+        return self._db
+
+    def _remember(self, key: str, expires_at: float, result: Optional[dict]):
+        self._lru[key] = (expires_at, result)
+        self._lru.move_to_end(key)
+        while len(self._lru) > self.memory_entries:
+            self._lru.popitem(last=False)
+            self.evictions += 1
+
+    # -------------------------------------------------
+    # Lookups
+    # -------------------------------------------------
+    def get(self, lat: float, lng: float):
+        """
+        Cached result (a dict, or None for "no address"), or _MISSING.
+        """
+        key = self.key(lat, lng)
+        now = time.time()
+        with self._lock:
+            entry = self._lru.get(key)
+            if entry is not None:
+                if entry[0] > now:
+                    self._lru.move_to_end(key)
+                    self.memory_hits += 1
+                    return entry[1]
+                del self._lru[key]
+                self.expired += 1
+
+            try:
+                row = self._conn().execute(
+                    "SELECT payload, expires_at FROM reverse_geocode WHERE key = ?", (key,)
+                ).fetchone()
+            except sqlite3.Error:
+                logger.exception("Geocode cache read failed")
+                row = None
+
+            if row is not None and row[1] > now:
+                result = json.loads(row[0])
+                self._remember(key, row[1], result)
+                self.disk_hits += 1
+                return result
+            if row is not None:
+                self.expired += 1
+
+            self.misses += 1
+            return _MISSING
+
+    def put(self, lat: float, lng: float, result: Optional[dict]):
+        key = self.key(lat, lng)
+        ttl = self.ttl_seconds if result else NEGATIVE_TTL_SECONDS
+        expires_at = time.time() + ttl
+        with self._lock:
+            self._remember(key, expires_at, result)
+            try:
+                self._conn().execute(
+                    "INSERT OR REPLACE INTO reverse_geocode (key, payload, expires_at) "
+                    "VALUES (?, ?, ?)",
+                    (key, json.dumps(result), expires_at),
+                )
+            except sqlite3.Error:
+                logger.exception("Geocode cache write failed")
+
+    def get_or_fetch(
+        self, lat: float, lng: float, fetch: Callable[[float, float], Optional[dict]]
+    ) -> Optional[dict]:
+        cached = self.get(lat, lng)
+        if cached is not _MISSING:
+            return cached
+        result = fetch(lat, lng)
+        self.put(lat, lng, result)
+        return result
+
+    def purge_expired(self) -> int:
+        with self._lock:
+            cur = self._conn().execute(
+                "DELETE FROM reverse_geocode WHERE expires_at <= ?", (time.time(),)
+            )
+            return cur.rowcount
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.memory_hits + self.disk_hits + self.misses
+            return {
+                "precision": self.precision,
+                "memory_entries": len(self._lru),
+                "memory_hits": self.memory_hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "expired": self.expired,
+                "evictions": self.evictions,
+                "hit_ratio": round((lookups - self.misses) / lookups, 3) if lookups else None,
+            }
+
+
+geocode_cache = GeocodeCache()
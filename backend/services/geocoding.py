@@ -0,0 +1,300 @@
+# backend/services/geocoding.py
+"""
+OpenCage geocoding over one pooled async HTTP client.
+
+All lookups share a single httpx.AsyncClient that lives on a dedicated
+event loop thread, so keep-alive connections are reused by async routes,
+threadpool routes and background threads alike:
+
+- at most GEOCODE_CONCURRENCY requests are in flight (and as many
+  connections are kept open), whoever is calling;
+- connection errors, timeouts, 429 and 5xx are retried up to
+  GEOCODE_RETRIES times with exponential backoff and full jitter;
+- other 4xx (bad key, quota exhausted) fail straight away.
+
+Reverse lookups go through the quantized geocode cache. Failures raise
+GeocodingError; the batch helpers return it in place of the failed item.
+Its `permanent` flag marks a query OpenCage rejected (400, e.g.
+coordinates out of range), which no retry will fix.
+With FAKE_SERVICES including "opencage" the client talks to an
+in-process fake (services.fakes) instead of the network.
+"""
+
+import asyncio
+import logging
+import os
+import random
+import threading
+from concurrent.futures import Future
+from typing import Iterable, List, Optional, Sequence, Tuple, Union
+
+import httpx
+
+from services import fakes
+from services.geocode_cache import _MISSING, geocode_cache
+
+logger = logging.getLogger("quickserve.geocoding")
+
+BASE_URL = os.getenv("OPENCAGE_URL", "https://api.opencagedata.com/geocode/v1/json")
+# httpcore scans every pooled connection per request, so keep this modest
+CONCURRENCY = int(os.getenv("GEOCODE_CONCURRENCY", "10"))
+RETRIES = int(os.getenv("GEOCODE_RETRIES", "3"))
+TIMEOUT_SECONDS = float(os.getenv("GEOCODE_TIMEOUT_SECONDS", "10"))
+BACKOFF_BASE_SECONDS = 0.2
+BACKOFF_CAP_SECONDS = 5.0
+KEEPALIVE_SECONDS = 30.0
+
+
+class GeocodingError(Exception):
+    def __init__(self, message: str, permanent: bool = False):
+        super().__init__(message)
+        self.permanent = permanent
+
+
+def _parse_reverse(data: dict) -> Optional[dict]:
+    if not data.get("results"):
+        return None
+    r = data["results"][0]
+    c = r.get("components", {})
+    return {
+        "formatted": r.get("formatted"),
+        "city": c.get("city") or c.get("town") or c.get("village"),
+        "state": c.get("state"),
+        "country": c.get("country"),
+        "postcode": c.get("postcode"),
+    }
+
+
+def _parse_forward(data: dict) -> Optional[dict]:
+    if not data.get("results"):
+        return None
+    geo = data["results"][0]["geometry"]
+    return {"latitude": geo["lat"], "longitude": geo["lng"]}
+
+
+class GeocodingClient:
+    def __init__(
+        self,
+        base_url: str = BASE_URL,
+        api_key: Optional[str] = None,
+        concurrency: int = CONCURRENCY,
+        retries: int = RETRIES,
+        timeout: float = TIMEOUT_SECONDS,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+    ):
+        self.base_url = base_url
+        self.api_key = api_key if api_key is not None else os.getenv("OPENCAGE_API_KEY")
+        self.concurrency = concurrency
+        self.retries = retries
+        self.timeout = timeout
+        self.transport = transport
+        self._lock = threading.Lock()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        # Created on the client's own loop by the first request
+        self._client: Optional[httpx.AsyncClient] = None
+        self._slots: Optional[asyncio.Semaphore] = None
+        self.requests = 0
+        self.retried = 0
+        self.failures = 0
+        self.in_flight = 0
+
+    # -------------------------------------------------
+    # Event loop thread
+    # -------------------------------------------------
+    def _submit(self, coro) -> Future:
+        with self._lock:
+            if self._loop is None:
+                loop = asyncio.new_event_loop()
+                thread = threading.Thread(target=loop.run_forever, name="geocoding", daemon=True)
+                thread.start()
+                self._loop, self._thread = loop, thread
+            loop = self._loop
+        return asyncio.run_coroutine_threadsafe(coro, loop)
+
+    async def _run(self, coro):
+        # Await work on the client's loop from any other event loop
+        return await asyncio.wrap_future(self._submit(coro))
+
+    def close(self):
+        with self._lock:
+            loop, thread = self._loop, self._thread
+            self._loop = self._thread = None
+        if loop is None:
+            return
+
+        async def _shutdown():
+            if self._client is not None:
+                await self._client.aclose()
+                self._client = None
+
+        try:
+            asyncio.run_coroutine_threadsafe(_shutdown(), loop).result(timeout=5)
+        except Exception:
+            logger.warning("Geocoding client did not close cleanly", exc_info=True)
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join(timeout=5)
+        loop.close()
+
+    # -------------------------------------------------
+    # HTTP (runs on the client's loop)
+    # -------------------------------------------------
+    def _backoff(self, attempt: int) -> float:
+        return random.uniform(0, min(BACKOFF_CAP_SECONDS, BACKOFF_BASE_SECONDS * 2 ** attempt))
+
+    async def _get(self, query: str) -> dict:
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                timeout=self.timeout,
+                limits=httpx.Limits(
+                    max_connections=self.concurrency,
+                    max_keepalive_connections=self.concurrency,
+                    keepalive_expiry=KEEPALIVE_SECONDS,
+                ),
+                transport=self.transport,
+            )
+            self._slots = asyncio.Semaphore(self.concurrency)
+
+        params = {"q": query, "key": self.api_key, "limit": 1, "no_annotations": 1}
+        for attempt in range(self.retries + 1):
+            # Hold a slot only for the request itself, not the backoff
+            async with self._slots:
+                self.requests += 1
+                self.in_flight += 1
+                try:
+                    res = await self._client.get(self.base_url, params=params)
+                except httpx.TransportError as exc:
+                    error = GeocodingError(f"OpenCage request failed: {exc!r}")
+                else:
+                    if res.status_code < 400:
+                        return res.json()
+                    error = GeocodingError(
+                        f"OpenCage returned {res.status_code}", permanent=res.status_code == 400
+                    )
+                    if res.status_code != 429 and res.status_code < 500:
+                        self.failures += 1
+                        raise error
+                finally:
+                    self.in_flight -= 1
+
+            if attempt < self.retries:
+                self.retried += 1
+                await asyncio.sleep(self._backoff(attempt))
+
+        self.failures += 1
+        raise error
+
+    async def _reverse(self, lat: float, lng: float) -> Optional[dict]:
+        return _parse_reverse(await self._get(f"{lat},{lng}"))
+
+    async def _forward(self, address: str) -> Optional[dict]:
+        return _parse_forward(await self._get(address))
+
+    async def _gather(self, coros):
+        return await asyncio.gather(*coros, return_exceptions=True)
+
+    # -------------------------------------------------
+    # Public API
+    # -------------------------------------------------
+    async def reverse(self, lat: float, lng: float) -> Optional[dict]:
+        return await self._run(self._reverse(lat, lng))
+
+    async def forward(self, address: str) -> Optional[dict]:
+        return await self._run(self._forward(address))
+
+    async def reverse_many(
+        self, points: Iterable[Tuple[float, float]]
+    ) -> List[Union[Optional[dict], GeocodingError]]:
+        coros = [self._reverse(lat, lng) for lat, lng in points]
+        return await self._run(self._gather(coros))
+
+    async def forward_many(
+        self, addresses: Iterable[str]
+    ) -> List[Union[Optional[dict], GeocodingError]]:
+        coros = [self._forward(a) for a in addresses]
+        return await self._run(self._gather(coros))
+
+    def reverse_blocking(self, lat: float, lng: float) -> Optional[dict]:
+        """
+        For threads with no event loop (threadpool routes, background
+        workers). Never call it from an async route.
+        """
+        return self._submit(self._reverse(lat, lng)).result()
+
+    def stats(self) -> dict:
+        return {
+            "concurrency": self.concurrency,
+            "requests": self.requests,
+            "retried": self.retried,
+            "failures": self.failures,
+            "in_flight": self.in_flight,
+        }
+
+
+geocoder = GeocodingClient(
+    transport=fakes.FakeOpenCageTransport(fakes.LatencyModel.from_env("opencage"))
+    if fakes.use_fake("opencage") else None
+)
+
+
+# =========================
+# Cached lookups
+# =========================
+async def reverse_geocode(lat: float, lng: float) -> Optional[dict]:
+    """
+    Latitude/longitude -> address & city, through the geocode cache.
+    """
+    if lat is None or lng is None:
+        return None
+    cached = geocode_cache.get(lat, lng)
+    if cached is not _MISSING:
+        return cached
+    result = await geocoder.reverse(lat, lng)
+    geocode_cache.put(lat, lng, result)
+    return result
+
+
+async def reverse_geocode_many(
+    points: Sequence[Tuple[float, float]]
+) -> List[Union[Optional[dict], GeocodingError]]:
+    """
+    Batch reverse_geocode: cache hits are answered locally and the misses
+    go out concurrently. Results are in input order.
+    """
+    results: list = [None] * len(points)
+    missing = []
+    for i, (lat, lng) in enumerate(points):
+        cached = geocode_cache.get(lat, lng)
+        if cached is _MISSING:
+            missing.append(i)
+        else:
+            results[i] = cached
+
+    fetched = await geocoder.reverse_many(points[i] for i in missing)
+    for i, result in zip(missing, fetched):
+        results[i] = result
+        if not isinstance(result, BaseException):
+            geocode_cache.put(*points[i], result)
+    return results
+
+
+async def forward_geocode(address: str) -> Optional[dict]:
+    """
+    Address -> latitude/longitude.
+    """
+    return await geocoder.forward(address)
+
+
+async def forward_geocode_many(
+    addresses: Sequence[str],
+) -> List[Union[Optional[dict], GeocodingError]]:
+    return await geocoder.forward_many(addresses)
+
+
+def reverse_geocode_sync(lat: float, lng: float) -> Optional[dict]:
+    """
+    reverse_geocode for code running outside an event loop.
+    """
+    if lat is None or lng is None:
+        return None
+    return geocode_cache.get_or_fetch(lat, lng, geocoder.reverse_blocking)
@@ -1,25 +1,45 @@
 import json
 import os
 import logging
-from typing import Dict, Any
-from groq import Groq
+import threading
+from typing import Dict, Any, Optional
 
-logger = logging.getLogger("quickserve.groq")
+from services import fakes
 
-GROQ_API_KEY = os.getenv("GROQ_API_KEY")
-if not GROQ_API_KEY:
-    raise RuntimeError("Missing GROQ_API_KEY environment variable")
+logger = logging.getLogger("quickserve.groq")
 
-client = Groq(api_key=GROQ_API_KEY)
 VISION_MODEL = "meta-llama/llama-4-scout-17b-16e-instruct"
 
-def analyze_service_image(image_url: str) -> Dict[str, Any]:
+_lock = threading.Lock()
+_client = None
+
+
+def get_client():
+    """
+    The Groq client, created on first use (or the fake).
+    """
+    global _client
+    with _lock:
+        if _client is None:
+            if fakes.use_fake("groq"):
+                _client = fakes.FakeGroq(fakes.LatencyModel.from_env("groq"))
+            else:
+                from groq import Groq
+
+                GROQ_API_KEY = os.getenv("GROQ_API_KEY")
+                if not GROQ_API_KEY:
+                    raise RuntimeError("Missing GROQ_API_KEY environment variable")
+                _client = Groq(api_key=GROQ_API_KEY)
+        return _client
+
+
+def analyze_service_image(image_url: str, timeout: Optional[float] = None) -> Dict[str, Any]:
     if not image_url.startswith("https://"):
         raise ValueError("Groq vision requires an HTTPS image URL")
 
     logger.info("Calling Groq vision with URL: %s", image_url)
     try:
-        completion = client.chat.completions.create(
+        completion = get_client().chat.completions.create(
             model=VISION_MODEL,
             messages=[
                 {
@@ -46,6 +66,7 @@ def analyze_service_image(image_url: str) -> Dict[str, Any]:
             response_format={"type": "json_object"},
             temperature=0.2,
             max_completion_tokens=300,
+            timeout=timeout,
         )
     except Exception as exc:
         logger.exception("Groq API call failed")
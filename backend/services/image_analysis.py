@@ -0,0 +1,207 @@
+# backend/services/image_analysis.py
+"""
+Photo -> suggested service (Cloudinary upload, then Groq vision) without
+blocking the event loop.
+
+Both SDKs are blocking, so each stage runs on a small dedicated thread
+pool (AI_IMAGE_WORKERS threads) and the route only awaits it:
+
+- at most AI_IMAGE_QUEUE analyses are admitted per worker process; more
+  get 503 straight away instead of queueing behind slow uploads;
+- each stage has its own deadline (AI_UPLOAD_TIMEOUT_S,
+  AI_VISION_TIMEOUT_S). It is passed to the SDK as its request timeout,
+  so the thread is freed too, and enforced around the await; an overrun
+  fails the analysis with 504.
+
+Job mode: `submit` starts an analysis in the background and returns its
+id at once. The outcome can be fetched with `get` for AI_JOB_TTL_S, or
+pushed as an "ai.result" event on ai_job_channel(job_id). Like the
+realtime hub, jobs live in the worker that accepted them.
+"""
+
+import asyncio
+import logging
+import os
+import secrets
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Optional, Set
+
+from fastapi import HTTPException
+
+from services.cloudinary_service import upload_temp_image
+from services.groq_vision import analyze_service_image
+from services.realtime import hub
+
+logger = logging.getLogger("quickserve.ai")
+
+WORKERS = int(os.getenv("AI_IMAGE_WORKERS", "8"))
+QUEUE = int(os.getenv("AI_IMAGE_QUEUE", "64"))
+UPLOAD_TIMEOUT_S = float(os.getenv("AI_UPLOAD_TIMEOUT_S", "15"))
+VISION_TIMEOUT_S = float(os.getenv("AI_VISION_TIMEOUT_S", "30"))
+JOB_TTL_S = float(os.getenv("AI_JOB_TTL_S", "600"))
+
+PENDING = "pending"
+DONE = "done"
+FAILED = "failed"
+
+
+def ai_job_channel(job_id: str) -> str:
+    return f"ai_job:{job_id}"
+
+
+def _suggestion(result: dict) -> dict:
+    return {
+        "suggested_service": result.get("service", "Appliance repair"),
+        "suggested_title": "Service request",
+        "suggested_description": result.get("description", ""),
+        "ai_provider": "groq",
+    }
+
+
+class ImageAnalyzer:
+    def __init__(
+        self,
+        workers: int = WORKERS,
+        queue: int = QUEUE,
+        upload_timeout: float = UPLOAD_TIMEOUT_S,
+        vision_timeout: float = VISION_TIMEOUT_S,
+        job_ttl: float = JOB_TTL_S,
+    ):
+        self.workers = workers
+        self.queue = queue
+        self.upload_timeout = upload_timeout
+        self.vision_timeout = vision_timeout
+        self.job_ttl = job_ttl
+        # Created on first use
+        self._executor: Optional[ThreadPoolExecutor] = None
+        # job_id -> job, oldest first; only touched on the event loop
+        self._jobs: "OrderedDict[str, dict]" = OrderedDict()
+        self._tasks: Set[asyncio.Task] = set()
+        self.active = 0
+        self.completed = 0
+        self.failed = 0
+        self.timed_out = 0
+        self.rejected = 0
+
+    # -------------------------------------------------
+    # Pipeline
+    # -------------------------------------------------
+    async def _stage(self, name: str, fn: Callable, arg, timeout: float):
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="ai-image")
+        loop = asyncio.get_running_loop()
+        started = time.perf_counter()
+        try:
+            result = await asyncio.wait_for(
+                loop.run_in_executor(self._executor, fn, arg, timeout), timeout
+            )
+        except Exception as exc:
+            # The SDK's own timeout error fires at the same deadline
+            if isinstance(exc, asyncio.TimeoutError) or time.perf_counter() - started >= timeout:
+                self.timed_out += 1
+                logger.warning("AI image %s timed out after %.1f s", name, timeout)
+                raise HTTPException(status_code=504, detail=f"AI image {name} timed out")
+            logger.exception("AI image %s failed", name)
+            raise HTTPException(status_code=500, detail=f"AI image analysis failed: {exc}")
+        logger.info("AI image %s took %.0f ms", name, (time.perf_counter() - started) * 1000)
+        return result
+
+    def _admit(self):
+        if self.active >= self.queue:
+            self.rejected += 1
+            raise HTTPException(status_code=503, detail="Image analysis is busy, try again shortly")
+        self.active += 1
+
+    async def _run(self, image_bytes: bytes) -> dict:
+        try:
+            image_url = await self._stage("upload", upload_temp_image, image_bytes, self.upload_timeout)
+            result = await self._stage("analysis", analyze_service_image, image_url, self.vision_timeout)
+        except HTTPException:
+            self.failed += 1
+            raise
+        finally:
+            self.active -= 1
+        self.completed += 1
+        return _suggestion(result)
+
+    async def analyze(self, image_bytes: bytes) -> dict:
+        """
+        Run the pipeline and return the suggestion; raises HTTPException
+        (503 busy, 504 stage timeout, 500 upstream failure).
+        """
+        self._admit()
+        return await self._run(image_bytes)
+
+    # -------------------------------------------------
+    # Jobs
+    # -------------------------------------------------
+    def _prune(self):
+        cutoff = time.time() - self.job_ttl
+        while self._jobs:
+            job = next(iter(self._jobs.values()))
+            if job["created_at"] > cutoff:
+                break
+            self._jobs.popitem(last=False)
+
+    def submit(self, image_bytes: bytes) -> dict:
+        """
+        Start an analysis in the background; returns the pending job.
+        Must be called on the event loop.
+        """
+        self._prune()
+        self._admit()
+        job = {"id": secrets.token_urlsafe(16), "status": PENDING, "created_at": time.time()}
+        self._jobs[job["id"]] = job
+        task = asyncio.get_running_loop().create_task(self._finish(job, image_bytes))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return self.view(job)
+
+    async def _finish(self, job: dict, image_bytes: bytes):
+        try:
+            job["result"] = await self._run(image_bytes)
+            job["status"] = DONE
+        except HTTPException as exc:
+            job["status"] = FAILED
+            job["error"] = {"status_code": exc.status_code, "detail": exc.detail}
+        hub.publish(ai_job_channel(job["id"]), "ai.result", self.view(job))
+
+    def get(self, job_id: str) -> Optional[dict]:
+        self._prune()
+        job = self._jobs.get(job_id)
+        return self.view(job) if job else None
+
+    def result_event(self, job_id: str) -> Optional[dict]:
+        """
+        The "ai.result" event of a finished job, for late subscribers.
+        """
+        job = self._jobs.get(job_id)
+        if job is None or job["status"] == PENDING:
+            return None
+        return {"type": "ai.result", "data": self.view(job)}
+
+    @staticmethod
+    def view(job: dict) -> dict:
+        return {k: job[k] for k in ("id", "status", "result", "error") if k in job}
+
+    def close(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "workers": self.workers,
+            "queue": self.queue,
+            "active": self.active,
+            "completed": self.completed,
+            "failed": self.failed,
+            "timed_out": self.timed_out,
+            "rejected": self.rejected,
+            "jobs": len(self._jobs),
+        }
+
+
+image_analyzer = ImageAnalyzer()
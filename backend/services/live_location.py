@@ -0,0 +1,143 @@
+# backend/services/live_location.py
+"""
+Fan-out of provider GPS pings to the customer of their active job.
+
+The provider -> active request map lives in memory. It is loaded once
+from the database and then kept current by request_state transitions, so a
+location ping never reads the database to find its audience.
+
+Pushes on the request channel ("request:{id}") are throttled per
+provider and delta-encoded:
+  - "location"       {"seq", "lat", "lng"}    keyframe, every KEYFRAME_EVERY pushes
+  - "location.delta" {"seq", "dlat", "dlng"}  offsets in microdegrees
+A client that sees a gap in `seq` ignores deltas until the next
+keyframe, or reads the latest point from GET /requests/{id}/provider-location.
+"""
+
+import threading
+import time
+from typing import Dict, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+import models
+from services.realtime import hub, request_channel
+from services.request_state import ACTIVE_STATUSES, on_transition
+from utils.location import haversine_km
+
+MIN_INTERVAL_SECONDS = 2.0
+MIN_MOVE_KM = 0.005
+KEYFRAME_EVERY = 10
+MICRODEG = 1_000_000
+
+
+class _Track:
+    __slots__ = ("request_id", "seq", "sent_at", "lat_u", "lng_u", "lat", "lng")
+
+    def __init__(self, request_id: int):
+        self.request_id = request_id
+        self.seq = 0
+        self.sent_at = 0.0
+        self.lat_u: Optional[int] = None  # last pushed position, microdegrees
+        self.lng_u: Optional[int] = None
+        self.lat: Optional[float] = None  # latest known position
+        self.lng: Optional[float] = None
+
+
+class LiveLocationFanout:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._tracks: Dict[int, _Track] = {}
+        self._provider_for_request: Dict[int, int] = {}
+        self._loaded = False
+
+    def load(self, db: Session):
+        rows = (
+            db.query(models.Request.provider_id, models.Request.id)
+            .filter(
+                models.Request.provider_id.isnot(None),
+                models.Request.status.in_(ACTIVE_STATUSES),
+            )
+            .order_by(models.Request.id)
+            .all()
+        )
+        with self._lock:
+            self._tracks = {pid: _Track(rid) for pid, rid in rows}
+            self._provider_for_request = {rid: pid for pid, rid in rows}
+            self._loaded = True
+
+    def ensure_loaded(self, db: Session):
+        if not self._loaded:
+            self.load(db)
+
+    # -------------------------------------------------
+    # Job lifecycle (called by the status endpoints)
+    # -------------------------------------------------
+    def job_status_changed(self, provider_id: Optional[int], request_id: int, status: str):
+        if provider_id is None:
+            return
+        with self._lock:
+            track = self._tracks.get(provider_id)
+            if status in ACTIVE_STATUSES:
+                if track is None or track.request_id != request_id:
+                    if track is not None:
+                        self._provider_for_request.pop(track.request_id, None)
+                    self._tracks[provider_id] = _Track(request_id)
+                    self._provider_for_request[request_id] = provider_id
+            elif track is not None and track.request_id == request_id:
+                del self._tracks[provider_id]
+                self._provider_for_request.pop(request_id, None)
+
+    # -------------------------------------------------
+    # Pings
+    # -------------------------------------------------
+    def update(self, provider_id: int, lat: Optional[float], lng: Optional[float]):
+        if lat is None or lng is None:
+            return
+
+        now = time.monotonic()
+        with self._lock:
+            track = self._tracks.get(provider_id)
+            if track is None:
+                return
+            track.lat, track.lng = lat, lng
+
+            if now - track.sent_at < MIN_INTERVAL_SECONDS:
+                return
+            if track.lat_u is not None:
+                moved = haversine_km(
+                    track.lat_u / MICRODEG, track.lng_u / MICRODEG, lat, lng
+                )
+                if moved < MIN_MOVE_KM:
+                    return
+
+            lat_u, lng_u = round(lat * MICRODEG), round(lng * MICRODEG)
+            track.seq += 1
+            if track.lat_u is None or track.seq % KEYFRAME_EVERY == 1:
+                event_type = "location"
+                data = {"seq": track.seq, "lat": lat_u / MICRODEG, "lng": lng_u / MICRODEG}
+            else:
+                event_type = "location.delta"
+                data = {"seq": track.seq, "dlat": lat_u - track.lat_u, "dlng": lng_u - track.lng_u}
+
+            track.lat_u, track.lng_u = lat_u, lng_u
+            track.sent_at = now
+            request_id = track.request_id
+
+        hub.publish(request_channel(request_id), event_type, data)
+
+    def active_request(self, provider_id: int) -> Optional[int]:
+        with self._lock:
+            track = self._tracks.get(provider_id)
+            return track.request_id if track is not None else None
+
+    def latest(self, request_id: int) -> Optional[Tuple[float, float]]:
+        with self._lock:
+            track = self._tracks.get(self._provider_for_request.get(request_id))
+            if track is None or track.lat is None:
+                return None
+            return track.lat, track.lng
+
+
+live_locations = LiveLocationFanout()
+on_transition(live_locations.job_status_changed)
@@ -0,0 +1,123 @@
+# backend/services/location_trail.py
+"""
+Provider location trail: append-only history of stored positions.
+
+Points are inserted in batches by the presence flush (`append_points`)
+and tagged with the provider's active request, so one job's route is a
+single index range scan (`route`). Points older than SIMPLIFY_AFTER
+are thinned by `simplify_trail`: each (provider, request) track is run
+through Ramer-Douglas-Peucker and the dropped points are deleted. Only
+the recent, unsimplified tail is covered by the partial index the pass
+reads from.
+"""
+
+import logging
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.orm import Session
+
+import models
+from utils.simplify import simplify_path
+
+logger = logging.getLogger("quickserve.location_trail")
+
+SIMPLIFY_AFTER = timedelta(hours=6)
+SIMPLIFY_EPSILON_M = 15.0
+SIMPLIFY_BATCH = 20000
+# ids per DELETE/UPDATE statement
+ID_CHUNK = 1000
+
+trail = models.ProviderLocationPoint.__table__
+
+# (provider_id, request_id, latitude, longitude, recorded_at)
+TrailPoint = Tuple[int, Optional[int], float, float, datetime]
+
+
+def append_points(conn: Connection, points: List[TrailPoint]):
+    if not points:
+        return
+    conn.execute(
+        trail.insert(),
+        [
+            {
+                "provider_id": pid,
+                "request_id": rid,
+                "latitude": lat,
+                "longitude": lng,
+                "recorded_at": at,
+                "simplified": False,
+            }
+            for pid, rid, lat, lng, at in points
+        ],
+    )
+
+
+def route(db: Session, request_id: int) -> List[Tuple[float, float, datetime]]:
+    return (
+        db.query(
+            models.ProviderLocationPoint.latitude,
+            models.ProviderLocationPoint.longitude,
+            models.ProviderLocationPoint.recorded_at,
+        )
+        .filter(models.ProviderLocationPoint.request_id == request_id)
+        .order_by(models.ProviderLocationPoint.recorded_at)
+        .all()
+    )
+
+
+def simplify_trail(
+    engine: Engine,
+    now: Optional[datetime] = None,
+    epsilon_m: float = SIMPLIFY_EPSILON_M,
+    batch: int = SIMPLIFY_BATCH,
+) -> Tuple[int, int]:
+    """
+    Simplify up to `batch` of the oldest unsimplified points. Returns
+    (points examined, points deleted).
+    """
+    cutoff = (now or datetime.utcnow()) - SIMPLIFY_AFTER
+
+    with engine.begin() as conn:
+        rows = conn.execute(
+            select(
+                trail.c.id,
+                trail.c.provider_id,
+                trail.c.request_id,
+                trail.c.latitude,
+                trail.c.longitude,
+            )
+            .where(trail.c.simplified == False, trail.c.recorded_at < cutoff)
+            .order_by(trail.c.recorded_at, trail.c.id)
+            .limit(batch)
+        ).all()
+        if not rows:
+            return 0, 0
+
+        tracks: Dict[Tuple[int, Optional[int]], list] = {}
+        for row in rows:
+            tracks.setdefault((row.provider_id, row.request_id), []).append(row)
+
+        kept, dropped = [], []
+        for points in tracks.values():
+            keep = set(
+                simplify_path(
+                    [p.latitude for p in points], [p.longitude for p in points], epsilon_m
+                )
+            )
+            for i, p in enumerate(points):
+                (kept if i in keep else dropped).append(p.id)
+
+        for start in range(0, len(dropped), ID_CHUNK):
+            conn.execute(trail.delete().where(trail.c.id.in_(dropped[start:start + ID_CHUNK])))
+        for start in range(0, len(kept), ID_CHUNK):
+            conn.execute(
+                trail.update()
+                .where(trail.c.id.in_(kept[start:start + ID_CHUNK]))
+                .values(simplified=True)
+            )
+
+    logger.info("Simplified %d trail points, deleted %d", len(rows), len(dropped))
+    return len(rows), len(dropped)
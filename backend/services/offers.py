@@ -0,0 +1,181 @@
+# backend/services/offers.py
+"""
+Request offers: one pending request broadcast to several providers.
+
+The dispatcher offers each open request to its best providers
+(`dispatch_offer_count` admin setting) for `dispatch_offer_timeout_s`
+seconds. Acceptance is one request_state transition to 'assigned': a
+single guarded UPDATE ... RETURNING on the request row. It only matches
+while the request is still pending and the provider holds a live offer
+(or is the provider the customer picked), so of several simultaneous
+accepts exactly one gets a row back. In the same transaction the
+winner's offer becomes 'accepted' and the others 'withdrawn', and the
+losers are told right away.
+
+Offers that time out are marked 'expired' by the dispatcher, which then
+treats the request as open again, skipping providers it already offered
+it to.
+"""
+
+from datetime import datetime, timedelta
+from typing import Iterable, List, Optional, Set, Tuple
+
+from sqlalchemy import DateTime, bindparam, text
+from sqlalchemy.engine import Connection, Row
+
+from services import request_state
+from services.realtime import hub, provider_channel
+
+OFFERED = "offered"
+ACCEPTED = "accepted"
+WITHDRAWN = "withdrawn"
+DECLINED = "declined"
+EXPIRED = "expired"
+
+ID_CHUNK = 1000
+
+# The provider the customer picked, or one holding a live offer
+ACCEPT_GUARD = (
+    "provider_id = :pid OR (provider_id IS NULL AND EXISTS ("
+    "SELECT 1 FROM request_offers o WHERE o.request_id = requests.id "
+    "AND o.provider_id = :pid AND o.status = 'offered' AND o.expires_at > :now))"
+)
+# Any offer, live or not: tells "not yours" (404) from "too late" (409)
+OFFERED_GUARD = (
+    "provider_id = :pid OR EXISTS (SELECT 1 FROM request_offers o "
+    "WHERE o.request_id = requests.id AND o.provider_id = :pid)"
+)
+
+
+def create(
+    conn: Connection,
+    offers: Iterable[Tuple[int, int, int]],
+    timeout_s: float,
+    now: Optional[datetime] = None,
+) -> Tuple[datetime, Set[int]]:
+    """
+    Insert (request_id, provider_id, rank) offers; pairs that were
+    already offered are skipped, and so are requests that are no longer
+    open (assigned or cancelled since the dispatcher read them). Returns
+    the expiry time and the ids of the requests that got offers.
+    """
+    now = now or datetime.utcnow()
+    expires_at = now + timedelta(seconds=timeout_s)
+    rows = [
+        {"rid": rid, "pid": pid, "rank": rank, "now": now, "expires": expires_at}
+        for rid, pid, rank in offers
+    ]
+    if not rows:
+        return expires_at, set()
+
+    conn.execute(
+        text(
+            "INSERT INTO request_offers "
+            "(request_id, provider_id, rank, status, created_at, expires_at) "
+            "SELECT :rid, :pid, :rank, 'offered', :now, :expires "
+            "WHERE EXISTS (SELECT 1 FROM requests WHERE id = :rid "
+            "AND status = 'pending' AND provider_id IS NULL) "
+            "ON CONFLICT (request_id, provider_id) DO NOTHING"
+        ).bindparams(
+            bindparam("now", type_=DateTime), bindparam("expires", type_=DateTime)
+        ),
+        rows,
+    )
+    ids = sorted({row["rid"] for row in rows})
+    query = text(
+        "SELECT DISTINCT request_id FROM request_offers "
+        "WHERE created_at = :now AND request_id IN :ids"
+    ).bindparams(bindparam("now", type_=DateTime), bindparam("ids", expanding=True))
+    created = set()
+    for start in range(0, len(ids), ID_CHUNK):
+        created.update(
+            rid for (rid,) in conn.execute(query, {"now": now, "ids": ids[start:start + ID_CHUNK]})
+        )
+    return expires_at, created
+
+
+def accept(
+    conn: Connection, request_id: int, provider_id: int, now: Optional[datetime] = None
+) -> Tuple[Optional[Row], List[int]]:
+    """
+    Try to win the request for `provider_id`. Returns the updated
+    request row (request_state.RETURNING) and the providers whose offers
+    were withdrawn, or (None, []) if someone else won, the offer expired
+    or the request is no longer pending.
+    """
+    row = request_state.transition(
+        conn,
+        request_id,
+        "assigned",
+        where=ACCEPT_GUARD,
+        values="provider_id = :pid, "
+        "budget = COALESCE((SELECT base_price FROM providers WHERE id = :pid), budget)",
+        params={"pid": provider_id, "now": now or datetime.utcnow()},
+    )
+    if row is None:
+        return None, []
+    return row, close(conn, request_id, winner=provider_id)
+
+
+def close(
+    conn: Connection, request_id: int, winner: Optional[int] = None
+) -> List[int]:
+    """
+    Settle the live offers of a request: the winner's (if any) becomes
+    accepted, the rest are withdrawn. Returns the withdrawn providers.
+    """
+    rows = conn.execute(
+        text(
+            "UPDATE request_offers SET status = CASE WHEN provider_id = :winner "
+            "THEN 'accepted' ELSE 'withdrawn' END "
+            "WHERE request_id = :rid AND status = 'offered' "
+            "RETURNING provider_id, status"
+        ),
+        {"rid": request_id, "winner": winner},
+    ).all()
+    return [pid for pid, status in rows if status == WITHDRAWN]
+
+
+def decline(conn: Connection, request_id: int, provider_id: int) -> bool:
+    res = conn.execute(
+        text(
+            "UPDATE request_offers SET status = 'declined' "
+            "WHERE request_id = :rid AND provider_id = :pid AND status = 'offered'"
+        ),
+        {"rid": request_id, "pid": provider_id},
+    )
+    return bool(res.rowcount)
+
+
+def expire(conn: Connection, now: Optional[datetime] = None) -> List[Tuple[int, int]]:
+    """
+    Mark timed-out offers expired; returns their (request_id, provider_id).
+    """
+    rows = conn.execute(
+        text(
+            "UPDATE request_offers SET status = 'expired' "
+            "WHERE status = 'offered' AND expires_at <= :now "
+            "RETURNING request_id, provider_id"
+        ).bindparams(bindparam("now", type_=DateTime)),
+        {"now": now or datetime.utcnow()},
+    ).all()
+    return [(rid, pid) for rid, pid in rows]
+
+
+def offered_before(conn: Connection, request_ids: Iterable[int]) -> Set[Tuple[int, int]]:
+    """
+    (request_id, provider_id) pairs that already had an offer.
+    """
+    ids = sorted(set(request_ids))
+    query = text(
+        "SELECT request_id, provider_id FROM request_offers WHERE request_id IN :ids"
+    ).bindparams(bindparam("ids", expanding=True))
+    out = set()
+    for start in range(0, len(ids), ID_CHUNK):
+        out.update((rid, pid) for rid, pid in conn.execute(query, {"ids": ids[start:start + ID_CHUNK]}))
+    return out
+
+
+def publish_withdrawn(request_id: int, provider_ids: Iterable[int]):
+    for pid in provider_ids:
+        hub.publish(provider_channel(pid), "request.withdrawn", {"id": request_id})
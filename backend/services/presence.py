@@ -0,0 +1,434 @@
+# backend/services/presence.py
+"""
+Write-coalescing store for provider location pings.
+
+Pings only touch memory: the latest position per provider is kept in a
+dict and marked dirty. A background thread flushes every FLUSH_SECONDS
+in one transaction: a multi-row upsert of the dirty positions into
+provider_locations (the only stored current position) plus a batched
+insert of the stored points into the location trail (see
+services.location_trail). A fleet pinging every few seconds therefore
+costs one commit per flush interval instead of one per ping.
+
+Not every ping is worth storing. A ping is only queued for the flush
+when the provider moved at least `location_min_move_m` from the last
+stored point and `location_min_interval_s` has passed since it (admin
+settings, re-read on every flush). Suppressed pings still update the
+in-memory position and "last seen", so search and live tracking see
+them.
+
+Presence is a lease. Every ping or heartbeat renews the provider's
+lease for LEASE_SECONDS. The background thread also sweeps the provider
+index: providers whose lease ran out are removed from it in one pass,
+so search never compares timestamps per request. A provider that comes
+back is re-indexed from its row on the next ping. Providers found in
+the index without a lease (after a restart, or just switched online)
+get one lease period of grace. `is_online` itself is left alone: it
+records the provider's intent, not reachability.
+
+Provider.city follows the provider's position. When a ping lands in a
+new CITY_CELL_DEG grid cell, the background thread resolves the city
+offline (services.city_resolver, OpenCage only for ambiguous spots) and
+updates the rows whose city changed in one batch.
+
+Reads of "where is provider X" are served from memory and fall back to
+provider_locations. The store is per-process: with several workers each
+one flushes the pings it received, and the last flush wins.
+"""
+
+import logging
+import math
+import os
+import threading
+import time
+from datetime import datetime
+from typing import Dict, List, Optional, Set, Tuple
+
+from fastapi import HTTPException
+from sqlalchemy import text
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+import models
+from services.city_resolver import city_for
+from services.live_location import live_locations
+from services.location_trail import TrailPoint, append_points, simplify_trail
+from services.provider_index import provider_index
+from services.stats_cache import provider_state, stats_counters
+from utils.location import haversine_km
+from utils.settings_store import cached_settings
+
+logger = logging.getLogger("quickserve.presence")
+
+FLUSH_SECONDS = float(os.getenv("PRESENCE_FLUSH_SECONDS", "5"))
+LEASE_SECONDS = float(os.getenv("PRESENCE_LEASE_SECONDS", "90"))
+TRAIL_SIMPLIFY_SECONDS = 3600
+# ~1.1 km; city is re-resolved only when a provider changes cell
+CITY_CELL_DEG = 0.01
+# rows per statement; keeps the bind parameter count well under driver limits
+FLUSH_CHUNK = 500
+
+# (latitude, longitude, pinged_at)
+Position = Tuple[float, float, datetime]
+# (latitude, longitude, monotonic time) of the last point queued for storage
+Stored = Tuple[float, float, float]
+
+
+class PresenceStore:
+    def __init__(
+        self,
+        flush_seconds: float = FLUSH_SECONDS,
+        lease_seconds: float = LEASE_SECONDS,
+    ):
+        self.flush_seconds = flush_seconds
+        self.lease_seconds = lease_seconds
+        self._lock = threading.Lock()
+        self._provider_for_user: Dict[int, Tuple[int, bool]] = {}
+        self._positions: Dict[int, Position] = {}
+        self._dirty: Dict[int, Position] = {}
+        self._trail: List[TrailPoint] = []
+        self._city_cell: Dict[int, Tuple[int, int]] = {}
+        self._city_pending: Dict[int, Tuple[float, float]] = {}
+        self._stored: Dict[int, Stored] = {}
+        self._leases: Dict[int, float] = {}  # provider id -> expiry (clock)
+        self._expired: Set[int] = set()
+        self.min_move_km = 0.0
+        self.min_interval_s = 0.0
+        self._engine: Optional[Engine] = None
+        self.clock = time.monotonic
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.pings = 0
+        self.suppressed = 0
+        self.expired = 0
+        self.city_checks = 0
+        self.city_resolved = 0
+        self.flushes = 0
+        self.rows_flushed = 0
+
+    # -------------------------------------------------
+    # Provider lookup cache (user id -> provider id, online flag)
+    # -------------------------------------------------
+    def lookup(self, user_id: int) -> Optional[Tuple[int, bool]]:
+        with self._lock:
+            return self._provider_for_user.get(user_id)
+
+    def remember(self, user_id: int, provider_id: int, online: bool):
+        with self._lock:
+            self._provider_for_user[user_id] = (provider_id, online)
+
+    def set_online(self, provider: models.Provider):
+        """
+        Keep the cached online flag in step after an endpoint changed it.
+        """
+        with self._lock:
+            if provider.user_id in self._provider_for_user:
+                self._provider_for_user[provider.user_id] = (
+                    provider.id,
+                    bool(provider.is_online),
+                )
+
+    # -------------------------------------------------
+    # Leases
+    # -------------------------------------------------
+    def renew(self, provider_id: int):
+        with self._lock:
+            self._leases[provider_id] = self.clock() + self.lease_seconds
+
+    def is_expired(self, provider_id: int) -> bool:
+        with self._lock:
+            return provider_id in self._expired
+
+    def reinstated(self, provider_id: int):
+        with self._lock:
+            self._expired.discard(provider_id)
+
+    def resume(self, provider_id: int):
+        """
+        Fresh lease for a provider re-indexed by an endpoint other than a
+        ping (went online, KYC approved, profile saved), so searches
+        without coordinates stop hiding it too.
+        """
+        with self._lock:
+            self._leases[provider_id] = self.clock() + self.lease_seconds
+            self._expired.discard(provider_id)
+
+    def sweep(self) -> List[int]:
+        """
+        Drop providers with a lapsed lease from the index in one pass.
+        Returns their ids.
+        """
+        now = self.clock()
+        grace = now + self.lease_seconds
+        indexed = provider_index.ids()
+        with self._lock:
+            leases = {pid: self._leases.get(pid, grace) for pid in indexed}
+            stale = [pid for pid, expires in leases.items() if expires <= now]
+            for pid in stale:
+                del leases[pid]
+            # Keep live leases of providers outside the index (e.g. just
+            # went offline) until they lapse
+            for pid, expires in self._leases.items():
+                if pid not in leases and expires > now:
+                    leases[pid] = expires
+            self._leases = leases
+            self._expired.update(stale)
+            self.expired += len(stale)
+
+        provider_index.remove_many(stale)
+        if stale:
+            logger.info("Presence lease expired for %d providers", len(stale))
+        return stale
+
+    # -------------------------------------------------
+    # Pings and reads
+    # -------------------------------------------------
+    def record(self, provider_id: int, lat: float, lng: float):
+        position = (lat, lng, datetime.utcnow())
+        now = self.clock()
+        with self._lock:
+            self._positions[provider_id] = position
+            self.pings += 1
+
+            stored = self._stored.get(provider_id)
+            if stored is not None and (
+                now - stored[2] < self.min_interval_s
+                or haversine_km(stored[0], stored[1], lat, lng) < self.min_move_km
+            ):
+                self.suppressed += 1
+            else:
+                self._stored[provider_id] = (lat, lng, now)
+                self._dirty[provider_id] = position
+                self._trail.append(
+                    (provider_id, live_locations.active_request(provider_id), lat, lng, position[2])
+                )
+
+            cell = (math.floor(lat / CITY_CELL_DEG), math.floor(lng / CITY_CELL_DEG))
+            if self._city_cell.get(provider_id) != cell and (lat, lng) != (0, 0):
+                self._city_cell[provider_id] = cell
+                self._city_pending[provider_id] = (lat, lng)
+        provider_index.move(provider_id, lat, lng)
+
+    def last_seen(self, provider_id: int) -> Optional[datetime]:
+        position = self.position(provider_id)
+        return position[2] if position is not None else None
+
+    def position(self, provider_id: int) -> Optional[Position]:
+        with self._lock:
+            return self._positions.get(provider_id)
+
+    def current(self, provider: models.Provider) -> Tuple[Optional[float], Optional[float]]:
+        """
+        Latest (lat, lng) for a provider: memory first, then
+        provider_locations, which lags by up to one flush interval.
+        """
+        position = self.position(provider.id)
+        if position is not None:
+            return position[0], position[1]
+        if provider.location is not None:
+            return provider.location.latitude, provider.location.longitude
+        return None, None
+
+    # -------------------------------------------------
+    # Flushing
+    # -------------------------------------------------
+    def flush(self, engine: Optional[Engine] = None) -> int:
+        """
+        Write all dirty positions and pending trail points in one
+        transaction. Returns the number of providers written.
+        """
+        engine = engine or self._engine
+        if engine is None:
+            return 0
+        with self._lock:
+            batch, self._dirty = self._dirty, {}
+            points, self._trail = self._trail, []
+        if not batch:
+            return 0
+
+        rows = [(pid, lat, lng, at) for pid, (lat, lng, at) in batch.items()]
+        try:
+            with engine.begin() as conn:
+                for start in range(0, len(rows), FLUSH_CHUNK):
+                    _write_positions(conn, rows[start:start + FLUSH_CHUNK])
+                append_points(conn, points)
+        except Exception:
+            logger.exception("Presence flush of %d providers failed", len(rows))
+            with self._lock:
+                # Re-queue unless a newer ping arrived meanwhile
+                for pid, position in batch.items():
+                    self._dirty.setdefault(pid, position)
+                self._trail[:0] = points
+            return 0
+
+        with self._lock:
+            self.flushes += 1
+            self.rows_flushed += len(rows)
+        return len(rows)
+
+    def resolve_cities(self, engine: Optional[Engine] = None) -> int:
+        """
+        Resolve the city of providers that changed cell and store it
+        where it differs. Returns the number of providers resolved.
+        """
+        engine = engine or self._engine
+        with self._lock:
+            pending, self._city_pending = self._city_pending, {}
+        if not pending or engine is None:
+            return 0
+
+        updates = []
+        for pid, (lat, lng) in pending.items():
+            city = city_for(lat, lng)
+            if city:
+                updates.append({"id": pid, "city": city})
+
+        if updates:
+            with engine.begin() as conn:
+                conn.execute(
+                    text(
+                        "UPDATE providers SET city = :city "
+                        "WHERE id = :id AND (city IS NULL OR city <> :city)"
+                    ),
+                    updates,
+                )
+
+        with self._lock:
+            self.city_checks += len(pending)
+            self.city_resolved += len(updates)
+        return len(updates)
+
+    def refresh_thresholds(self):
+        settings = cached_settings()
+        self.min_move_km = float(settings.get("location_min_move_m") or 0) / 1000
+        self.min_interval_s = float(settings.get("location_min_interval_s") or 0)
+
+    def _run(self):
+        simplified_at = time.monotonic()
+        while not self._stop.wait(self.flush_seconds):
+            self.refresh_thresholds()
+            self.flush()
+            self.sweep()
+            try:
+                self.resolve_cities()
+            except Exception:
+                logger.exception("City resolution failed")
+            if time.monotonic() - simplified_at > TRAIL_SIMPLIFY_SECONDS:
+                simplified_at = time.monotonic()
+                try:
+                    simplify_trail(self._engine)
+                except Exception:
+                    logger.exception("Trail simplification failed")
+
+    def start(self, engine: Engine):
+        self._engine = engine
+        self.refresh_thresholds()
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._run, name="presence-flush", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self.flush_seconds + 5)
+            self._thread = None
+        self.flush()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "tracked": len(self._positions),
+                "dirty": len(self._dirty),
+                "trail_pending": len(self._trail),
+                "pings": self.pings,
+                "suppressed": self.suppressed,
+                "leases": len(self._leases),
+                "expired": self.expired,
+                "city_checks": self.city_checks,
+                "city_resolved": self.city_resolved,
+                "flushes": self.flushes,
+                "rows_flushed": self.rows_flushed,
+            }
+
+
+def _write_positions(conn, rows: List[Tuple[int, float, float, datetime]]):
+    params = {}
+    for i, (pid, lat, lng, at) in enumerate(rows):
+        params.update({f"id{i}": pid, f"lat{i}": lat, f"lng{i}": lng, f"at{i}": at})
+    values = ", ".join(
+        f"(:id{i}, :lat{i}, :lng{i}, true, :at{i})" for i in range(len(rows))
+    )
+    conn.execute(
+        text(
+            "INSERT INTO provider_locations "
+            "(provider_id, latitude, longitude, is_online, updated_at) "
+            f"VALUES {values} "
+            "ON CONFLICT (provider_id) DO UPDATE SET "
+            "latitude = excluded.latitude, longitude = excluded.longitude, "
+            "updated_at = excluded.updated_at"
+        ),
+        params,
+    )
+
+
+presence = PresenceStore()
+
+
+# =====================================================
+# Shared ping handler for the location endpoints
+# =====================================================
+def record_ping(
+    db: Session,
+    user_id: int,
+    lat: Optional[float],
+    lng: Optional[float],
+    is_online: Optional[bool] = None,
+) -> int:
+    """
+    Ingest one location ping and return the provider id.
+
+    Renews the provider's presence lease; `lat`/`lng` may be None for a
+    bare heartbeat. Only the first ping of a provider (per process), a
+    ping that flips its online flag, or the first ping after its lease
+    expired touches the database; every other ping is a memory write
+    picked up by the next flush.
+    """
+    live_locations.ensure_loaded(db)
+    known = presence.lookup(user_id)
+    if (
+        known is None
+        or (is_online is not None and is_online != known[1])
+        or presence.is_expired(known[0])
+    ):
+        provider = (
+            db.query(models.Provider)
+            .filter(models.Provider.user_id == user_id)
+            .first()
+        )
+        if not provider:
+            raise HTTPException(status_code=404, detail="Provider not found")
+
+        if is_online is not None and is_online != bool(provider.is_online):
+            before = provider_state(provider)
+            provider.is_online = is_online
+            db.commit()
+            stats_counters.provider_changed(before, provider)
+
+        if lat is None or lng is None:
+            provider_index.sync(provider, *presence.current(provider))
+        else:
+            provider_index.sync(provider, lat, lng)
+        presence.remember(user_id, provider.id, bool(provider.is_online))
+        presence.reinstated(provider.id)
+        provider_id = provider.id
+    else:
+        provider_id = known[0]
+
+    presence.renew(provider_id)
+    if lat is not None and lng is not None:
+        presence.record(provider_id, lat, lng)
+    return provider_id
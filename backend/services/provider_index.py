@@ -0,0 +1,223 @@
+# backend/services/provider_index.py
+"""
+In-memory spatial index of online providers.
+
+Providers are bucketed into fixed-size lat/lng grid cells keyed by
+(service_type, cell). Nearby search only looks at the cells that overlap
+the search radius, so the customer polling loop never scans the
+providers table.
+
+The index is per-process. It is loaded from the database on first use
+and kept current by the endpoints that change a provider's location,
+availability, service type or KYC status (see `sync`).
+"""
+
+import logging
+import math
+import threading
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+import models
+from utils.distance import rank_within_radius
+from utils.settings_store import cached_settings
+
+logger = logging.getLogger("quickserve.provider_index")
+
+# ~2.2 km of latitude per cell
+CELL_DEG = 0.02
+KM_PER_DEG_LAT = 111.32
+
+CellKey = Tuple[str, int, int]
+
+
+def _cell(lat: float, lng: float) -> Tuple[int, int]:
+    return int(math.floor(lat / CELL_DEG)), int(math.floor(lng / CELL_DEG))
+
+
+class ProviderGridIndex:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._cells: Dict[CellKey, Dict[int, Tuple[float, float]]] = {}
+        self._where: Dict[int, CellKey] = {}
+        self._loaded = False
+
+    # -------------------------------------------------
+    # Writes
+    # -------------------------------------------------
+    def upsert(self, provider_id: int, service_type: str, lat: float, lng: float):
+        key = (service_type, *_cell(lat, lng))
+        with self._lock:
+            old_key = self._where.get(provider_id)
+            if old_key is not None and old_key != key:
+                self._discard(provider_id, old_key)
+            self._cells.setdefault(key, {})[provider_id] = (lat, lng)
+            self._where[provider_id] = key
+
+    def move(self, provider_id: int, lat: float, lng: float):
+        """
+        Update the position of a provider that is already indexed; no-op
+        otherwise (eligibility only changes through `sync`).
+        """
+        with self._lock:
+            old_key = self._where.get(provider_id)
+            if old_key is None:
+                return
+            key = (old_key[0], *_cell(lat, lng))
+            if key != old_key:
+                self._discard(provider_id, old_key)
+                self._where[provider_id] = key
+            self._cells.setdefault(key, {})[provider_id] = (lat, lng)
+
+    def remove(self, provider_id: int):
+        with self._lock:
+            old_key = self._where.pop(provider_id, None)
+            if old_key is not None:
+                self._discard(provider_id, old_key)
+
+    def remove_many(self, provider_ids: Iterable[int]):
+        with self._lock:
+            for provider_id in provider_ids:
+                old_key = self._where.pop(provider_id, None)
+                if old_key is not None:
+                    self._discard(provider_id, old_key)
+
+    def _discard(self, provider_id: int, key: CellKey):
+        bucket = self._cells.get(key)
+        if bucket is None:
+            return
+        bucket.pop(provider_id, None)
+        if not bucket:
+            del self._cells[key]
+
+    def sync(
+        self,
+        provider: models.Provider,
+        lat: Optional[float] = None,
+        lng: Optional[float] = None,
+    ):
+        """
+        Bring the index in line with a provider row after it was changed.
+        `lat`/`lng` override the stored position (provider_locations).
+        """
+        if (lat is None or lng is None) and provider.location is not None:
+            lat, lng = provider.location.latitude, provider.location.longitude
+
+        if (
+            provider.is_online
+            and provider.kyc_status == "approved"
+            and provider.service_type
+            and lat is not None
+            and lng is not None
+        ):
+            self.upsert(provider.id, provider.service_type, lat, lng)
+        else:
+            self.remove(provider.id)
+
+    # -------------------------------------------------
+    # Loading
+    # -------------------------------------------------
+    def load(self, db: Session):
+        rows = (
+            db.query(
+                models.Provider.id,
+                models.Provider.service_type,
+                models.ProviderLocation.latitude,
+                models.ProviderLocation.longitude,
+            )
+            .join(
+                models.ProviderLocation,
+                models.ProviderLocation.provider_id == models.Provider.id,
+            )
+            .filter(
+                models.Provider.is_online == True,
+                models.Provider.kyc_status == "approved",
+                models.Provider.service_type.isnot(None),
+            )
+            .all()
+        )
+
+        cells: Dict[CellKey, Dict[int, Tuple[float, float]]] = {}
+        where: Dict[int, CellKey] = {}
+        for pid, service_type, lat, lng in rows:
+            key = (service_type, *_cell(lat, lng))
+            cells.setdefault(key, {})[pid] = (lat, lng)
+            where[pid] = key
+
+        with self._lock:
+            self._cells = cells
+            self._where = where
+            self._loaded = True
+
+        logger.info("Provider index loaded with %d providers", len(where))
+
+    def ensure_loaded(self, db: Session):
+        if not self._loaded:
+            self.load(db)
+
+    # -------------------------------------------------
+    # Reads
+    # -------------------------------------------------
+    def nearest(
+        self,
+        service_types: Optional[Iterable[str]],
+        lat: float,
+        lng: float,
+        radius_km: float,
+        limit: int,
+    ) -> List[Tuple[int, float]]:
+        """
+        Returns up to `limit` (provider_id, distance_km) pairs inside
+        `radius_km`, nearest first. `service_types=None` matches any type.
+        """
+        dlat = radius_km / KM_PER_DEG_LAT
+        cos_lat = max(math.cos(math.radians(lat)), 0.01)
+        dlng = radius_km / (KM_PER_DEG_LAT * cos_lat)
+
+        min_x, min_y = _cell(lat - dlat, lng - dlng)
+        max_x, max_y = _cell(lat + dlat, lng + dlng)
+
+        ids, lats, lngs = [], [], []
+        with self._lock:
+            if service_types is None:
+                service_types = {key[0] for key in self._cells}
+            for service_type in set(service_types):
+                for x in range(min_x, max_x + 1):
+                    for y in range(min_y, max_y + 1):
+                        bucket = self._cells.get((service_type, x, y))
+                        if bucket:
+                            for pid, (plat, plng) in bucket.items():
+                                ids.append(pid)
+                                lats.append(plat)
+                                lngs.append(plng)
+
+        if not ids:
+            return []
+
+        ranked = rank_within_radius(lat, lng, lats, lngs, radius_km, limit)
+        return [
+            (ids[i], round(float(ranked.distances[i]), 2)) for i in ranked.top
+        ]
+
+    def ids(self) -> List[int]:
+        with self._lock:
+            return list(self._where)
+
+    def __len__(self):
+        return len(self._where)
+
+
+provider_index = ProviderGridIndex()
+
+
+def search_radius_km(requested: Optional[float] = None) -> float:
+    """
+    Radius for nearby search: the admin default, or the requested value
+    capped at the admin maximum.
+    """
+    settings = cached_settings()
+    max_radius = float(settings.get("max_search_radius_km") or 25)
+    if requested is None:
+        requested = float(settings.get("default_search_radius_km") or 5)
+    return min(float(requested), max_radius)
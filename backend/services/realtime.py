@@ -0,0 +1,168 @@
+# backend/services/realtime.py
+"""
+In-process pub/sub hub behind the Server-Sent Events endpoints.
+
+Channels are plain strings such as "provider:12" or "request:40". Sync
+endpoints run in the threadpool, so `publish` hands events to the event
+loop with call_soon_threadsafe; it is a no-op when nobody is subscribed.
+
+Idle connections are cheap: each one is a small bounded queue and a
+suspended generator. A single heartbeat task pings idle queues every
+HEARTBEAT_SECONDS (which also surfaces dead sockets), so there is no
+per-connection timer. Connections per worker are capped by
+SSE_MAX_CONNECTIONS.
+
+The hub is per-process: a subscriber only sees events published by the
+worker it is connected to. Clients keep polling as a fallback.
+"""
+
+import asyncio
+import json
+import logging
+import os
+from typing import Callable, Dict, Optional, Set
+
+from fastapi import HTTPException
+from fastapi.responses import StreamingResponse
+
+logger = logging.getLogger("quickserve.realtime")
+
+HEARTBEAT_SECONDS = 15
+QUEUE_SIZE = 32
+MAX_CONNECTIONS = int(os.getenv("SSE_MAX_CONNECTIONS", "10000"))
+
+# Queue item meaning "send a keep-alive comment"
+_PING = None
+
+
+class EventHub:
+    def __init__(self):
+        self._subs: Dict[str, Set[asyncio.Queue]] = {}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._heartbeat: Optional[asyncio.Task] = None
+        self.connections = 0
+        self.published = 0
+        self.dropped = 0
+
+    # -------------------------------------------------
+    # Subscribers
+    # -------------------------------------------------
+    def has_capacity(self) -> bool:
+        return self.connections < MAX_CONNECTIONS
+
+    def subscribe(self, channel: str) -> asyncio.Queue:
+        self._loop = asyncio.get_running_loop()
+        queue: asyncio.Queue = asyncio.Queue(maxsize=QUEUE_SIZE)
+        self._subs.setdefault(channel, set()).add(queue)
+        self.connections += 1
+
+        if self._heartbeat is None or self._heartbeat.done():
+            self._heartbeat = self._loop.create_task(self._ping_idle())
+        return queue
+
+    def unsubscribe(self, channel: str, queue: asyncio.Queue):
+        subs = self._subs.get(channel)
+        if subs is None or queue not in subs:
+            return
+        subs.discard(queue)
+        self.connections -= 1
+        if not subs:
+            del self._subs[channel]
+
+    async def _ping_idle(self):
+        while self.connections:
+            await asyncio.sleep(HEARTBEAT_SECONDS)
+            for subs in list(self._subs.values()):
+                for queue in subs:
+                    if queue.empty():
+                        queue.put_nowait(_PING)
+
+    # -------------------------------------------------
+    # Publishing
+    # -------------------------------------------------
+    def publish(self, channel: str, event_type: str, data: dict):
+        """
+        Deliver an event to every subscriber of `channel`. Safe to call
+        from any thread.
+        """
+        if channel not in self._subs or self._loop is None:
+            return
+
+        event = {"type": event_type, "data": data}
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+
+        if running is self._loop:
+            self._fanout(channel, event)
+        else:
+            self._loop.call_soon_threadsafe(self._fanout, channel, event)
+
+    def _fanout(self, channel: str, event: dict):
+        self.published += 1
+        for queue in list(self._subs.get(channel, ())):
+            if queue.full():
+                # Slow consumer: drop its oldest event rather than block
+                queue.get_nowait()
+                self.dropped += 1
+            queue.put_nowait(event)
+
+    def stats(self) -> dict:
+        return {
+            "connections": self.connections,
+            "channels": len(self._subs),
+            "max_connections": MAX_CONNECTIONS,
+            "published": self.published,
+            "dropped": self.dropped,
+        }
+
+
+hub = EventHub()
+
+
+def provider_channel(provider_id: int) -> str:
+    return f"provider:{provider_id}"
+
+
+def request_channel(request_id: int) -> str:
+    return f"request:{request_id}"
+
+
+def format_sse(event: dict) -> str:
+    return f"event: {event['type']}\ndata: {json.dumps(event['data'])}\n\n"
+
+
+async def sse_stream(channel: str, snapshot: Optional[Callable[[], Optional[dict]]] = None):
+    """
+    Relays `channel` events as SSE frames until the client goes away
+    (Starlette cancels the generator or the next write fails).
+    `snapshot` may return an event to send first, e.g. a result that
+    was published before the client subscribed.
+    """
+    queue = hub.subscribe(channel)
+    try:
+        # Taken after subscribing, so nothing falls between the two
+        first = snapshot() if snapshot else None
+        yield "retry: 5000\n\n"
+        if first:
+            yield format_sse(first)
+        while True:
+            event = await queue.get()
+            if event is _PING:
+                yield ": ping\n\n"
+            else:
+                yield format_sse(event)
+    finally:
+        hub.unsubscribe(channel, queue)
+
+
+def sse_response(channel: str, snapshot: Optional[Callable[[], Optional[dict]]] = None) -> StreamingResponse:
+    if not hub.has_capacity():
+        raise HTTPException(status_code=503, detail="Too many live connections")
+
+    return StreamingResponse(
+        sse_stream(channel, snapshot),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
@@ -0,0 +1,214 @@
+# backend/services/request_state.py
+"""
+Request status machine.
+
+TRANSITIONS declares which status may follow which. Every status change
+goes through `transition`: one guarded UPDATE ... RETURNING that only
+matches while the row is in a status allowed to move to the target
+(plus the caller's ownership guard and, optionally, the version the
+caller last saw). Each change bumps `requests.version`, so two writers
+can't silently overwrite each other. `reassign` is the same guarded
+update for a pending request changing provider. If no row comes back,
+`explain_miss` tells 404 (not yours) from 409 (state moved on).
+
+`announce` and `announce_assignment` are the one place these changes
+are published: "request.status" on the request channel (plus the
+provider's channel on cancel, plus "request.provider" when a provider
+takes the job), the provider events of a reassignment, and the
+registered listeners (live location tracking).
+"""
+
+from datetime import datetime
+from typing import Callable, Dict, List, Optional, Tuple
+
+from fastapi import HTTPException
+from sqlalchemy import DateTime, bindparam, exists, text
+from sqlalchemy.engine import Connection, Row
+
+import models
+from services.realtime import hub, provider_channel, request_channel
+
+# A provider with a request in one of these statuses is busy
+ACTIVE_STATUSES = ("assigned", "en_route", "arrived", "payment")
+FINAL_STATUSES = ("completed", "cancelled")
+
+# status -> statuses it may move to; providers can skip ahead, not back
+TRANSITIONS: Dict[str, Tuple[str, ...]] = {
+    "pending": ("assigned", "cancelled"),
+    "assigned": ("en_route", "arrived", "payment", "completed"),
+    "en_route": ("arrived", "payment", "completed"),
+    "arrived": ("payment", "completed"),
+    "payment": ("completed",),
+}
+
+RETURNING = "id, status, version, customer_id, provider_id, budget, title, service_type"
+
+_listeners: List[Callable[[Optional[int], int, str], None]] = []
+
+
+def provider_has_active_job():
+    """
+    Correlated EXISTS over Provider.id, for use as `~provider_has_active_job()`
+    in a provider query so the busy check happens set-wise in SQL.
+    """
+    return exists().where(
+        models.Request.provider_id == models.Provider.id,
+        models.Request.status.in_(ACTIVE_STATUSES),
+    )
+
+
+def can_move(current: Optional[str], to: str) -> bool:
+    return to in TRANSITIONS.get(current or "", ())
+
+
+def sources(to: str) -> Tuple[str, ...]:
+    return tuple(s for s, targets in TRANSITIONS.items() if to in targets)
+
+
+# =====================================================
+# GUARDED UPDATES
+# =====================================================
+def _update(
+    conn: Connection,
+    request_id: int,
+    statuses: Tuple[str, ...],
+    assignments: str,
+    where: Optional[str],
+    params: Optional[dict],
+    version: Optional[int],
+) -> Optional[Row]:
+    sql = (
+        f"UPDATE requests SET {assignments}, version = version + 1 "
+        "WHERE id = :rid AND status IN :statuses"
+    )
+    if where:
+        sql += f" AND ({where})"
+    if version is not None:
+        sql += " AND version = :version"
+    values = {**(params or {}), "rid": request_id, "statuses": list(statuses), "version": version}
+    binds = [bindparam("statuses", expanding=True)] + [
+        bindparam(k, type_=DateTime) for k, v in values.items() if isinstance(v, datetime)
+    ]
+    stmt = text(f"{sql} RETURNING {RETURNING}").bindparams(*binds)
+    return conn.execute(stmt, values).first()
+
+
+def transition(
+    conn: Connection,
+    request_id: int,
+    to: str,
+    *,
+    where: Optional[str] = None,
+    values: Optional[str] = None,
+    params: Optional[dict] = None,
+    version: Optional[int] = None,
+) -> Optional[Row]:
+    """
+    Move a request to `to` if TRANSITIONS allows it from its current
+    status. `where` is an extra SQL guard (ownership), `values` extra
+    "col = expr" assignments, both using `params`. Returns the updated
+    row (RETURNING columns) or None if nothing matched.
+    """
+    assignments = "status = :to" + (f", {values}" if values else "")
+    return _update(
+        conn, request_id, sources(to), assignments, where,
+        {**(params or {}), "to": to}, version,
+    )
+
+
+def reassign(
+    conn: Connection,
+    request_id: int,
+    provider_id: int,
+    budget: Optional[float],
+    *,
+    where: Optional[str] = None,
+    params: Optional[dict] = None,
+    version: Optional[int] = None,
+) -> Optional[Row]:
+    """
+    Point a still pending request at another provider (no status change).
+    """
+    return _update(
+        conn, request_id, ("pending",),
+        "provider_id = :pid, budget = COALESCE(:budget, budget)", where,
+        {**(params or {}), "pid": provider_id, "budget": budget}, version,
+    )
+
+
+def explain_miss(
+    conn: Connection,
+    request_id: int,
+    to: str,
+    *,
+    where: Optional[str] = None,
+    params: Optional[dict] = None,
+    allowed: Optional[Tuple[str, ...]] = None,
+    conflict: Optional[str] = None,
+):
+    """
+    Raise the HTTP error for a guarded update that matched no row.
+    `allowed` are the statuses the update accepted (default: the
+    TRANSITIONS sources of `to`).
+    """
+    sql = "SELECT status FROM requests WHERE id = :rid"
+    if where:
+        sql += f" AND ({where})"
+    current = conn.execute(text(sql), {**(params or {}), "rid": request_id}).first()
+    if current is None:
+        raise HTTPException(status_code=404, detail="Request not found")
+    if conflict:
+        raise HTTPException(status_code=409, detail=conflict)
+    if current.status not in (allowed or sources(to)):
+        raise HTTPException(status_code=409, detail=f"Request is already {current.status}")
+    raise HTTPException(status_code=409, detail="Request was changed, reload and retry")
+
+
+# =====================================================
+# EVENTS
+# =====================================================
+def on_transition(listener: Callable[[Optional[int], int, str], None]):
+    """
+    Register listener(provider_id, request_id, status) for every announce.
+    """
+    _listeners.append(listener)
+
+
+def announce(row: Row):
+    payload = {"id": row.id, "status": row.status, "version": row.version}
+    hub.publish(request_channel(row.id), "request.status", payload)
+    if row.status == "assigned":
+        hub.publish(
+            request_channel(row.id),
+            "request.provider",
+            {"id": row.id, "provider_id": row.provider_id, "budget": row.budget},
+        )
+    if row.status == "cancelled" and row.provider_id:
+        hub.publish(provider_channel(row.provider_id), "request.status", payload)
+    for listener in _listeners:
+        listener(row.provider_id, row.id, row.status)
+
+
+def announce_assignment(row: Row, previous_provider_id: Optional[int] = None):
+    """
+    Events for `reassign`: the customer sees the provider and price, the
+    new provider gets the job, a replaced provider loses it.
+    """
+    if previous_provider_id and previous_provider_id != row.provider_id:
+        hub.publish(provider_channel(previous_provider_id), "request.withdrawn", {"id": row.id})
+    hub.publish(
+        request_channel(row.id),
+        "request.provider",
+        {"id": row.id, "provider_id": row.provider_id, "budget": row.budget},
+    )
+    hub.publish(
+        provider_channel(row.provider_id),
+        "request.assigned",
+        {
+            "id": row.id,
+            "title": row.title,
+            "service_type": row.service_type,
+            "status": row.status,
+            "budget": row.budget,
+        },
+    )
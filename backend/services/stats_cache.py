@@ -0,0 +1,101 @@
+# backend/services/stats_cache.py
+"""
+In-process cache of the admin dashboard counters.
+
+The counters are loaded with one aggregate statement and then updated
+incrementally by the endpoints that change them (signup, KYC upload and
+review, availability, request creation). They are reloaded every
+RECONCILE_SECONDS so other workers' writes are picked up and any drift
+is corrected.
+"""
+
+import threading
+import time
+from typing import Dict, Optional, Tuple
+
+from sqlalchemy import case, func
+from sqlalchemy.orm import Session
+
+import models
+
+RECONCILE_SECONDS = 300
+
+ProviderState = Tuple[Optional[str], bool]
+
+
+def provider_state(provider: models.Provider) -> ProviderState:
+    return provider.kyc_status, bool(provider.is_online)
+
+
+def load_counts(db: Session) -> Dict[str, int]:
+    """
+    All dashboard counts in a single statement.
+    """
+    customers = (
+        db.query(func.count(models.User.id))
+        .filter(models.User.role == "customer")
+        .scalar_subquery()
+    )
+    requests = db.query(func.count(models.Request.id)).scalar_subquery()
+
+    row = (
+        db.query(
+            func.count(case((models.Provider.kyc_status == "pending", 1))),
+            func.count(models.Provider.id),
+            func.count(case((models.Provider.is_online == True, 1))),
+            customers,
+            requests,
+        )
+        .select_from(models.Provider)
+        .one()
+    )
+
+    return {
+        "pending_kyc": row[0],
+        "total_providers": row[1],
+        "online_providers": row[2],
+        "total_customers": row[3],
+        "total_requests": row[4],
+    }
+
+
+class StatsCounters:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._values: Dict[str, int] = {}
+        self._loaded_at = 0.0
+
+    def snapshot(self, db: Session) -> Dict[str, int]:
+        if time.monotonic() - self._loaded_at > RECONCILE_SECONDS:
+            values = load_counts(db)
+            with self._lock:
+                self._values = values
+                self._loaded_at = time.monotonic()
+        with self._lock:
+            return dict(self._values)
+
+    def incr(self, name: str, delta: int = 1):
+        with self._lock:
+            # Nothing to adjust until the first load; it will count this row
+            if name in self._values:
+                self._values[name] += delta
+
+    def provider_changed(self, before: ProviderState, provider: models.Provider):
+        """
+        Adjust pending_kyc/online_providers after a provider row changed.
+        `before` comes from provider_state() taken prior to the change.
+        """
+        old_kyc, old_online = before
+        new_kyc, new_online = provider_state(provider)
+
+        if old_kyc != new_kyc:
+            if old_kyc == "pending":
+                self.incr("pending_kyc", -1)
+            if new_kyc == "pending":
+                self.incr("pending_kyc", 1)
+
+        if old_online != new_online:
+            self.incr("online_providers", 1 if new_online else -1)
+
+
+stats_counters = StatsCounters()
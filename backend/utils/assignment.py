@@ -0,0 +1,88 @@
+"""
+Minimum-cost bipartite matching over sparse candidate edges.
+
+The Hungarian method in its successive shortest path form: rows are
+added one at a time and each one augments the matching along the
+cheapest alternating path (Dijkstra over reduced costs, kept
+non-negative by row/column potentials). The search stops at the first
+free column, so with a handful of candidates per row an augmentation
+only touches its neighbourhood instead of an n x m matrix. Columns a
+failed search reached can never lead to a free column again, so later
+searches skip them.
+"""
+
+import heapq
+from typing import Dict, Iterable, List, Tuple
+
+
+def min_cost_matching(edges: Iterable[Tuple[int, int, float]]) -> List[Tuple[int, int]]:
+    """
+    Match rows to columns over feasible (row, col, cost) edges, costs
+    >= 0. Rows are considered in ascending order, so when not every row
+    can be matched the lower ones win. The result is a maximum matching
+    with the least total cost for the rows it covers, as sorted
+    (row, col) pairs.
+    """
+    adj: Dict[int, List[Tuple[int, float]]] = {}
+    for r, c, w in edges:
+        adj.setdefault(r, []).append((c, float(w)))
+
+    row_pot: Dict[int, float] = {}
+    col_pot: Dict[int, float] = {}
+    col_of: Dict[int, int] = {}
+    row_of: Dict[int, int] = {}
+    dead = set()
+
+    for root in sorted(adj):
+        # Dijkstra from `root`; a column's distance is final when popped
+        col_dist: Dict[int, float] = {}
+        row_dist: Dict[int, float] = {root: 0.0}
+        via: Dict[int, int] = {}  # column -> row it was reached from
+        heap: List[Tuple[float, int, int]] = []
+
+        def relax(row: int, base: float):
+            rp = row_pot.get(row, 0.0)
+            for col, w in adj[row]:
+                if col in col_dist or col in dead or col_of.get(row) == col:
+                    continue
+                heapq.heappush(heap, (base + w + rp - col_pot.get(col, 0.0), col, row))
+
+        relax(root, 0.0)
+        free_col = None
+        while heap:
+            d, col, row = heapq.heappop(heap)
+            if col in col_dist:
+                continue
+            col_dist[col] = d
+            via[col] = row
+            owner = row_of.get(col)
+            if owner is None:
+                free_col = col
+                break
+            # Matched edges are tight, so the owner sits at the same distance
+            row_dist[owner] = d
+            relax(owner, d)
+
+        if free_col is None:
+            dead.update(col_dist)
+            continue
+        limit = col_dist[free_col]
+
+        for row, d in row_dist.items():
+            if d < limit:
+                row_pot[row] = row_pot.get(row, 0.0) + d - limit
+        for col, d in col_dist.items():
+            if d < limit:
+                col_pot[col] = col_pot.get(col, 0.0) + d - limit
+
+        col = free_col
+        while True:
+            row = via[col]
+            previous = col_of.get(row)
+            col_of[row] = col
+            row_of[col] = row
+            if row == root:
+                break
+            col = previous
+
+    return sorted(col_of.items())
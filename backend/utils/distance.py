@@ -1,4 +1,76 @@
-from math import radians, sin, cos, sqrt, atan2
+"""
+Great-circle (haversine) distances.
+
+The batch functions work on NumPy arrays so ranking thousands of
+providers is a single vectorized call. `distance_km` and
+`utils.location.haversine_km` are scalar wrappers kept for callers that
+only need one distance.
+"""
+
+from typing import NamedTuple, Optional
+
+import numpy as np
+
+EARTH_RADIUS_KM = 6371.0
+
+
+class Ranked(NamedTuple):
+    distances: np.ndarray  # km to every candidate
+    mask: np.ndarray       # True where distance <= radius
+    top: np.ndarray        # candidate indices inside the radius, nearest first
+
+
+def haversine_km_many(lat, lng, lats, lngs) -> np.ndarray:
+    """
+    Distances in KM from one origin to arrays of points.
+    """
+    lat1 = np.radians(lat)
+    lat2 = np.radians(np.asarray(lats, dtype=np.float64))
+    dlat = lat2 - lat1
+    dlng = np.radians(np.asarray(lngs, dtype=np.float64) - lng)
+
+    a = np.sin(dlat / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin(dlng / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+
+
+def haversine_km_matrix(origin_lats, origin_lngs, dest_lats, dest_lngs) -> np.ndarray:
+    """
+    N x M distance matrix in KM between N origins and M destinations.
+    """
+    olat = np.radians(np.asarray(origin_lats, dtype=np.float64))[:, None]
+    olng = np.radians(np.asarray(origin_lngs, dtype=np.float64))[:, None]
+    dlat_ = np.radians(np.asarray(dest_lats, dtype=np.float64))[None, :]
+    dlng_ = np.radians(np.asarray(dest_lngs, dtype=np.float64))[None, :]
+
+    a = (
+        np.sin((dlat_ - olat) / 2) ** 2
+        + np.cos(olat) * np.cos(dlat_) * np.sin((dlng_ - olng) / 2) ** 2
+    )
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+
+
+def rank_within_radius(
+    lat: float,
+    lng: float,
+    lats,
+    lngs,
+    radius_km: float,
+    k: Optional[int] = None,
+) -> Ranked:
+    """
+    Distances, radius mask and the K nearest in-radius candidates in one
+    call. Uses argpartition so only the top K are fully sorted.
+    """
+    distances = haversine_km_many(lat, lng, lats, lngs)
+    mask = distances <= radius_km
+    inside = np.flatnonzero(mask)
+
+    if k is not None and k < inside.size:
+        part = np.argpartition(distances[inside], k)[:k]
+        inside = inside[part]
+
+    top = inside[np.argsort(distances[inside], kind="stable")]
+    return Ranked(distances, mask, top)
 
 
 def distance_km(lat1, lon1, lat2, lon2):
@@ -8,11 +80,4 @@ def distance_km(lat1, lon1, lat2, lon2):
     if None in (lat1, lon1, lat2, lon2):
         return None
 
-    R = 6371
-    dlat = radians(lat2 - lat1)
-    dlon = radians(lon2 - lon1)
-
-    a = sin(dlat / 2) ** 2 + cos(radians(lat1)) * cos(radians(lat2)) * sin(dlon / 2) ** 2
-    c = 2 * atan2(sqrt(a), sqrt(1 - a))
-
-    return round(R * c, 2)
+    return round(float(haversine_km_many(lat1, lon1, lat2, lon2)), 2)
@@ -0,0 +1,82 @@
+"""
+Static k-d tree for nearest-neighbour lookups over a fixed point set.
+
+Built once with NumPy; queries walk the tree in plain Python, which for
+a few thousand points answers in microseconds.
+"""
+
+import heapq
+from typing import List, Sequence, Tuple
+
+import numpy as np
+
+
+class KDTree:
+    def __init__(self, points):
+        pts = np.asarray(points, dtype=np.float64)
+        if pts.ndim != 2 or not len(pts):
+            raise ValueError("KDTree needs a non-empty (n, dims) array")
+
+        n, self.dims = pts.shape
+        self._points: List[Tuple[float, ...]] = [tuple(p) for p in pts.tolist()]
+        self._left = [-1] * n
+        self._right = [-1] * n
+        self._axis = [0] * n
+
+        # Iterative median split: (indices, depth, parent, is_left)
+        self.root = -1
+        stack = [(np.arange(n), 0, -1, False)]
+        while stack:
+            idx, depth, parent, is_left = stack.pop()
+            if not len(idx):
+                continue
+            axis = depth % self.dims
+            order = idx[np.argsort(pts[idx, axis], kind="stable")]
+            mid = len(order) // 2
+            node = int(order[mid])
+            self._axis[node] = axis
+
+            if parent < 0:
+                self.root = node
+            elif is_left:
+                self._left[parent] = node
+            else:
+                self._right[parent] = node
+
+            stack.append((order[:mid], depth + 1, node, True))
+            stack.append((order[mid + 1:], depth + 1, node, False))
+
+    def query(self, point: Sequence[float], k: int = 1) -> List[Tuple[float, int]]:
+        """
+        The k nearest points as (squared euclidean distance, index),
+        nearest first.
+        """
+        target = tuple(float(x) for x in point)
+        best: List[Tuple[float, int]] = []  # max-heap via negated distance
+        # (node, squared distance from target to the node's region bound)
+        stack = [(self.root, 0.0)]
+
+        while stack:
+            node, bound = stack.pop()
+            if node < 0 or (len(best) == k and bound >= -best[0][0]):
+                continue
+            p = self._points[node]
+            d2 = sum((a - b) ** 2 for a, b in zip(p, target))
+            if len(best) < k:
+                heapq.heappush(best, (-d2, node))
+            elif d2 < -best[0][0]:
+                heapq.heapreplace(best, (-d2, node))
+
+            axis = self._axis[node]
+            diff = target[axis] - p[axis]
+            near, far = (
+                (self._left[node], self._right[node])
+                if diff < 0
+                else (self._right[node], self._left[node])
+            )
+            # Near side first (LIFO); far side is pruned on pop if the
+            # splitting plane is beyond the k-th best by then
+            stack.append((far, diff * diff))
+            stack.append((near, bound))
+
+        return sorted((-d, i) for d, i in best)
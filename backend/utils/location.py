@@ -1,15 +1,8 @@
-import math
+from utils.distance import haversine_km_many
 
 
 def haversine_km(lat1, lon1, lat2, lon2):
-    R = 6371  # Earth radius in KM
-    phi1 = math.radians(lat1)
-    phi2 = math.radians(lat2)
-    dphi = math.radians(lat2 - lat1)
-    dlambda = math.radians(lon2 - lon1)
-
-    a = (
-        math.sin(dphi / 2) ** 2
-        + math.cos(phi1) * math.cos(phi2) * math.sin(dlambda / 2) ** 2
-    )
-    return R * (2 * math.atan2(math.sqrt(a), math.sqrt(1 - a)))
+    """
+    Unrounded haversine distance in KM (see utils.distance).
+    """
+    return float(haversine_km_many(lat1, lon1, lat2, lon2))
@@ -0,0 +1,57 @@
+# backend/utils/pagination.py
+"""
+Keyset (cursor) pagination on the integer primary key.
+
+Cursors are opaque to clients: base64url-encoded JSON holding the last
+id of the previous page. `offset` is kept only as a fallback for old
+clients; it is ignored once a cursor is supplied.
+"""
+
+import base64
+import binascii
+import json
+from typing import Any, Callable, List, Optional, Tuple
+
+from fastapi import HTTPException
+
+
+def encode_cursor(last_id: int) -> str:
+    raw = json.dumps({"id": last_id}, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> int:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        return int(json.loads(base64.urlsafe_b64decode(padded))["id"])
+    except (binascii.Error, ValueError, KeyError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def keyset_page(
+    query,
+    id_column,
+    *,
+    limit: int,
+    cursor: Optional[str] = None,
+    offset: int = 0,
+    descending: bool = True,
+    row_id: Callable[[Any], int] = lambda row: row.id,
+) -> Tuple[List[Any], Optional[str]]:
+    """
+    Returns (rows, next_cursor) for `query` ordered by `id_column`.
+    `row_id` extracts the id from a result row (needed for tuple rows).
+    """
+    query = query.order_by(id_column.desc() if descending else id_column.asc())
+    if cursor:
+        last_id = decode_cursor(cursor)
+        query = query.filter(id_column < last_id if descending else id_column > last_id)
+    elif offset:
+        query = query.offset(offset)
+
+    rows = query.limit(limit + 1).all()
+
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    return rows, encode_cursor(row_id(rows[-1]))
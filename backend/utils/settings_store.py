@@ -1,6 +1,8 @@
 import json
+import threading
+import time
 from pathlib import Path
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 
 
 # -----------------------------
@@ -8,6 +10,9 @@ from typing import List, Dict, Any
 # -----------------------------
 SETTINGS_FILE = Path("admin_settings.json")
 
+# cached_settings() re-reads the file at most this often
+CACHE_SECONDS = 5.0
+
 
 # -----------------------------
 # Default platform settings
@@ -19,6 +24,17 @@ DEFAULT_SETTINGS: Dict[str, Any] = {
     # Search / matching
     "default_search_radius_km": 5,
     "max_search_radius_km": 25,
+    # Match open requests to providers in the background (services.dispatch)
+    "auto_dispatch": True,
+    # Each dispatched request is offered to this many providers at once;
+    # unanswered offers lapse after the timeout (services.offers)
+    "dispatch_offer_count": 3,
+    "dispatch_offer_timeout_s": 30,
+
+    # Location ingest: pings that moved less than this, or arrive sooner
+    # than this after the last stored point, only refresh "last seen"
+    "location_min_move_m": 25,
+    "location_min_interval_s": 15,
 
     # Provider behavior
     "provider_auto_online_after_kyc": True,
@@ -74,6 +90,26 @@ def load_settings() -> Dict[str, Any]:
         return DEFAULT_SETTINGS.copy()
 
 
+_cache_lock = threading.Lock()
+_cached: Optional[Dict[str, Any]] = None
+_cached_at = 0.0
+
+
+def cached_settings() -> Dict[str, Any]:
+    """
+    load_settings() for hot paths (nearby search, dispatch, presence
+    flushes): re-read at most every CACHE_SECONDS. save_settings
+    refreshes it at once in this process; other workers pick the change
+    up within CACHE_SECONDS.
+    The returned dict is shared, don't modify it.
+    """
+    global _cached, _cached_at
+    with _cache_lock:
+        if _cached is None or time.monotonic() - _cached_at >= CACHE_SECONDS:
+            _cached, _cached_at = load_settings(), time.monotonic()
+        return _cached
+
+
 # -----------------------------
 # Save settings
 # -----------------------------
@@ -91,4 +127,8 @@ def save_settings(payload: Dict[str, Any]) -> Dict[str, Any]:
         encoding="utf-8",
     )
 
+    global _cached, _cached_at
+    with _cache_lock:
+        _cached, _cached_at = merged, time.monotonic()
+
     return merged
@@ -0,0 +1,61 @@
+"""
+Ramer-Douglas-Peucker line simplification for GPS tracks.
+
+Points are projected to local metres (equirectangular around the track's
+mean latitude), which is accurate enough at city scale and keeps the
+tolerance in metres.
+"""
+
+from typing import List, Sequence
+
+import numpy as np
+
+from utils.distance import EARTH_RADIUS_KM
+
+EARTH_RADIUS_M = EARTH_RADIUS_KM * 1000
+
+
+def simplify_path(
+    lats: Sequence[float], lngs: Sequence[float], epsilon_m: float
+) -> List[int]:
+    """
+    Indices of the points to keep so that no dropped point is more than
+    `epsilon_m` from the simplified line. The first and last points are
+    always kept.
+    """
+    n = len(lats)
+    if n < 3:
+        return list(range(n))
+
+    lat = np.radians(np.asarray(lats, dtype=np.float64))
+    lng = np.radians(np.asarray(lngs, dtype=np.float64))
+    pts = np.column_stack((lng * np.cos(lat.mean()), lat)) * EARTH_RADIUS_M
+
+    keep = np.zeros(n, dtype=bool)
+    keep[0] = keep[-1] = True
+    stack = [(0, n - 1)]
+    while stack:
+        a, b = stack.pop()
+        if b - a < 2:
+            continue
+
+        seg = pts[b] - pts[a]
+        rel = pts[a + 1:b] - pts[a]
+        seg_len2 = float(seg @ seg)
+        if seg_len2 == 0.0:
+            dist = np.hypot(rel[:, 0], rel[:, 1])
+        else:
+            # distance to the segment, not the infinite line, so a track
+            # that doubles back is not collapsed
+            t = np.clip(rel @ seg / seg_len2, 0.0, 1.0)
+            off = rel - t[:, None] * seg
+            dist = np.hypot(off[:, 0], off[:, 1])
+
+        i = int(np.argmax(dist))
+        if dist[i] > epsilon_m:
+            m = a + 1 + i
+            keep[m] = True
+            stack.append((a, m))
+            stack.append((m, b))
+
+    return np.flatnonzero(keep).tolist()
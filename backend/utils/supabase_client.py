@@ -1,13 +1,28 @@
 import os
-from supabase import create_client
+import threading
 
-SUPABASE_URL = os.getenv("SUPABASE_URL")
-SUPABASE_KEY = os.getenv("SUPABASE_KEY")
-print("SUPABASE_URL =", SUPABASE_URL)
-print("SUPABASE_KEY prefix =", SUPABASE_KEY[:10] if SUPABASE_KEY else None)
+from services import fakes
 
+_lock = threading.Lock()
+_client = None
 
-if not SUPABASE_URL or not SUPABASE_KEY:
-    raise RuntimeError("Supabase credentials not set")
 
-supabase = create_client(SUPABASE_URL, SUPABASE_KEY)
+def get_supabase():
+    """
+    The Supabase client, created on first use (or the fake, see
+    services.fakes). Raises if credentials are missing.
+    """
+    global _client
+    with _lock:
+        if _client is None:
+            if fakes.use_fake("supabase"):
+                _client = fakes.FakeSupabase(fakes.LatencyModel.from_env("supabase"))
+            else:
+                from supabase import create_client
+
+                SUPABASE_URL = os.getenv("SUPABASE_URL")
+                SUPABASE_KEY = os.getenv("SUPABASE_KEY")
+                if not SUPABASE_URL or not SUPABASE_KEY:
+                    raise RuntimeError("Supabase credentials not set")
+                _client = create_client(SUPABASE_URL, SUPABASE_KEY)
+        return _client
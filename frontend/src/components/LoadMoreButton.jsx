@@ -0,0 +1,16 @@
+// "Load more" footer for cursor-paginated lists (see hooks/useCursorList).
+export default function LoadMoreButton({ hasMore, busy, onClick }) {
+  if (!hasMore) return null;
+
+  return (
+    <div className="flex justify-center py-4">
+      <button
+        disabled={busy}
+        onClick={onClick}
+        className="px-4 py-2 rounded-xl border border-slate-700 text-xs text-slate-200 hover:bg-slate-900/60 disabled:opacity-60"
+      >
+        {busy ? "Loading…" : "Load more"}
+      </button>
+    </div>
+  );
+}
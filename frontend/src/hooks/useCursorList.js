@@ -0,0 +1,77 @@
+import { useCallback, useRef, useState } from "react";
+import api from "../api/client";
+
+// Loads a cursor-paginated list endpoint ({ items, next_cursor }).
+// reload() fetches the first page with the current params, loadMore()
+// appends the page after next_cursor. Responses from a superseded reload
+// (filters changed meanwhile) are dropped.
+export default function useCursorList(path, params, errorMessage) {
+  const [rows, setRows] = useState([]);
+  const [nextCursor, setNextCursor] = useState(null);
+  const [loading, setLoading] = useState(true);
+  const [loadingMore, setLoadingMore] = useState(false);
+  const [error, setError] = useState("");
+
+  const paramsRef = useRef(params);
+  paramsRef.current = params;
+  const generation = useRef(0);
+
+  const fetchPage = async (cursor) => {
+    const res = await api.get(path, {
+      params: { ...paramsRef.current, cursor: cursor || undefined },
+    });
+    const list = Array.isArray(res.data?.items)
+      ? res.data.items
+      : Array.isArray(res.data)
+      ? res.data
+      : [];
+    return [list, res.data?.next_cursor || null];
+  };
+
+  const reload = useCallback(async () => {
+    const gen = ++generation.current;
+    setLoading(true);
+    setError("");
+    try {
+      const [list, cursor] = await fetchPage(null);
+      if (gen !== generation.current) return;
+      setRows(list);
+      setNextCursor(cursor);
+    } catch {
+      if (gen !== generation.current) return;
+      setError(errorMessage);
+      setRows([]);
+      setNextCursor(null);
+    } finally {
+      if (gen === generation.current) setLoading(false);
+    }
+    // eslint-disable-next-line react-hooks/exhaustive-deps
+  }, [path, errorMessage]);
+
+  const loadMore = async () => {
+    if (!nextCursor || loadingMore) return;
+    const gen = generation.current;
+    setLoadingMore(true);
+    try {
+      const [list, cursor] = await fetchPage(nextCursor);
+      if (gen !== generation.current) return;
+      setRows((r) => [...r, ...list]);
+      setNextCursor(cursor);
+    } catch {
+      if (gen === generation.current) setError(errorMessage);
+    } finally {
+      setLoadingMore(false);
+    }
+  };
+
+  return {
+    rows,
+    setRows,
+    loading,
+    loadingMore,
+    error,
+    hasMore: !!nextCursor,
+    reload,
+    loadMore,
+  };
+}
@@ -0,0 +1,43 @@
+import { useEffect, useRef, useState } from "react";
+import api from "../api/client";
+
+// Subscribes to a backend Server-Sent Events endpoint.
+// EventSource cannot send headers, so the JWT goes in ?token=.
+// Returns whether the stream is currently open so callers can relax polling.
+export default function useEventStream(path, eventTypes, onEvent, enabled = true) {
+  const [connected, setConnected] = useState(false);
+  const handlerRef = useRef(onEvent);
+  handlerRef.current = onEvent;
+
+  const typesKey = eventTypes.join(",");
+
+  useEffect(() => {
+    const token = localStorage.getItem("access_token");
+    if (!enabled || !path || !token || typeof EventSource === "undefined") return;
+
+    const url = new URL(path, api.defaults.baseURL);
+    url.searchParams.set("token", token);
+
+    const source = new EventSource(url.toString());
+    source.onopen = () => setConnected(true);
+    source.onerror = () => setConnected(false);
+
+    const listener = (e) => {
+      let data = null;
+      try {
+        data = JSON.parse(e.data);
+      } catch {
+        return;
+      }
+      handlerRef.current?.(e.type, data);
+    };
+    typesKey.split(",").forEach((t) => source.addEventListener(t, listener));
+
+    return () => {
+      source.close();
+      setConnected(false);
+    };
+  }, [path, typesKey, enabled]);
+
+  return connected;
+}
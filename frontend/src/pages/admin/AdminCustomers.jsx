@@ -1,5 +1,7 @@
 import { useEffect, useState } from "react";
 import api from "../../api/client";
+import LoadMoreButton from "../../components/LoadMoreButton";
+import useCursorList from "../../hooks/useCursorList";
 
 /* ---------------- utils ---------------- */
 function cx(...c) {
@@ -80,42 +82,17 @@ function ConfirmModal({
 
 /* ================= PAGE ================= */
 export default function AdminCustomers() {
-  const [rows, setRows] = useState([]);
-  const [loading, setLoading] = useState(true);
   const [busyId, setBusyId] = useState(null);
-  const [error, setError] = useState("");
   const [search, setSearch] = useState("");
   const [deleteTarget, setDeleteTarget] = useState(null);
 
   /* ---------- load customers ---------- */
-  const load = async () => {
-    setLoading(true);
-    setError("");
-
-    try {
-      const res = await api.get("/admin/customers", {
-        params: { search, limit: 50, offset: 0 },
-      });
-
-      // ✅ CRITICAL FIX
-      const list = Array.isArray(res.data?.items)
-        ? res.data.items
-        : Array.isArray(res.data)
-        ? res.data
-        : [];
-
-      setRows(list);
-    } catch (e) {
-      setError("Failed to load customers");
-      setRows([]);
-    } finally {
-      setLoading(false);
-    }
-  };
+  const { rows, setRows, loading, loadingMore, error, hasMore, reload, loadMore } =
+    useCursorList("/admin/customers", { search, limit: 50 }, "Failed to load customers");
 
   useEffect(() => {
-    load();
-  }, []);
+    reload();
+  }, [reload]);
 
   /* ---------- delete ---------- */
   const hardDelete = async (id) => {
@@ -177,6 +154,10 @@ export default function AdminCustomers() {
         </table>
       )}
 
+      {!loading && (
+        <LoadMoreButton hasMore={hasMore} busy={loadingMore} onClick={loadMore} />
+      )}
+
       <ConfirmModal
         open={!!deleteTarget}
         title="Delete customer?"
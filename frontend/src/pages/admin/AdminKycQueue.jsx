@@ -1,6 +1,7 @@
 import { useEffect, useMemo, useState } from "react";
 import { useNavigate, useSearchParams } from "react-router-dom";
-import api from "../../api/client";
+import LoadMoreButton from "../../components/LoadMoreButton";
+import useCursorList from "../../hooks/useCursorList";
 
 /* ---------------- utils ---------------- */
 function cx(...c) {
@@ -32,10 +33,7 @@ export default function AdminKycQueue() {
 
   const status = sp.get("status") || "pending";
 
-  const [rows, setRows] = useState([]);
   const [search, setSearch] = useState("");
-  const [loading, setLoading] = useState(true);
-  const [error, setError] = useState("");
 
   const filters = useMemo(
     () => [
@@ -47,38 +45,15 @@ export default function AdminKycQueue() {
   );
 
   /* ---------- load queue ---------- */
-  const load = async () => {
-    setLoading(true);
-    setError("");
-
-    try {
-      const res = await api.get("/admin/kyc", {
-        params: {
-          status,
-          search: search.trim(),
-          limit: 50,
-          offset: 0,
-        },
-      });
-
-      // ✅ CRITICAL FIX
-      const list = Array.isArray(res.data?.items)
-        ? res.data.items
-        : Array.isArray(res.data)
-        ? res.data
-        : [];
-
-      setRows(list);
-    } catch (e) {
-      setError("Failed to load KYC queue");
-      setRows([]);
-    } finally {
-      setLoading(false);
-    }
-  };
+  const { rows, loading, loadingMore, error, hasMore, reload, loadMore } =
+    useCursorList(
+      "/admin/kyc",
+      { status, search: search.trim(), limit: 50 },
+      "Failed to load KYC queue"
+    );
 
   useEffect(() => {
-    load();
+    reload();
     // eslint-disable-next-line react-hooks/exhaustive-deps
   }, [status]);
 
@@ -103,7 +78,7 @@ export default function AdminKycQueue() {
               className="px-3 py-2 rounded-xl bg-slate-900/40 border border-slate-800 text-xs text-slate-200"
             />
             <button
-              onClick={load}
+              onClick={reload}
               className="px-4 py-2 rounded-xl bg-gradient-to-r from-purple-400 to-pink-500 text-slate-950 text-xs font-semibold"
             >
               Apply
@@ -199,6 +174,10 @@ export default function AdminKycQueue() {
             </tbody>
           </table>
         )}
+
+        {!loading && (
+          <LoadMoreButton hasMore={hasMore} busy={loadingMore} onClick={loadMore} />
+        )}
       </div>
     </div>
   );
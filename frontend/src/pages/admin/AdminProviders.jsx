@@ -1,6 +1,8 @@
 import { useEffect, useMemo, useState } from "react";
 import { useNavigate } from "react-router-dom";
 import api from "../../api/client";
+import LoadMoreButton from "../../components/LoadMoreButton";
+import useCursorList from "../../hooks/useCursorList";
 
 /* ================= utils ================= */
 function cx(...c) {
@@ -123,10 +125,7 @@ function MenuItem({ label, hint, danger, onClick }) {
 export default function AdminProviders() {
   const navigate = useNavigate();
 
-  const [rows, setRows] = useState([]);
-  const [loading, setLoading] = useState(true);
   const [busyId, setBusyId] = useState(null);
-  const [error, setError] = useState("");
   const [deleteTarget, setDeleteTarget] = useState(null);
 
   /* ---------- filters ---------- */
@@ -163,38 +162,22 @@ export default function AdminProviders() {
   ];
 
   /* ---------- load ---------- */
-  const load = async () => {
-    setLoading(true);
-    setError("");
-    try {
-      const res = await api.get("/admin/providers", {
-        params: {
-          search,
-          search_field: category,       // backend: use to filter by name/email/phone
-          service_type: serviceType,
-          kyc_status: kycStatus,
-          is_online: onlineFilter || undefined,
-        },
-      });
-
-      const list = Array.isArray(res.data?.items)
-        ? res.data.items
-        : Array.isArray(res.data)
-        ? res.data
-        : [];
-
-      setRows(list);
-    } catch {
-      setError("Failed to load providers");
-      setRows([]);
-    } finally {
-      setLoading(false);
-    }
-  };
+  const { rows, setRows, loading, loadingMore, error, hasMore, reload, loadMore } =
+    useCursorList(
+      "/admin/providers",
+      {
+        search,
+        search_field: category,       // backend: use to filter by name/email/phone
+        service_type: serviceType,
+        kyc_status: kycStatus,
+        is_online: onlineFilter || undefined,
+      },
+      "Failed to load providers"
+    );
 
   // reload when any filter changes
   useEffect(() => {
-    load();
+    reload();
     // eslint-disable-next-line react-hooks/exhaustive-deps
   }, [search, category, serviceType, kycStatus, onlineFilter]);
 
@@ -350,6 +333,10 @@ export default function AdminProviders() {
         </table>
       )}
 
+      {!loading && (
+        <LoadMoreButton hasMore={hasMore} busy={loadingMore} onClick={loadMore} />
+      )}
+
       <ConfirmModal
         open={!!deleteTarget}
         title="Delete provider?"
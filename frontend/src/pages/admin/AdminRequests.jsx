@@ -1,7 +1,8 @@
 // src/pages/admin/AdminRequests.jsx
 import { useEffect, useMemo, useState } from "react";
 import { useNavigate } from "react-router-dom";
-import api from "../../api/client";
+import LoadMoreButton from "../../components/LoadMoreButton";
+import useCursorList from "../../hooks/useCursorList";
 
 /* ============== utils ============== */
 function cx(...c) {
@@ -40,10 +41,6 @@ function StatusBadge({ status }) {
 export default function AdminRequests() {
   const navigate = useNavigate();
 
-  const [rows, setRows] = useState([]);
-  const [loading, setLoading] = useState(true);
-  const [error, setError] = useState("");
-
   const [status, setStatus] = useState("");
   const [serviceType, setServiceType] = useState("");
 
@@ -66,36 +63,15 @@ export default function AdminRequests() {
     []
   );
 
-  const load = async () => {
-    setLoading(true);
-    setError("");
-    try {
-      const res = await api.get("/admin/requests", {
-        params: {
-          status,
-          service_type: serviceType,
-          limit: 100,
-          offset: 0,
-        },
-      });
-
-      const list = Array.isArray(res.data?.items)
-        ? res.data.items
-        : Array.isArray(res.data)
-        ? res.data
-        : [];
-
-      setRows(list);
-    } catch {
-      setError("Failed to load requests");
-      setRows([]);
-    } finally {
-      setLoading(false);
-    }
-  };
+  const { rows, loading, loadingMore, error, hasMore, reload, loadMore } =
+    useCursorList(
+      "/admin/requests",
+      { status, service_type: serviceType, limit: 100 },
+      "Failed to load requests"
+    );
 
   useEffect(() => {
-    load();
+    reload();
     // eslint-disable-next-line react-hooks/exhaustive-deps
   }, [status, serviceType]);
 
@@ -207,6 +183,10 @@ export default function AdminRequests() {
           </tbody>
         </table>
       )}
+
+      {!loading && (
+        <LoadMoreButton hasMore={hasMore} busy={loadingMore} onClick={loadMore} />
+      )}
     </div>
   );
 }
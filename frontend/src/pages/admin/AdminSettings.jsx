@@ -110,6 +110,11 @@ const DEFAULTS = {
   maintenance_mode: false,
   default_search_radius_km: 5,
   max_search_radius_km: 25,
+  auto_dispatch: true,
+  dispatch_offer_count: 3,
+  dispatch_offer_timeout_s: 30,
+  location_min_move_m: 25,
+  location_min_interval_s: 15,
   provider_auto_online_after_kyc: true,
   min_base_price: 99,
   platform_fee_percent: 0,
@@ -355,6 +360,58 @@ export default function AdminSettings() {
               />
             </Field>
 
+            <Field
+              label="Automatic dispatch"
+              hint="Offer open requests to the best nearby available providers every few seconds."
+            >
+              <Toggle
+                checked={!!settings.auto_dispatch}
+                onChange={(v) => setSettings((s) => ({ ...s, auto_dispatch: v }))}
+                labelLeft={settings.auto_dispatch ? "Enabled" : "Disabled"}
+                labelRight="Customers can still pick a provider"
+              />
+            </Field>
+
+            <Field label="Providers offered per request" hint="Dispatch offers each request to this many providers; the first to accept gets it.">
+              <input
+                type="number"
+                min={1}
+                value={settings.dispatch_offer_count}
+                onChange={(e) => setSettings((s) => ({ ...s, dispatch_offer_count: Number(e.target.value) }))}
+                className="w-full px-4 py-3 rounded-2xl bg-slate-950/40 border border-slate-800 focus:outline-none focus:ring-2 focus:ring-purple-400/60 text-sm text-slate-100"
+              />
+            </Field>
+
+            <Field label="Offer timeout (s)" hint="Unanswered offers lapse after this and the request is offered to others.">
+              <input
+                type="number"
+                min={5}
+                value={settings.dispatch_offer_timeout_s}
+                onChange={(e) => setSettings((s) => ({ ...s, dispatch_offer_timeout_s: Number(e.target.value) }))}
+                className="w-full px-4 py-3 rounded-2xl bg-slate-950/40 border border-slate-800 focus:outline-none focus:ring-2 focus:ring-purple-400/60 text-sm text-slate-100"
+              />
+            </Field>
+
+            <Field label="Location min movement (m)" hint="Provider GPS updates that moved less than this are not stored.">
+              <input
+                type="number"
+                min={0}
+                value={settings.location_min_move_m}
+                onChange={(e) => setSettings((s) => ({ ...s, location_min_move_m: Number(e.target.value) }))}
+                className="w-full px-4 py-3 rounded-2xl bg-slate-950/40 border border-slate-800 focus:outline-none focus:ring-2 focus:ring-purple-400/60 text-sm text-slate-100"
+              />
+            </Field>
+
+            <Field label="Location min interval (s)" hint="Minimum time between two stored provider positions.">
+              <input
+                type="number"
+                min={0}
+                value={settings.location_min_interval_s}
+                onChange={(e) => setSettings((s) => ({ ...s, location_min_interval_s: Number(e.target.value) }))}
+                className="w-full px-4 py-3 rounded-2xl bg-slate-950/40 border border-slate-800 focus:outline-none focus:ring-2 focus:ring-purple-400/60 text-sm text-slate-100"
+              />
+            </Field>
+
             <Field label="Minimum base price (₹)" hint="Block providers with base price below this value (optional).">
               <input
                 type="number"
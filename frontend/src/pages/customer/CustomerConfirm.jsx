@@ -2,6 +2,7 @@
 import { useLocation, useNavigate } from "react-router-dom";
 import { useEffect, useMemo, useRef, useState } from "react";
 import api from "../../api/client";
+import useEventStream from "../../hooks/useEventStream";
 
 function cx(...c) {
   return c.filter(Boolean).join(" ");
@@ -88,15 +89,22 @@ export default function CustomerConfirm() {
     }
   };
 
+  // Status pushes from the backend; polling stays as a slower fallback while live
+  const streamLive = useEventStream(
+    request?.id ? `/requests/${request.id}/events` : null,
+    ["request.status", "request.provider", "request.updated"],
+    () => refreshAll({ silent: true })
+  );
+
   useEffect(() => {
     if (!provider?.id || !request?.id) return;
 
     refreshAll({ silent: false });
 
-    const id = setInterval(() => refreshAll({ silent: true }), 5000);
+    const id = setInterval(() => refreshAll({ silent: true }), streamLive ? 30000 : 5000);
     return () => clearInterval(id); // cleanup [web:291]
     // eslint-disable-next-line react-hooks/exhaustive-deps
-  }, [provider?.id, request?.id]);
+  }, [provider?.id, request?.id, streamLive]);
 
   const ratingText = useMemo(() => {
     const r = Number.isFinite(provider?.rating) ? provider.rating : 0;
@@ -2,6 +2,7 @@
 import { useEffect, useState } from "react";
 import { useLocation, useNavigate, useParams } from "react-router-dom";
 import api from "../../api/client";
+import useEventStream from "../../hooks/useEventStream";
 
 export default function CustomerRequestDetails() {
   const { id } = useParams();
@@ -79,12 +80,18 @@ export default function CustomerRequestDetails() {
     );
   };
 
+  const streamLive = useEventStream(
+    `/requests/${id}/events`,
+    ["request.status", "request.provider", "request.updated"],
+    () => loadRequest()
+  );
+
   useEffect(() => {
     loadRequest();
-    const timer = setInterval(loadRequest, 10000);
+    const timer = setInterval(loadRequest, streamLive ? 30000 : 10000);
     return () => clearInterval(timer);
     // eslint-disable-next-line react-hooks/exhaustive-deps
-  }, [id]);
+  }, [id, streamLive]);
 
   const goBack = () => {
     if (location.state?.from) navigate(location.state.from);
@@ -53,8 +53,14 @@ export default function ProviderList() {
       const serviceType =
         request?.service_type || localStorage.getItem("last_service_type") || "";
 
+      const lat = location.state?.lat ?? request?.customer_lat;
+      const lng = location.state?.lng ?? request?.customer_lng;
+
       const res = await api.get("/customer/nearby-providers", {
-        params: { service_type: serviceType },
+        params: {
+          service_type: serviceType,
+          ...(lat != null && lng != null ? { lat, lng } : {}),
+        },
       });
 
       const items = (res.data.items || []).map((p) => ({
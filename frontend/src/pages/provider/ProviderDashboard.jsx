@@ -2,6 +2,7 @@
 import { useEffect, useMemo, useRef, useState } from "react";
 import { NavLink, useNavigate } from "react-router-dom";
 import api from "../../api/client";
+import useEventStream from "../../hooks/useEventStream";
 
 function cx(...c) {
   return c.filter(Boolean).join(" ");
@@ -305,12 +306,20 @@ export default function ProviderDashboard() {
     }
   };
 
+  // Push new/cancelled jobs; polling stays as the fallback (slower while live)
+  const streamLive = useEventStream(
+    "/provider/events",
+    ["request.assigned", "request.offered", "request.status", "request.withdrawn", "request.updated"],
+    () => loadData(),
+    !checking
+  );
+
   useEffect(() => {
     if (checking) return;
     loadData();
-    const id = setInterval(loadData, 10000);
+    const id = setInterval(loadData, streamLive ? 30000 : 10000);
     return () => clearInterval(id);
-  }, [checking]);
+  }, [checking, streamLive]);
 
   // ACCEPT / REJECT
   const handleAccept = async (r) => {
@@ -322,6 +331,10 @@ export default function ProviderDashboard() {
         kind: "error",
         text: e.response?.data?.detail || "Failed to accept request.",
       });
+      // Another provider took it first
+      if (e.response?.status === 409) {
+        setIncoming((prev) => prev.filter((x) => x.id !== r.id));
+      }
     }
   };
 
@@ -430,7 +443,13 @@ export default function ProviderDashboard() {
       { enableHighAccuracy: true, maximumAge: 10000, timeout: 20000 }
     );
 
+    // Keeps the presence lease alive while parked (no GPS callbacks)
+    const heartbeat = setInterval(() => {
+      api.post("/provider/heartbeat").catch(() => {});
+    }, 30000);
+
     return () => {
+      clearInterval(heartbeat);
       if (watchIdRef.current !== null) {
         navigator.geolocation.clearWatch(watchIdRef.current);
         api